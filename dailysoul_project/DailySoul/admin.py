@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import JournalEntry,Affirmation,DeathNoteEntry,LuckCard
+from .models import JournalEntry,Affirmation,Category,DeathNoteEntry,LuckCard
 
+admin.site.register(Category)
 admin.site.register(Affirmation)
 admin.site.register(LuckCard)
\ No newline at end of file
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class DailysoulConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'DailySoul'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import signals  # noqa: F401
+
+        if getattr(settings, 'DAILYSOUL_WARM_UP', False):
+            from . import warmup
+            warmup.start()
@@ -0,0 +1,124 @@
+"""
+Native ``async def`` versions of the JSON API views.
+
+They return exactly what their counterparts in views.py return, but use the
+async ORM and cache methods so an ASGI worker can keep many game and draw
+requests in flight on one event loop. urls.py routes to them when
+settings.DAILYSOUL_ASYNC_API is on. The pile draw transaction still runs
+synchronously (transaction.atomic has no async form) on a worker thread.
+"""
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+
+from .categories import adraw
+from .daily import aget_pile_snapshot
+from .leaderboard import arecord_score, leaderboards
+from .models import PileCardSelection
+from .routers import replica_reads
+from .selection import luck_card_pool
+from .views import (
+    MAX_DRAWS_PER_DAY, _board_response, _bubble_score, _claim_draw, _drawn_piles_payload,
+    _draw_response, _exhausted_piles_payload, _get_daily_draw, _high_scores_query, _not_enough_cards_payload,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _resolve_user(request):
+    # Touching is_authenticated forces the lazy session and user lookups
+    request.user.is_authenticated
+    return request.user
+
+
+async def _get_user(request):
+    auser = getattr(request, 'auser', None)
+    if auser is not None:
+        return await auser()
+    return await sync_to_async(_resolve_user)(request)
+
+
+@replica_reads
+async def draw_affirmation(request):
+    try:
+        card = await adraw(request.GET.get('category'), request.GET.get('mix'))
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    return _draw_response(request, card)
+
+
+async def _exhausted_piles_response(request, daily_draw):
+    selections = [
+        sel async for sel in
+        PileCardSelection.objects.filter(daily_draw=daily_draw).select_related('card').order_by('position')
+    ]
+    fallback_cards = [] if selections else await luck_card_pool.asample(3)
+    return JsonResponse(_exhausted_piles_payload(request, daily_draw, selections, fallback_cards), status=200)
+
+
+async def api_get_piles(request):
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    user = await _get_user(request)
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    today = timezone.localdate()
+
+    snapshot = await aget_pile_snapshot(user.pk, today)
+    if snapshot is not None:
+        return JsonResponse(snapshot, status=200)
+
+    try:
+        # Same locked-database retries as the sync view
+        daily_draw = await sync_to_async(_get_daily_draw)(user, today)
+
+        if len(await luck_card_pool.aids()) < 3:
+            return JsonResponse(_not_enough_cards_payload(daily_draw), status=200)
+
+        if daily_draw.draw_count >= MAX_DRAWS_PER_DAY:
+            return await _exhausted_piles_response(request, daily_draw)
+
+        created_selections = await sync_to_async(_claim_draw)(daily_draw)
+        if created_selections is None:
+            return await _exhausted_piles_response(request, daily_draw)
+
+        return JsonResponse(_drawn_piles_payload(request, daily_draw, created_selections), status=200)
+
+    except Exception:
+        logger.exception("Could not draw piles for user %s", user.pk)
+        return JsonResponse({'error': 'Could not draw cards, please try again'}, status=500)
+
+
+@csrf_exempt
+async def save_bubble_score(request):
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'Invalid request'})
+
+    try:
+        data = json.loads(request.body)
+        game_score = _bubble_score(data, await _get_user(request))
+        await arecord_score(game_score)
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'message': str(e)})
+
+    return JsonResponse({
+        'status': 'success',
+        'score': game_score.score,
+        'bubbles_popped': game_score.details['bubbles_popped'],
+        'message': 'Score recorded!'
+    })
+
+
+@replica_reads
+async def get_bubble_high_scores(request):
+    period, limit, error = _high_scores_query(request, 'bubble_pop')
+    if error is not None:
+        return error
+    board = await leaderboards['bubble_pop'].aboard(period)
+    return _board_response(request, board, period, limit)
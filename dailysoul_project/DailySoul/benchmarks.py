@@ -0,0 +1,207 @@
+"""
+Query-count / latency / memory benchmarks for every DailySoul route.
+
+Used by the ``benchmark_views`` management command, which runs this against a
+throwaway test database. The JSON report is stable (sorted keys, one entry
+per scale and route) so two runs can be diffed between commits.
+
+The helpers at the bottom are shared by the commands that compare two
+configurations (loadtest_api, benchmark_sqlite_writes): each mode runs in
+its own ``--worker`` process against a throwaway database file.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from . import urls as dailysoul_urls
+from .models import Affirmation, Category, DeathNoteEntry, JournalEntry, LuckCard
+from .scores import score_buffer
+from .search import INDEXES, rebuild_index
+
+DEFAULT_SCALES = (100, 1000, 10000)
+CATEGORIES = ('calm', 'gratitude', 'confidence', 'self-love')
+BATCH_SIZE = 2000
+
+# Routes that need something other than a plain GET
+REQUESTS = {
+    'save_bubble_score': ('post', {'data': json.dumps({'score': 420, 'bubbles_popped': 42}),
+                                   'content_type': 'application/json'}),
+    'save_memory_match_score': ('post', {'data': json.dumps({'moves': 20, 'seconds': 45}),
+                                         'content_type': 'application/json'}),
+    'api_journal_search': ('get', {'data': {'q': 'benchmark journal'}}),
+    'api_deathnote_search': ('get', {'data': {'q': 'thought'}}),
+}
+
+
+def seed(scale, user):
+    """Fill the catalog and the user's history with ``scale`` rows each."""
+    now = timezone.now()
+    categories = [Category.objects.create(name=name) for name in CATEGORIES]
+    Affirmation.objects.bulk_create(
+        (Affirmation(text=f"Benchmark affirmation {i}", category=categories[i % len(categories)])
+         for i in range(scale)),
+        batch_size=BATCH_SIZE,
+    )
+    LuckCard.objects.bulk_create(
+        (LuckCard(image='luck_cards/benchmark.jpg', message=f"Benchmark card {i}") for i in range(scale)),
+        batch_size=BATCH_SIZE,
+    )
+    # Four entries a day, so the history spans scale / 4 days
+    JournalEntry.objects.bulk_create(
+        (JournalEntry(user=user, title=f"Entry {i}", content="Benchmark journal text. " * 8,
+                      created_at=now - timedelta(hours=6 * i)) for i in range(scale)),
+        batch_size=BATCH_SIZE,
+    )
+    DeathNoteEntry.objects.bulk_create(
+        (DeathNoteEntry(user=user, content="Benchmark thought. " * 4) for _ in range(scale)),
+        batch_size=BATCH_SIZE,
+    )
+    # bulk_create skips the signals that index entries for search
+    for kind in INDEXES:
+        rebuild_index(kind)
+
+
+def routes():
+    return [
+        pattern.name
+        for pattern in dailysoul_urls.urlpatterns
+        if isinstance(pattern, URLPattern) and pattern.name and not pattern.pattern.converters
+    ]
+
+
+def measure(client, user, name, repeat):
+    """
+    One cold request, ``repeat`` timed warm requests, then one more under
+    tracemalloc for peak memory (kept out of the timings, it slows Python down).
+    """
+    method, kwargs = REQUESTS.get(name, ('get', {}))
+    url = reverse(name)
+
+    def request():
+        # logout and friends end the session, so log in again every time
+        client.force_login(user)
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, **kwargs)
+            elapsed = (time.perf_counter() - started) * 1000
+        return response, len(ctx.captured_queries), elapsed
+
+    _, _, cold = request()
+    timings = [request()[2] for _ in range(repeat)]
+
+    tracemalloc.start()
+    response, queries, _ = request()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'status': response.status_code,
+        'queries': queries,
+        'response_bytes': len(response.content),
+        'peak_kb': round(peak / 1024, 1),
+        'cold_ms': round(cold, 3),
+        'wall_ms': {
+            'min': round(min(timings), 3),
+            'median': round(statistics.median(timings), 3),
+            'max': round(max(timings), 3),
+        },
+    }
+
+
+def run_benchmarks(scales=DEFAULT_SCALES, repeat=5, names=None, log=None):
+    """
+    Seed each scale into an empty database and measure every route.
+    Must run against a disposable database: each scale starts with a flush.
+    """
+    names = names or routes()
+    report = {
+        'meta': {
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'repeat': repeat,
+        },
+        'results': {},
+    }
+    for scale in scales:
+        call_command('flush', interactive=False, verbosity=0)
+        cache.clear()
+        user = User.objects.create_user('benchmark', 'benchmark@example.com', 'benchmark-password')
+        seed(scale, user)
+
+        client = Client(HTTP_HOST='localhost')
+        report['results'][str(scale)] = scale_results = {}
+        for name in names:
+            scale_results[name] = measure(client, user, name, repeat)
+            # Write buffered game scores now rather than from the timer thread
+            score_buffer.flush()
+            if log:
+                entry = scale_results[name]
+                log(f"{scale:>7} {name:<28} {entry['status']} {entry['queries']:>4}q "
+                    f"{entry['wall_ms']['median']:>9.2f}ms {entry['peak_kb']:>9.1f}KB")
+    return report
+
+
+def latency_summary(latencies):
+    """Median and nearest-rank 95th percentile of ``latencies`` (ms)."""
+    latencies = sorted(latencies)
+    return {
+        'p50_ms': round(statistics.median(latencies), 3) if latencies else 0,
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 3) if latencies else 0,
+    }
+
+
+@contextmanager
+def throwaway_database():
+    """
+    A test database in a temporary file for the duration of the block. Unlike
+    the in-memory default, every connection and forked process sees it.
+    """
+    fd, db_path = tempfile.mkstemp(suffix='.sqlite3')
+    os.close(fd)
+    connection.settings_dict['TEST']['NAME'] = db_path
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield db_path
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+
+def run_worker(command, mode, env, *args):
+    """
+    Run ``manage.py <command> --worker <mode> <args>`` in a fresh process
+    with ``env`` added to the environment, and return the JSON object it
+    prints last.
+    """
+    proc = subprocess.run(
+        [sys.executable, str(settings.BASE_DIR / 'manage.py'), command, '--worker', mode, *map(str, args)],
+        env=dict(os.environ, **env), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise CommandError(f"{mode} run failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
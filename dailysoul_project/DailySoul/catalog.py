@@ -0,0 +1,283 @@
+"""
+Streaming import and export of the Affirmation and LuckCard catalogs.
+
+A catalog is CSV or JSON Lines, one row per item:
+
+    affirmation:  text, category, image
+    luck_card:    message, image
+
+``image`` is optional and names a file relative to the catalog (or a member
+of the zip archive the catalog was packed in, next to ``catalog.csv`` /
+``catalog.jsonl``). Rows are read and written one at a time, so neither
+direction holds the whole catalog in memory.
+"""
+import csv
+import io
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.files.base import ContentFile
+from django.db import connections
+from PIL import Image
+
+from .categories import category_for_name
+from .db import init_worker_process
+from .images import generate_variants
+from .models import Affirmation, LuckCard, text_hash
+from .selection import affirmation_pool, luck_card_pool
+
+FORMATS = ('csv', 'jsonl', 'zip')
+BATCH_SIZE = 1000
+
+# kind -> (model, text field, {exported column: ORM lookup})
+KINDS = {
+    'affirmation': (Affirmation, 'text', {'text': 'text', 'category': 'category__name', 'image': 'image'}),
+    'luck_card': (LuckCard, 'message', {'message': 'message', 'image': 'image'}),
+}
+pools = {'affirmation': affirmation_pool, 'luck_card': luck_card_pool}
+
+
+class CatalogError(ValueError):
+    pass
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    if ext == 'ndjson':
+        return 'jsonl'
+    if ext not in FORMATS:
+        raise CatalogError(f"Can't tell the format of {path}; pass --format")
+    return ext
+
+
+def _csv_rows(fh):
+    yield from csv.DictReader(fh)
+
+
+def _jsonl_rows(fh):
+    for number, line in enumerate(fh, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                raise CatalogError(f"Line {number}: {exc}")
+
+
+def read_rows(path, fmt):
+    """Yield catalog rows as dicts, streaming from ``path``."""
+    if fmt == 'zip':
+        with zipfile.ZipFile(path) as archive:
+            names = set(archive.namelist())
+            inner = next((n for n in ('catalog.jsonl', 'catalog.csv') if n in names), None)
+            if inner is None:
+                raise CatalogError(f"{path} has no catalog.csv or catalog.jsonl")
+            with archive.open(inner) as raw:
+                fh = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+                yield from (_jsonl_rows(fh) if inner.endswith('.jsonl') else _csv_rows(fh))
+        return
+
+    with open(path, encoding='utf-8-sig', newline='') as fh:
+        yield from (_jsonl_rows(fh) if fmt == 'jsonl' else _csv_rows(fh))
+
+
+# Image work, run in the worker pool -----------------------------------------
+
+_archive = None
+
+
+def open_archive(source, fmt):
+    global _archive
+    _archive = zipfile.ZipFile(source) if fmt == 'zip' else None
+
+
+def init_image_worker(source, fmt):
+    init_worker_process()
+    open_archive(source, fmt)
+
+
+def _read_image(source, fmt, image):
+    if fmt == 'zip':
+        archive = _archive or zipfile.ZipFile(source)
+        return archive.read(image.lstrip('/'))
+    path = image if os.path.isabs(image) else os.path.join(os.path.dirname(os.path.abspath(source)), image)
+    with open(path, 'rb') as fh:
+        return fh.read()
+
+
+def store_image(kind, source, fmt, image):
+    """
+    Validate one catalog image, save it through the model's storage and build
+    its variants. Returns (stored name, variants), or (None, error message).
+    """
+    model = KINDS[kind][0]
+    try:
+        data = _read_image(source, fmt, image)
+        Image.open(io.BytesIO(data)).verify()
+    except (OSError, KeyError, SyntaxError, Image.DecompressionBombError) as exc:
+        return None, f"{image}: {exc}"
+
+    field = model._meta.get_field('image')
+    name = field.storage.save(field.generate_filename(None, os.path.basename(image)), ContentFile(data))
+    row = model(image=name)
+    try:
+        variants = generate_variants(row.image)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        variants = {}
+    return name, variants
+
+
+# Import / export -------------------------------------------------------------
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def import_catalog(kind, source, fmt, batch_size=BATCH_SIZE, workers=1, log=None):
+    """
+    Load ``source`` into the ``kind`` table in chunks of ``batch_size``.
+    Rows whose text hash is already in the table or earlier in the file are
+    skipped. Returns {'read', 'created', 'duplicates', 'invalid'}.
+    """
+    model, text_field, _ = KINDS[kind]
+    max_length = model._meta.get_field(text_field).max_length
+    stats = {'read': 0, 'created': 0, 'duplicates': 0, 'invalid': 0}
+    seen = set()
+    categories = {}
+
+    pool = None
+    if workers > 1:
+        connections.close_all()
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_image_worker, initargs=(source, fmt))
+    else:
+        open_archive(source, fmt)
+    try:
+        for chunk in _chunks(read_rows(source, fmt), batch_size):
+            stats['read'] += len(chunk)
+            fresh = {}
+            for row in chunk:
+                text = ' '.join(str(row.get(text_field) or '').split())
+                if not text or (max_length and len(text) > max_length):
+                    stats['invalid'] += 1
+                    if log:
+                        log(f"Skipping row without a valid {text_field}: {row!r:.80}")
+                    continue
+                digest = text_hash(text)
+                if digest in seen:
+                    stats['duplicates'] += 1
+                    continue
+                seen.add(digest)
+                fresh[digest] = (text, row)
+
+            existing = set(model.objects.filter(text_hash__in=list(fresh)).values_list('text_hash', flat=True))
+            stats['duplicates'] += len(existing)
+            items = [(digest, text, row) for digest, (text, row) in fresh.items() if digest not in existing]
+
+            images = [str(row.get('image') or '').strip() for _, _, row in items]
+            if kind == 'luck_card':
+                # A luck card is its image
+                stats['invalid'] += sum(1 for image in images if not image)
+                kept = [(item, image) for item, image in zip(items, images) if image]
+                items, images = [item for item, _ in kept], [image for _, image in kept]
+            # Rows sharing an image file only process it once
+            wanted = list(dict.fromkeys(image for image in images if image))
+            args = ([kind] * len(wanted), [source] * len(wanted), [fmt] * len(wanted), wanted)
+            stored = dict(zip(wanted, pool.map(store_image, *args) if pool else map(store_image, *args)))
+
+            objects = []
+            for (digest, text, row), image in zip(items, images):
+                name, variants = stored[image] if image else ('', {})
+                if image and name is None:
+                    stats['invalid'] += 1
+                    if log:
+                        log(f"Skipping row with a bad image: {variants}")
+                    continue
+                obj = model(text_hash=digest, image=name, image_variants=variants)
+                setattr(obj, text_field, text)
+                if kind == 'affirmation':
+                    obj.category = category_for_name(row.get('category'), categories)
+                objects.append(obj)
+
+            # ignore_conflicts silently skips rows whose text_hash arrived since
+            # the check (e.g. a concurrent import), so count what really landed
+            hashes = [obj.text_hash for obj in objects]
+            before = model.objects.filter(text_hash__in=hashes).count()
+            model.objects.bulk_create(objects, ignore_conflicts=True)
+            created = model.objects.filter(text_hash__in=hashes).count() - before
+            stats['created'] += created
+            stats['duplicates'] += len(objects) - created
+            if log:
+                log(f"{stats['read']} rows read, {stats['created']} created")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        # bulk_create sends no post_save, so refresh the random pools here
+        pools[kind].invalidate()
+
+    return stats
+
+
+def export_rows(kind):
+    """Yield the ``kind`` table as catalog rows, a chunk of rows at a time."""
+    model, _, columns = KINDS[kind]
+    for values in model.objects.order_by('pk').values_list(*columns.values()).iterator(chunk_size=2000):
+        yield {column: value or '' for column, value in zip(columns, values)}
+
+
+def write_rows(rows, fh, fmt, columns):
+    if fmt == 'csv':
+        writer = csv.DictWriter(fh, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        for row in rows:
+            fh.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+def export_catalog(kind, fh, fmt):
+    """Stream the ``kind`` table to the open text file ``fh`` as CSV or JSONL. Returns the row count."""
+    count = 0
+
+    def counted():
+        nonlocal count
+        for row in export_rows(kind):
+            count += 1
+            yield row
+
+    write_rows(counted(), fh, fmt, list(KINDS[kind][2]))
+    return count
+
+
+def export_catalog_zip(kind, path):
+    """
+    Write ``catalog.jsonl`` plus every referenced image into a zip at ``path``.
+    Images keep their storage names, so the archive imports back as is.
+    """
+    model = KINDS[kind][0]
+    storage = model._meta.get_field('image').storage
+    count = 0
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('catalog.jsonl', 'w') as raw:
+            fh = io.TextIOWrapper(raw, encoding='utf-8')
+            for row in export_rows(kind):
+                fh.write(json.dumps(row, ensure_ascii=False) + '\n')
+                count += 1
+            fh.flush()
+            fh.detach()
+
+        # Second pass over names only; images are stored, not deflated again
+        written = set()
+        for name in model.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True).iterator():
+            if name in written or not storage.exists(name):
+                continue
+            written.add(name)
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            with storage.open(name, 'rb') as src, archive.open(info, 'w') as dest:
+                for chunk in iter(lambda: src.read(64 * 1024), b''):
+                    dest.write(chunk)
+    return count
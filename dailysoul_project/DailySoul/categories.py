@@ -0,0 +1,147 @@
+"""
+Category-filtered and weighted affirmation draws.
+
+Each category gets its own RandomPool over ``category__slug``; the pools
+share the Affirmation version, so the signals that refresh the main pool
+refresh them too. Requested categories are slugified and matched against
+the existing slugs first, so ``Calm`` finds ``calm`` and made-up names never
+get a pool of their own.
+"""
+import random
+import time
+from functools import lru_cache
+
+from .models import Affirmation, Category, category_slug
+from .selection import RandomPool, affirmation_pool
+
+MAX_MIX_CATEGORIES = 10
+MAX_MIX_WEIGHT = 100
+
+
+@lru_cache(maxsize=256)
+def category_pool(slug):
+    return RandomPool(Affirmation, filters={'category__slug': slug}, related=('category',))
+
+
+class CategorySlugs:
+    """
+    Every Category slug, held per process like a RandomPool's id list and
+    reloaded when the Affirmation version changes (Category signals bump it).
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._state = None  # (version, loaded_at, slugs)
+
+    def _is_stale(self, version):
+        state = self._state
+        return state is None or state[0] != version or time.monotonic() - state[1] > self.pool.timeout
+
+    def get(self):
+        version = self.pool.version()
+        if self._is_stale(version):
+            slugs = frozenset(Category.objects.values_list('slug', flat=True))
+            self._state = (version, time.monotonic(), slugs)
+        return self._state[2]
+
+    async def aget(self):
+        version = await self.pool.aversion()
+        if self._is_stale(version):
+            slugs = frozenset([slug async for slug in Category.objects.values_list('slug', flat=True)])
+            self._state = (version, time.monotonic(), slugs)
+        return self._state[2]
+
+
+category_slugs = CategorySlugs(affirmation_pool)
+
+
+def category_for_name(name, known=None):
+    """
+    The Category called ``name`` (matched by slug), created if missing.
+    ``known`` is an optional dict cache of slug -> Category for bulk callers.
+    """
+    name = ' '.join(str(name or '').split())
+    if not name:
+        return None
+    slug = category_slug(name)
+    if known is not None and slug in known:
+        return known[slug]
+    category, _ = Category.objects.get_or_create(slug=slug, defaults={'name': name})
+    if known is not None:
+        known[slug] = category
+    return category
+
+
+def parse_mix(value):
+    """
+    Parse ``calm:3,gratitude:1`` into [(slug, weight)]. A category without
+    a weight counts 1. Raises ValueError on malformed input.
+    """
+    weights = {}
+    for part in value.split(','):
+        slug, _, weight = part.strip().partition(':')
+        if not slug:
+            continue
+        try:
+            weight = int(weight) if weight else 1
+        except ValueError:
+            raise ValueError(f"Invalid weight for {slug!r}")
+        if not 0 < weight <= MAX_MIX_WEIGHT:
+            raise ValueError(f"Weights must be between 1 and {MAX_MIX_WEIGHT}")
+        weights[slug] = weight
+    if not weights:
+        raise ValueError("mix needs at least one category")
+    if len(weights) > MAX_MIX_CATEGORIES:
+        raise ValueError(f"mix takes at most {MAX_MIX_CATEGORIES} categories")
+    return list(weights.items())
+
+
+def requested_slugs(category=None, mix=None):
+    """
+    [(name, weight)] asked for by a draw request, or None for the whole
+    catalog. Raises ValueError for bad input.
+    """
+    if category and mix:
+        raise ValueError("Use either category or mix, not both")
+    if mix:
+        return parse_mix(mix)
+    if category:
+        return [(category, 1)]
+    return None
+
+
+def draw_pools(requested, known):
+    """
+    [(pool, weight)] for the ``requested_slugs()`` result. Names are
+    slugified, and ones that match no slug in ``known`` are dropped.
+    """
+    if requested is None:
+        return [(affirmation_pool, 1)]
+    weighted = ((category_slug(name), weight) for name, weight in requested)
+    return [(category_pool(slug), weight) for slug, weight in weighted if slug in known]
+
+
+def pick_pool(weighted_sizes):
+    """
+    Choose a pool from [(pool, weight, size)] by weight, skipping empty ones.
+    None when every pool is empty.
+    """
+    candidates = [(pool, weight) for pool, weight, size in weighted_sizes if size]
+    if not candidates:
+        return None
+    pools, weights = zip(*candidates)
+    return random.choices(pools, weights=weights)[0]
+
+
+def draw(category=None, mix=None):
+    requested = requested_slugs(category, mix)
+    known = category_slugs.get() if requested else ()
+    pool = pick_pool([(p, w, len(p.ids())) for p, w in draw_pools(requested, known)])
+    return pool.choice() if pool else None
+
+
+async def adraw(category=None, mix=None):
+    requested = requested_slugs(category, mix)
+    known = await category_slugs.aget() if requested else ()
+    pool = pick_pool([(p, w, len(await p.aids())) for p, w in draw_pools(requested, known)])
+    return await pool.achoice() if pool else None
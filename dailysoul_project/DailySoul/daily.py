@@ -0,0 +1,118 @@
+import datetime
+import random
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.utils import timezone
+
+from .models import Affirmation, DailyAffirmation, DailyPileDraw
+from .selection import affirmation_pool
+
+DAILY_AFFIRMATION_COUNT = 5
+
+# {% cache %} fragments showing the journal streak, keyed by user and day
+STREAK_FRAGMENTS = ('dashboard_streak', 'journal_streak')
+
+
+def get_daily_affirmations(user, date):
+    """
+    Return the user's affirmation set for ``date``.
+
+    Repeat visits read the stored set back with a single join query; the
+    set is sampled and saved on the first visit of the day, or on a later
+    one if it was saved empty (e.g. pregenerated before any affirmations
+    existed).
+    """
+    affirmations = list(
+        Affirmation.objects.filter(daily_users__user=user, daily_users__date=date)
+        .select_related('category').order_by('pk')
+    )
+    if affirmations:
+        return affirmations
+
+    daily_record, created = DailyAffirmation.objects.get_or_create(user=user, date=date)
+    if not created:
+        # Lost a creation race with a concurrent request
+        affirmations = list(daily_record.affirmations.select_related('category').order_by('pk'))
+        if affirmations:
+            return affirmations
+
+    affirmations = affirmation_pool.sample(DAILY_AFFIRMATION_COUNT)
+    daily_record.affirmations.set(affirmations)
+    return sorted(affirmations, key=lambda a: a.pk)
+
+
+def pregenerate_daily_rows(user_ids, date):
+    """
+    Create ``date``'s DailyAffirmation sets and empty DailyPileDraw rows for
+    ``user_ids`` in bulk. Users that already have rows are left untouched,
+    so the function is safe to re-run. Returns the number of new sets.
+    """
+    user_ids = list(user_ids)
+    pool_ids = affirmation_pool.ids()
+
+    have_set = set(
+        DailyAffirmation.objects.filter(date=date, user_id__in=user_ids).values_list('user_id', flat=True)
+    )
+    DailyAffirmation.objects.bulk_create(
+        [DailyAffirmation(user_id=uid, date=date) for uid in user_ids if uid not in have_set],
+        ignore_conflicts=True,
+    )
+
+    # bulk_create can't return ids together with ignore_conflicts, so read back
+    # the records that still have no affirmations attached
+    empty_records = DailyAffirmation.objects.filter(
+        date=date, user_id__in=user_ids, affirmations__isnull=True
+    ).values_list('pk', flat=True)
+    through = DailyAffirmation.affirmations.through
+    links = []
+    record_count = 0
+    for record_id in empty_records:
+        record_count += 1
+        for affirmation_id in random.sample(pool_ids, min(DAILY_AFFIRMATION_COUNT, len(pool_ids))):
+            links.append(through(dailyaffirmation_id=record_id, affirmation_id=affirmation_id))
+    through.objects.bulk_create(links, ignore_conflicts=True)
+
+    DailyPileDraw.objects.bulk_create(
+        [DailyPileDraw(user_id=uid, date=date, draw_count=0) for uid in user_ids],
+        ignore_conflicts=True,
+    )
+    return record_count
+
+
+def seconds_until_local_midnight():
+    """Seconds left in the current day in TIME_ZONE (at least 1)."""
+    now = timezone.localtime()
+    midnight = (now + datetime.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(1, int((midnight - now).total_seconds()))
+
+
+def fragment_context(date):
+    """Template context that per-user, per-day fragments are keyed and timed by."""
+    return {'fragment_day': date.isoformat(), 'fragment_timeout': seconds_until_local_midnight()}
+
+
+def invalidate_streak_fragments(user_id, date=None):
+    date = date or timezone.localdate()
+    cache.delete_many([make_template_fragment_key(name, [user_id, date.isoformat()]) for name in STREAK_FRAGMENTS])
+
+
+def pile_snapshot_key(user_id, date):
+    return f"dailysoul:piles:{user_id}:{date.isoformat()}"
+
+
+def cache_pile_snapshot(user_id, date, payload):
+    """Keep a finished day's pile payload until local midnight."""
+    cache.set(pile_snapshot_key(user_id, date), payload, seconds_until_local_midnight())
+
+
+def invalidate_pile_snapshot(user_id, date):
+    cache.delete(pile_snapshot_key(user_id, date))
+
+
+def get_pile_snapshot(user_id, date):
+    return cache.get(pile_snapshot_key(user_id, date))
+
+
+async def aget_pile_snapshot(user_id, date):
+    return await cache.aget(pile_snapshot_key(user_id, date))
@@ -0,0 +1,76 @@
+"""
+SQLite tuning for several worker processes sharing one database file.
+
+``configure_sqlite`` runs on every new connection and applies
+``DAILYSOUL_SQLITE_PRAGMAS``:
+- WAL, so readers never block the writer. This one persists in the database
+  file, so it is opt-in (``DAILYSOUL_SQLITE_WAL``, on in production).
+- synchronous=NORMAL, which is safe under WAL and much cheaper than FULL.
+- A busy timeout, so a writer waits for the lock instead of failing.
+- Larger mmap and page caches.
+
+Settings also open transactions with BEGIN IMMEDIATE, so a transaction takes
+the write lock up front rather than failing when a read turns into a write.
+
+``retry_on_locked`` wraps a whole write transaction. It runs it again, with
+jittered exponential backoff, if the lock is still busy after the timeout.
+"""
+import logging
+import random
+import time
+from functools import wraps
+
+import django
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+LOCKED_MESSAGES = ('database is locked', 'database table is locked', 'database is busy')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created receiver applying DAILYSOUL_SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'DAILYSOUL_SQLITE_PRAGMAS', {})
+    if pragmas:
+        with connection.cursor() as cursor:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked_error(exc):
+    return isinstance(exc, OperationalError) and any(m in str(exc).lower() for m in LOCKED_MESSAGES)
+
+
+def retry_on_locked(attempts=None, base_delay=0.02, max_delay=0.5, using=DEFAULT_DB_ALIAS):
+    """
+    Retry the decorated function when the database is locked. Wrap the whole
+    transaction: a failure inside an outer atomic block is re-raised, since
+    only the outermost caller can roll back and start over. ``attempts``
+    defaults to DAILYSOUL_DB_RETRY_ATTEMPTS.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            tries = attempts or getattr(settings, 'DAILYSOUL_DB_RETRY_ATTEMPTS', 1)
+            for attempt in range(1, tries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as exc:
+                    if attempt == tries or not is_locked_error(exc) or connections[using].in_atomic_block:
+                        raise
+                    delay = min(max_delay, base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                    logger.info("%s: database locked, retry %d/%d in %.0f ms",
+                                func.__qualname__, attempt, tries - 1, delay * 1000)
+                    time.sleep(delay)
+        return wrapper
+    return decorator
+
+
+def init_worker_process():
+    """ProcessPoolExecutor initializer for commands that fan out over processes."""
+    # Forked workers must not share the parent's database connections
+    django.setup()
+    connections.close_all()
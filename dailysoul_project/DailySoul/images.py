@@ -0,0 +1,120 @@
+"""
+Resized WebP variants of Affirmation and LuckCard images.
+
+Each upload gets a few downscaled copies in a ``variants`` folder next to
+the original (e.g. ``luck_cards/variants/``, named by content hash like the
+originals). The names are stored on the row in
+``image_variants`` as ``{'source': <original name>, 'widths': {'320': <name>}}``
+so pages and the API can pick the smallest copy that still covers the slot
+they draw the image in, instead of shipping the full-size upload.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = tuple(getattr(settings, 'DAILYSOUL_IMAGE_WIDTHS', (160, 320, 640)))
+VARIANT_QUALITY = getattr(settings, 'DAILYSOUL_IMAGE_QUALITY', 80)
+
+
+def variant_name(name, width):
+    folder, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return f"{folder}/variants/{stem}.{width}w.webp" if folder else f"variants/{stem}.{width}w.webp"
+
+
+def has_current_variants(instance):
+    variants = instance.image_variants or {}
+    return bool(instance.image) and variants.get('source') == instance.image.name and bool(variants.get('widths'))
+
+
+def generate_variants(field_file):
+    """
+    Write the WebP variants of ``field_file`` to its storage and return the
+    ``image_variants`` value describing them. Widths are capped at the
+    original's, so a small upload gets a full-size WebP copy as its largest
+    variant rather than nothing big enough.
+    """
+    storage = field_file.storage
+    with field_file.open('rb') as fh:
+        original = Image.open(fh)
+        original.load()
+    original = ImageOps.exif_transpose(original)
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+
+    widths = sorted({min(w, original.width) for w in VARIANT_WIDTHS})
+    names = {}
+    for width in widths:
+        height = max(1, round(original.height * width / original.width))
+        resized = original if width == original.width else original.resize((width, height), Image.LANCZOS)
+        buffer = BytesIO()
+        resized.save(buffer, 'WEBP', quality=VARIANT_QUALITY, method=6)
+
+        names[str(width)] = storage.save(variant_name(field_file.name, width), ContentFile(buffer.getvalue()))
+    return {'source': field_file.name, 'widths': names}
+
+
+def delete_stale_variants(model, previous, current):
+    """
+    Delete the files of ``previous`` variants that ``current`` no longer
+    lists. Names are content hashes, so identical images share their variant
+    files; a name another row still lists is kept.
+    """
+    stale = set((previous or {}).get('widths', {}).values()) - set(current.get('widths', {}).values())
+    storage = model._meta.get_field('image').storage
+    for name in stale:
+        if not model.objects.filter(image_variants__icontains=name).exists():
+            storage.delete(name)
+
+
+def refresh_variants(instance, force=False):
+    """
+    (Re)build the variants of one row when its image changed, and delete the
+    ones they replace. Saved with queryset.update() so post_save handlers
+    don't run again. Returns True when new variants were written.
+    """
+    if not instance.image or (has_current_variants(instance) and not force):
+        return False
+    try:
+        variants = generate_variants(instance.image)
+    except (OSError, ValueError):
+        logger.exception("Could not build image variants for %s %s", instance._meta.label, instance.pk)
+        return False
+    model = type(instance)
+    model.objects.filter(pk=instance.pk).update(image_variants=variants)
+    delete_stale_variants(model, instance.image_variants, variants)
+    instance.image_variants = variants
+    return True
+
+
+def pick_variant(instance, width):
+    """
+    URL of the smallest variant at least ``width`` pixels wide (the largest
+    one if none is), or of the original when there are no current variants.
+    """
+    if not instance.image:
+        return ''
+    if not has_current_variants(instance):
+        return instance.image.url
+    widths = sorted(instance.image_variants['widths'].items(), key=lambda item: int(item[0]))
+    name = next((n for w, n in widths if int(w) >= width), widths[-1][1])
+    return instance.image.storage.url(name)
+
+
+def variant_srcset(instance, build_url=None):
+    """
+    ``srcset`` value listing every variant, or '' without current variants.
+    ``build_url`` can turn each URL into an absolute one.
+    """
+    if not has_current_variants(instance):
+        return ''
+    storage = instance.image.storage
+    build_url = build_url or (lambda url: url)
+    widths = sorted(instance.image_variants['widths'].items(), key=lambda item: int(item[0]))
+    return ', '.join(f"{build_url(storage.url(name))} {w}w" for w, name in widths)
@@ -0,0 +1,171 @@
+"""
+Per-request performance instrumentation.
+
+``PerformanceMiddleware`` times every request and, through a database
+execute wrapper, counts its queries and their total SQL time. It logs
+slow queries, slow requests and likely N+1 patterns (the same SQL run
+over and over in one request) to the ``DailySoul.instrumentation``
+logger. It also keeps a rolling window of samples per view, which the
+staff-only ``api_performance`` endpoint reports as percentiles.
+
+The window is in-process: with several workers each reports its own
+traffic. With ``DAILYSOUL_SERVER_TIMING`` on (the default under DEBUG),
+responses carry a Server-Timing header that the browser's network panel
+shows.
+"""
+import logging
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+WINDOW = 500
+PERCENTILES = (50, 95, 99)
+
+_current = ContextVar('dailysoul_request_stats', default=None)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class RequestStats:
+    """Queries seen while handling one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.statements = Counter()
+
+    def add(self, sql, seconds):
+        self.queries += 1
+        self.sql_seconds += seconds
+        self.statements[sql] += 1
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection; a no-op outside requests."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        stats.add(sql, elapsed)
+        if elapsed * 1000 >= _setting('DAILYSOUL_SLOW_QUERY_MS', 100):
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, sql)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver; wrappers live as long as the connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class PerformanceWindow:
+    """Rolling (wall ms, queries, SQL ms) samples per view, WINDOW deep."""
+
+    def __init__(self, size=WINDOW):
+        self.size = size
+        self._samples = defaultdict(lambda: deque(maxlen=self.size))
+        self._lock = threading.Lock()
+
+    def add(self, view, wall_ms, queries, sql_ms):
+        with self._lock:
+            self._samples[view].append((wall_ms, queries, sql_ms))
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        with self._lock:
+            snapshot = {view: list(samples) for view, samples in self._samples.items()}
+        return {
+            view: {
+                'samples': len(samples),
+                'wall_ms': percentiles([s[0] for s in samples]),
+                'queries': percentiles([s[1] for s in samples]),
+                'sql_ms': percentiles([s[2] for s in samples]),
+            }
+            for view, samples in sorted(snapshot.items())
+        }
+
+
+def percentiles(values):
+    """Nearest-rank percentiles of ``values`` plus the max."""
+    ordered = sorted(values)
+    result = {
+        f'p{p}': round(ordered[max(0, -(-p * len(ordered) // 100) - 1)], 2)
+        for p in PERCENTILES
+    }
+    result['max'] = round(ordered[-1], 2)
+    return result
+
+
+performance_window = PerformanceWindow()
+
+
+class PerformanceMiddleware:
+    """Outermost middleware, so its timings cover the whole stack."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token, started = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        stats, token, started = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats, started)
+
+    def _start(self):
+        stats = RequestStats()
+        return stats, _current.set(stats), time.perf_counter()
+
+    def _finish(self, request, response, stats, started):
+        wall_ms = (time.perf_counter() - started) * 1000
+        sql_ms = stats.sql_seconds * 1000
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match._func_path) if match else 'unresolved'
+        performance_window.add(view, wall_ms, stats.queries, sql_ms)
+
+        threshold = _setting('DAILYSOUL_DUPLICATE_QUERY_THRESHOLD', 5)
+        for sql, count in stats.statements.most_common():
+            if count < threshold:
+                break
+            logger.warning("Possible N+1 in %s: the same query ran %d times: %s", view, count, sql)
+        if wall_ms >= _setting('DAILYSOUL_SLOW_REQUEST_MS', 500):
+            logger.warning("Slow request %s %s (%s): %.1f ms, %d queries, %.1f ms SQL",
+                           request.method, request.path, view, wall_ms, stats.queries, sql_ms)
+        else:
+            logger.debug("%s %s (%s): %.1f ms, %d queries, %.1f ms SQL",
+                         request.method, request.path, view, wall_ms, stats.queries, sql_ms)
+
+        if _setting('DAILYSOUL_SERVER_TIMING', settings.DEBUG):
+            response['Server-Timing'] = (
+                f'app;dur={wall_ms:.1f}, db;dur={sql_ms:.1f};desc="{stats.queries} queries"'
+            )
+        return response
@@ -0,0 +1,182 @@
+import hashlib
+import json
+from datetime import datetime, time, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import GameScore
+from .routers import is_replica
+from .scores import score_buffer
+from .versions import aget_version, get_version, reset_version
+
+LEADERBOARD_SIZE = 10
+# Seconds a board is served before it is reloaded from the score table
+LEADERBOARD_TIMEOUT = 60
+PERIODS = ('daily', 'weekly', 'all_time')
+
+
+def period_window(period, now=None):
+    """
+    (window id, start) of the current ``period`` in TIME_ZONE. Daily and
+    weekly boards are keyed by their window, so they roll over by themselves.
+    """
+    if period == 'all_time':
+        return 'all', None
+    today = timezone.localdate(now)
+    if period == 'daily':
+        first_day = today
+    elif period == 'weekly':
+        first_day = today - timedelta(days=today.weekday())
+    else:
+        raise ValueError(f"Unknown leaderboard period: {period}")
+    start = timezone.make_aware(datetime.combine(first_day, time.min))
+    return first_day.isoformat(), start
+
+
+def score_identity(score):
+    """Tells the same submission apart from others, before and after it is saved."""
+    return f"{score.created_at.isoformat()}|{score.player_name}|{score.score}"
+
+
+class Leaderboard:
+    """
+    Daily, weekly and all-time top-N boards for one game, kept in the cache.
+
+    A board is read from the score index and then updated in place when a
+    new score beats its cutoff. Each board carries a content hash and the
+    time of its newest entry, which the views use as ETag and Last-Modified.
+    It also lists which scores its entries are, so a score that a load
+    already picked up from the buffer isn't folded in a second time.
+
+    Boards are stored under a version number, like RandomPool's id lists.
+    An update writes the next version with cache.add, so two scores
+    recorded at once can't overwrite each other. The loser just bumps the
+    version, and the next read reloads the board. ``timeout`` bounds how
+    long a board lives, so workers that don't share a cache pick up each
+    other's scores within that time.
+    """
+
+    def __init__(self, game, size=LEADERBOARD_SIZE, timeout=LEADERBOARD_TIMEOUT):
+        self.game = game
+        self.size = size
+        self.timeout = timeout
+
+    def _key(self, period, window):
+        return f"dailysoul:leaderboard:{self.game}:{period}:{window}"
+
+    def _board_key(self, period, window, version):
+        return f"{self._key(period, window)}:{version}"
+
+    def _version_key(self, period, window):
+        return f"{self._key(period, window)}:version"
+
+    def _version_timeout(self, start):
+        # Day-scoped versions die with their window; the all-time one is kept
+        return None if start is None else 8 * 24 * 3600
+
+    def _version(self, period, window, start):
+        return get_version(self._version_key(period, window), self._version_timeout(start))
+
+    async def _aversion(self, period, window, start):
+        return await aget_version(self._version_key(period, window), self._version_timeout(start))
+
+    def _reset(self, period, window, start):
+        """Move to a fresh version, so the next read reloads the board."""
+        reset_version(self._version_key(period, window), self._version_timeout(start))
+
+    def _pack(self, entries, scores, updated_at, provisional=False):
+        digest = hashlib.md5(json.dumps(entries, sort_keys=True).encode()).hexdigest()
+        return {
+            'entries': entries, 'scores': scores, 'etag': digest, 'updated_at': updated_at,
+            'provisional': provisional,
+        }
+
+    def _timeout(self, board):
+        if board.get('provisional'):
+            # Loaded from a replica, which can miss scores flushed just before;
+            # reload once the replicas have caught up
+            return min(self.timeout, getattr(settings, 'DAILYSOUL_REPLICA_STICKY_SECONDS', 10))
+        return self.timeout
+
+    def _load(self, start, window_updated_at):
+        scores = GameScore.objects.filter(game=self.game)
+        if start is not None:
+            scores = scores.filter(created_at__gte=start)
+        rows = list(scores.order_by('-score', 'created_at').only('player_name', 'score', 'created_at')[:self.size])
+        # Scores still sitting in the buffer aren't in the table yet
+        rows += [s for s in score_buffer.pending(self.game) if start is None or s.created_at >= start]
+        rows.sort(key=lambda s: (-s.score, s.created_at))
+        rows = rows[:self.size]
+
+        entries = [{'player': s.player_name, 'score': s.score} for s in rows]
+        updated_at = max((s.created_at.timestamp() for s in rows), default=window_updated_at)
+        identities = [score_identity(s) for s in rows]
+        return self._pack(entries, identities, int(updated_at), provisional=is_replica(scores.db))
+
+    def board(self, period):
+        window, start = period_window(period)
+        key = self._board_key(period, window, self._version(period, window, start))
+        board = cache.get(key)
+        if board is None:
+            board = self._load(start, start.timestamp() if start else 0)
+            cache.set(key, board, self._timeout(board))
+        return board
+
+    async def aboard(self, period):
+        window, start = period_window(period)
+        board = await cache.aget(self._board_key(period, window, await self._aversion(period, window, start)))
+        if board is None:
+            board = await sync_to_async(self.board)(period)
+        return board
+
+    def _with_score(self, board, score):
+        """``board`` with ``score`` folded in, or None when it doesn't make the cut."""
+        entries, identities = list(board['entries']), list(board['scores'])
+        if score_identity(score) in identities:
+            # Already on the board: it was loaded from the buffer
+            return None
+        if len(entries) >= self.size and score.score <= entries[-1]['score']:
+            return None
+        # Equal scores keep submission order: the newcomer goes after them
+        position = next((i for i, e in enumerate(entries) if e['score'] < score.score), len(entries))
+        entries.insert(position, {'player': score.player_name, 'score': score.score})
+        identities.insert(position, score_identity(score))
+        return self._pack(
+            entries[:self.size], identities[:self.size], int(score.created_at.timestamp()),
+            board.get('provisional', False),
+        )
+
+    def record(self, score):
+        """Fold a new score into every period board it qualifies for."""
+        for period in PERIODS:
+            window, start = period_window(period, score.created_at)
+            version = self._version(period, window, start)
+            board = cache.get(self._board_key(period, window, version))
+            if board is None:
+                # Loaded on the next read, which picks this score up from the buffer
+                continue
+            updated = self._with_score(board, score)
+            if updated is None:
+                continue
+            if cache.add(self._board_key(period, window, version + 1), updated, self._timeout(updated)):
+                cache.set(self._version_key(period, window), version + 1, self._version_timeout(start))
+            else:
+                # A concurrent score took this version first
+                self._reset(period, window, start)
+
+
+leaderboards = {game: Leaderboard(game) for game, _ in GameScore.GAME_CHOICES}
+
+
+def record_score(score):
+    """Queue a GameScore for the batched write and update the boards."""
+    score_buffer.add(score)
+    leaderboards[score.game].record(score)
+
+
+async def arecord_score(score):
+    await score_buffer.aadd(score)
+    leaderboards[score.game].record(score)
@@ -0,0 +1,112 @@
+import argparse
+import json
+import multiprocessing
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from DailySoul import views
+from DailySoul.benchmarks import latency_summary, run_worker, throwaway_database
+from DailySoul.db import is_locked_error
+
+MODES = ('default', 'tuned')
+
+
+def _write_burst(user_id, transactions):
+    """
+    One worker process: alternate journal saves and death notes through the
+    same helpers the views use. Returns (latencies ms, locked errors).
+    """
+    connections.close_all()
+    user = User.objects.get(pk=user_id)
+    latencies, errors = [], 0
+    for i in range(transactions):
+        started = time.perf_counter()
+        try:
+            if i % 2:
+                views._create_death_note(user, f"Contention note {i}")
+            else:
+                views._save_journal_entry(user, None, f"Contention {i}", "Benchmark write under contention. " * 4)
+        except OperationalError as exc:
+            if not is_locked_error(exc):
+                raise
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    connections.close_all()
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure write throughput with several processes writing to one SQLite "
+        "file, first with SQLite's default journal settings and then with the "
+        "DailySoul tuning (WAL and the other pragmas, BEGIN IMMEDIATE, retries). "
+        "Each mode runs in its own process against a throwaway database file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8, help="Concurrent writer processes.")
+        parser.add_argument('--transactions', type=int, default=100, help="Write transactions per process.")
+        parser.add_argument('--mode', action='append', dest='modes', choices=MODES,
+                            help="Only this mode (repeatable). Default: both.")
+        parser.add_argument('--worker', choices=MODES, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1 or options['transactions'] < 1:
+            raise CommandError("--processes and --transactions must be positive.")
+        if options['worker']:
+            return self.run_worker(options)
+
+        results = []
+        for mode in options['modes'] or MODES:
+            result = run_worker(
+                'benchmark_sqlite_writes', mode,
+                {'DAILYSOUL_SQLITE_TUNING': '1' if mode == 'tuned' else '0',
+                 'DAILYSOUL_SQLITE_WAL': '1' if mode == 'tuned' else '0'},
+                '--processes', options['processes'], '--transactions', options['transactions'],
+            )
+            results.append(result)
+            self.stderr.write(
+                f"{mode:<8} {result['writes']:>6} writes {result['writes_per_second']:>8.1f} w/s "
+                f"p50 {result['p50_ms']:>8.2f}ms p95 {result['p95_ms']:>8.2f}ms {result['locked_errors']} locked"
+            )
+        self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+
+    def run_worker(self, options):
+        mode = options['worker']
+        if settings.DAILYSOUL_SQLITE_TUNING != (mode == 'tuned'):
+            raise CommandError("DAILYSOUL_SQLITE_TUNING does not match the requested mode.")
+        if connection.vendor != 'sqlite':
+            raise CommandError("This benchmark needs the SQLite backend.")
+
+        # One database file shared by all the writer processes
+        with throwaway_database():
+            user_ids = [
+                User.objects.create_user(f'writer{i}', f'writer{i}@example.com', 'writer-password').pk
+                for i in range(options['processes'])
+            ]
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal_mode = cursor.fetchone()[0]
+            connections.close_all()
+
+            started = time.perf_counter()
+            with multiprocessing.get_context('fork').Pool(options['processes']) as pool:
+                outcomes = pool.starmap(_write_burst, [(uid, options['transactions']) for uid in user_ids])
+            elapsed = time.perf_counter() - started
+
+        latencies = [ms for process_latencies, _ in outcomes for ms in process_latencies]
+        self.stdout.write(json.dumps({
+            'mode': mode,
+            'journal_mode': journal_mode,
+            'processes': options['processes'],
+            'writes': len(latencies),
+            'locked_errors': sum(errors for _, errors in outcomes),
+            'seconds': round(elapsed, 3),
+            'writes_per_second': round(len(latencies) / elapsed, 1) if elapsed else 0,
+            **latency_summary(latencies),
+        }))
@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from DailySoul.benchmarks import DEFAULT_SCALES, routes, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every DailySoul route (query count, wall time, peak memory) "
+        "at several data scales, against a throwaway test database, and write "
+        "a JSON report that can be diffed between commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales', default=','.join(str(s) for s in DEFAULT_SCALES),
+            help="Comma-separated row counts per table, e.g. 100,1000,100000.",
+        )
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per route, after one cold run.")
+        parser.add_argument('--route', action='append', dest='routes', help="Only this URL name (repeatable).")
+        parser.add_argument('--output', help="Write the JSON report here instead of stdout.")
+
+    def handle(self, *args, **options):
+        try:
+            scales = [int(s) for s in options['scales'].split(',') if s.strip()]
+        except ValueError:
+            raise CommandError(f"Invalid --scales: {options['scales']}")
+        unknown = set(options['routes'] or []) - set(routes())
+        if unknown:
+            raise CommandError(f"Unknown route(s): {', '.join(sorted(unknown))}")
+
+        log = self.stderr.write if options['verbosity'] > 0 else None
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            report = run_benchmarks(scales, max(1, options['repeat']), options['routes'], log)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        payload = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(payload + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(payload)
@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from DailySoul.catalog import FORMATS, KINDS, export_catalog, export_catalog_zip
+
+
+class Command(BaseCommand):
+    help = (
+        "Export affirmations or luck cards as a CSV, JSONL or zip catalog that "
+        "import_catalog can read back. Rows are streamed from the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(KINDS), default='affirmation')
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument('--output', '-o', help="Output file; CSV and JSONL default to stdout.")
+
+    def handle(self, *args, **options):
+        kind, fmt, output = options['kind'], options['format'], options['output']
+        if fmt == 'zip':
+            if not output:
+                raise CommandError("--output is required for zip exports.")
+            count = export_catalog_zip(kind, output)
+        elif output:
+            with open(output, 'w', encoding='utf-8', newline='') as fh:
+                count = export_catalog(kind, fh, fmt)
+        else:
+            count = export_catalog(kind, sys.stdout, fmt)
+
+        self.stderr.write(self.style.SUCCESS(f"Exported {count} rows"))
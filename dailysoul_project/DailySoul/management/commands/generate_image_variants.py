@@ -0,0 +1,53 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from DailySoul.db import init_worker_process
+from DailySoul.images import refresh_variants
+
+MODELS = ('Affirmation', 'LuckCard')
+
+
+def _run_chunk(model_name, pks, force):
+    model = apps.get_model('DailySoul', model_name)
+    return sum(refresh_variants(row, force=force) for row in model.objects.filter(pk__in=pks))
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the resized WebP variants of Affirmation and LuckCard images "
+        "(new uploads get them on save). Use it after changing "
+        "DAILYSOUL_IMAGE_WIDTHS or for rows imported without signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='models', choices=MODELS,
+                            help="Only this model (repeatable). Default: both.")
+        parser.add_argument('--force', action='store_true', help="Rebuild variants that are already current.")
+        parser.add_argument('--chunk-size', type=int, default=50, help="Rows per task.")
+        parser.add_argument('--workers', type=int, default=1, help="Process pool size; 1 runs inline.")
+
+    def handle(self, *args, **options):
+        size = max(1, options['chunk_size'])
+        tasks = []
+        for model_name in options['models'] or MODELS:
+            model = apps.get_model('DailySoul', model_name)
+            pks = list(model.objects.exclude(image='').exclude(image__isnull=True)
+                       .order_by('pk').values_list('pk', flat=True))
+            tasks += [(model_name, pks[i:i + size]) for i in range(0, len(pks), size)]
+
+        names = [name for name, _ in tasks]
+        chunks = [pks for _, pks in tasks]
+        forces = [options['force']] * len(tasks)
+        if options['workers'] > 1 and len(tasks) > 1:
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker_process) as pool:
+                built = sum(pool.map(_run_chunk, names, chunks, forces))
+        else:
+            built = sum(map(_run_chunk, names, chunks, forces))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Built image variants for {built} of {sum(len(c) for c in chunks)} images"
+        ))
@@ -0,0 +1,39 @@
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from DailySoul.models import Affirmation, LuckCard
+from DailySoul.storage import is_hashed_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy Affirmation and LuckCard images uploaded before content hashing "
+        "to hashed names, so they get immutable cache headers too. The old "
+        "files are left in place for anything still linking to them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be renamed.")
+
+    def handle(self, *args, **options):
+        renamed = missing = 0
+        for model in (Affirmation, LuckCard):
+            for row in model.objects.exclude(image='').exclude(image__isnull=True).iterator():
+                old_name = row.image.name
+                if is_hashed_name(old_name):
+                    continue
+                if not row.image.storage.exists(old_name):
+                    self.stderr.write(f"{model.__name__} {row.pk}: {old_name} is missing")
+                    missing += 1
+                    continue
+                if not options['dry_run']:
+                    with row.image.storage.open(old_name, 'rb') as fh:
+                        row.image.save(old_name.rsplit('/', 1)[-1], File(fh), save=False)
+                    # post_save rebuilds the image variants under the new name
+                    row.save(update_fields=['image'])
+                self.stdout.write(f"{model.__name__} {row.pk}: {old_name} -> {row.image.name}")
+                renamed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would rename' if options['dry_run'] else 'Renamed'} {renamed} images ({missing} missing)"
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from DailySoul.catalog import BATCH_SIZE, FORMATS, KINDS, CatalogError, detect_format, import_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Import affirmations or luck cards from a CSV, JSONL or zip catalog "
+        "(see DailySoul/catalog.py for the columns). Texts already in the "
+        "table are skipped; images are stored and resized in a worker pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Catalog file.")
+        parser.add_argument('--kind', choices=sorted(KINDS), default='affirmation')
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Rows per bulk_create.")
+        parser.add_argument('--workers', type=int, default=1, help="Image process pool size; 1 runs inline.")
+
+    def handle(self, *args, **options):
+        log = self.stderr.write if options['verbosity'] > 1 else None
+        try:
+            fmt = options['format'] or detect_format(options['path'])
+            stats = import_catalog(
+                options['kind'], options['path'], fmt,
+                batch_size=max(1, options['batch_size']), workers=options['workers'], log=log,
+            )
+        except (OSError, CatalogError) as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {stats['read']} rows: {stats['created']} created, "
+            f"{stats['duplicates']} duplicates, {stats['invalid']} invalid"
+        ))
@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from DailySoul.benchmarks import REQUESTS, latency_summary, run_worker, seed, throwaway_database
+from DailySoul.scores import score_buffer
+
+# The JSON endpoints that have an async implementation
+ROUTES = ('draw_affirmation', 'api_get_piles', 'save_bubble_score', 'get_bubble_high_scores')
+MODES = ('sync', 'async')
+
+
+def _summary(mode, latencies, errors, elapsed):
+    return {
+        'mode': mode,
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0,
+        **latency_summary(latencies),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the JSON API endpoints through Django's sync (WSGI) and "
+        "async (ASGI) request handlers and compare throughput. Each mode runs "
+        "in its own process against a throwaway database. This compares the "
+        "handlers in-process; put a real server (gunicorn / uvicorn) in front "
+        "for end-to-end numbers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400, help="Requests per mode.")
+        parser.add_argument('--concurrency', type=int, default=20,
+                            help="Simultaneous clients (threads for sync, tasks for async).")
+        parser.add_argument('--scale', type=int, default=1000, help="Catalog rows to seed.")
+        parser.add_argument('--mode', action='append', dest='modes', choices=MODES,
+                            help="Only this mode (repeatable). Default: both.")
+        parser.add_argument('--worker', choices=MODES, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+        if options['worker']:
+            return self.run_worker(options)
+
+        results = []
+        for mode in options['modes'] or MODES:
+            result = run_worker(
+                'loadtest_api', mode, {'DAILYSOUL_ASYNC_API': '1' if mode == 'async' else '0'},
+                '--requests', options['requests'], '--concurrency', options['concurrency'],
+                '--scale', options['scale'],
+            )
+            results.append(result)
+            self.stderr.write(
+                f"{mode:<6} {result['requests']:>6} req {result['rps']:>9.1f} req/s "
+                f"p50 {result['p50_ms']:>8.2f}ms p95 {result['p95_ms']:>8.2f}ms {result['errors']} errors"
+            )
+        self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+
+    def run_worker(self, options):
+        mode = options['worker']
+        if settings.DAILYSOUL_ASYNC_API != (mode == 'async'):
+            raise CommandError("DAILYSOUL_ASYNC_API does not match the requested mode.")
+
+        # Test clients talk to 'testserver', like they do under manage.py test
+        setup_test_environment()
+        # A file database, so concurrent connections see the same data
+        with throwaway_database():
+            users = [
+                User.objects.create_user(f'loadtest{i}', f'loadtest{i}@example.com', 'loadtest-password')
+                for i in range(options['concurrency'])
+            ]
+            seed(options['scale'], users[0])
+            plan = [ROUTES[i % len(ROUTES)] for i in range(options['requests'])]
+            run = self.run_async if mode == 'async' else self.run_sync
+            latencies, errors, elapsed = run(users, plan)
+            score_buffer.flush()
+        self.stdout.write(json.dumps(_summary(mode, latencies, errors, elapsed)))
+
+    def run_sync(self, users, plan):
+        clients = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            clients.append(client)
+
+        def call(index):
+            client = clients[index % len(clients)]
+            started = time.perf_counter()
+            response = self._send(client, plan[index])
+            return (time.perf_counter() - started) * 1000, response.status_code >= 400
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+            outcomes = list(pool.map(call, range(len(plan))))
+        elapsed = time.perf_counter() - started
+        return [ms for ms, _ in outcomes], sum(failed for _, failed in outcomes), elapsed
+
+    def run_async(self, users, plan):
+        clients = []
+        for user in users:
+            client = AsyncClient()
+            client.force_login(user)
+            clients.append(client)
+
+        async def call(index, semaphore):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await self._send(clients[index % len(clients)], plan[index])
+                return (time.perf_counter() - started) * 1000, response.status_code >= 400
+
+        async def main():
+            semaphore = asyncio.Semaphore(len(clients))
+            return await asyncio.gather(*(call(i, semaphore) for i in range(len(plan))))
+
+        started = time.perf_counter()
+        outcomes = asyncio.run(main())
+        elapsed = time.perf_counter() - started
+        return [ms for ms, _ in outcomes], sum(failed for _, failed in outcomes), elapsed
+
+    def _send(self, client, name):
+        method, kwargs = REQUESTS.get(name, ('get', {}))
+        return getattr(client, method)(reverse(name), **kwargs)
+
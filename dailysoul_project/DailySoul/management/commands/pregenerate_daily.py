@@ -0,0 +1,60 @@
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from DailySoul.daily import pregenerate_daily_rows
+from DailySoul.db import init_worker_process
+
+
+def _run_chunk(user_ids, date):
+    return pregenerate_daily_rows(user_ids, date)
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-generate DailyAffirmation and DailyPileDraw rows for active users, "
+        "so the dashboard and pile API only read at the midnight peak. "
+        "Run it nightly, e.g. from cron shortly before local midnight."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Target date (YYYY-MM-DD). Defaults to tomorrow in TIME_ZONE.")
+        parser.add_argument('--chunk-size', type=int, default=500, help="Users per bulk_create batch.")
+        parser.add_argument('--workers', type=int, default=1, help="Process pool size; 1 runs inline.")
+        parser.add_argument(
+            '--active-days', type=int, default=None,
+            help="Only include users who logged in within this many days.",
+        )
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                date = datetime.date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid --date: {options['date']}")
+        else:
+            date = timezone.localdate() + datetime.timedelta(days=1)
+
+        users = User.objects.filter(is_active=True)
+        if options['active_days'] is not None:
+            since = timezone.now() - datetime.timedelta(days=options['active_days'])
+            users = users.filter(last_login__gte=since)
+        user_ids = list(users.order_by('pk').values_list('pk', flat=True))
+
+        size = max(1, options['chunk_size'])
+        chunks = [user_ids[i:i + size] for i in range(0, len(user_ids), size)]
+
+        if options['workers'] > 1 and len(chunks) > 1:
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker_process) as pool:
+                created = sum(pool.map(_run_chunk, chunks, [date] * len(chunks)))
+        else:
+            created = sum(_run_chunk(chunk, date) for chunk in chunks)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Pre-generated {created} daily affirmation sets for {len(user_ids)} users on {date}"
+        ))
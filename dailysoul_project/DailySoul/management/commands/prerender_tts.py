@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from DailySoul.models import Affirmation
+from DailySoul.tts import audio_name, bump_audio_version, get_synthesizer, render_affirmation
+
+
+def _render(affirmation):
+    try:
+        return render_affirmation(affirmation, bump=False), None
+    except Exception as exc:
+        return False, f"Affirmation {affirmation.pk}: {exc}"
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = (
+        "Render speech for every affirmation whose audio is missing or out of "
+        "date (new or edited text, a different backend). Run it after imports "
+        "and from cron, so the dashboard never waits on synthesis. Synthesis "
+        "is mostly waiting on the backend, so --workers uses threads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Concurrent synthesis threads.")
+        parser.add_argument('--limit', type=int, default=None, help="Render at most this many affirmations.")
+
+    def handle(self, *args, **options):
+        synthesizer = get_synthesizer()
+        try:
+            synthesizer.check()
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc))
+        # Read the whole list before rendering: on SQLite an open read cursor
+        # would block the workers' UPDATEs
+        pending = list(islice(
+            (
+                affirmation
+                for affirmation in Affirmation.objects.only('pk', 'text', 'audio').order_by('pk')
+                if affirmation.audio != audio_name(affirmation.text, synthesizer)
+            ),
+            options['limit'],
+        ))
+
+        rendered = failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            for changed, error in pool.map(_render, pending):
+                if error:
+                    failed += 1
+                    self.stderr.write(error)
+                elif changed:
+                    rendered += 1
+        if rendered:
+            # Once for the whole run, not once per clip
+            bump_audio_version()
+
+        style = self.style.SUCCESS if not failed else self.style.WARNING
+        self.stdout.write(style(
+            f"Rendered audio for {rendered} affirmations with {synthesizer.name} ({failed} failed)"
+        ))
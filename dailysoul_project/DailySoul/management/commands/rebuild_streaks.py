@@ -0,0 +1,19 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from DailySoul.streaks import rebuild_streak
+
+
+class Command(BaseCommand):
+    help = "Rebuild JournalStreak records from journal history (repairs drifted counters)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help="Only rebuild this user id (repeatable).")
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids'] or User.objects.order_by('pk').values_list('pk', flat=True).iterator()
+        count = 0
+        for user_id in user_ids:
+            rebuild_streak(user_id)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt journal streaks for {count} users"))
@@ -0,0 +1,38 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into every DAILYSOUL_READ_REPLICAS file "
+        "with SQLite's online backup. Meant for trying the replica routing locally; "
+        "production replicas are kept in sync by a replication tool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--replica', action='append', dest='aliases', help="Only this replica alias (repeatable).")
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or settings.DAILYSOUL_READ_REPLICAS
+        if not aliases:
+            raise CommandError("No read replicas configured; set DAILYSOUL_READ_REPLICAS.")
+        unknown = set(aliases) - set(settings.DAILYSOUL_READ_REPLICAS)
+        if unknown:
+            raise CommandError(f"Not a configured replica: {', '.join(sorted(unknown))}")
+
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError("sync_replicas only copies SQLite databases.")
+        primary.ensure_connection()
+        for alias in aliases:
+            # Raw connection, so the copy doesn't go through the router
+            target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(f"{alias}: copied from {primary.settings_dict['NAME']}")
+        self.stdout.write(self.style.SUCCESS(f"Synced {len(aliases)} replica(s)"))
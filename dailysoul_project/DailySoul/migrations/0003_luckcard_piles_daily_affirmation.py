@@ -0,0 +1,111 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Tables this migration creates. The committed db.sqlite3 predates the
+# migration files in this repo: it already has them, recorded under its old
+# migration names (0003_luckmessage_dailyaffirmation ... 0013_delete_profile)
+LEGACY_TABLES = {
+    'DailySoul_luckcard', 'DailySoul_dailypiledraw', 'DailySoul_pilecardselection', 'DailySoul_dailyaffirmation',
+}
+
+OPERATIONS = [
+    migrations.CreateModel(
+        name='LuckCard',
+        fields=[
+            ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ('image', models.ImageField(upload_to='luck_cards/')),
+            ('message', models.CharField(max_length=200)),
+            ('created_at', models.DateTimeField(auto_now_add=True)),
+        ],
+    ),
+    migrations.AddField(
+        model_name='deathnoteentry',
+        name='mood',
+        field=models.CharField(blank=True, max_length=100, null=True),
+    ),
+    migrations.AlterField(
+        model_name='affirmation',
+        name='category',
+        field=models.CharField(blank=True, max_length=100, null=True),
+    ),
+    migrations.AlterField(
+        model_name='affirmation',
+        name='created_at',
+        field=models.DateTimeField(auto_now_add=True),
+    ),
+    migrations.AlterField(
+        model_name='affirmation',
+        name='image',
+        field=models.ImageField(blank=True, help_text='Optional: upload a thumbnail for this affirmation', null=True, upload_to='affirmations/'),
+    ),
+    migrations.CreateModel(
+        name='DailyPileDraw',
+        fields=[
+            ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ('date', models.DateField(default=django.utils.timezone.now)),
+            ('draw_count', models.IntegerField(default=0)),
+            ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+        ],
+    ),
+    migrations.CreateModel(
+        name='PileCardSelection',
+        fields=[
+            ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ('position', models.IntegerField(choices=[(1, 'Position 1'), (2, 'Position 2'), (3, 'Position 3')])),
+            ('card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='DailySoul.luckcard')),
+            ('daily_draw', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='DailySoul.dailypiledraw')),
+        ],
+        options={
+            'unique_together': {('daily_draw', 'position')},
+        },
+    ),
+    migrations.AddField(
+        model_name='dailypiledraw',
+        name='cards',
+        field=models.ManyToManyField(through='DailySoul.PileCardSelection', to='DailySoul.luckcard'),
+    ),
+    migrations.CreateModel(
+        name='DailyAffirmation',
+        fields=[
+            ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ('date', models.DateField()),
+            ('created_at', models.DateTimeField(auto_now_add=True)),
+            ('affirmations', models.ManyToManyField(related_name='daily_users', to='DailySoul.affirmation')),
+            ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_affirmations', to=settings.AUTH_USER_MODEL)),
+        ],
+        options={
+            'ordering': ['-date'],
+            'unique_together': {('user', 'date')},
+        },
+    ),
+    migrations.AlterUniqueTogether(
+        name='dailypiledraw',
+        unique_together={('user', 'date')},
+    ),
+]
+
+
+class CreateUnlessPresent(migrations.SeparateDatabaseAndState):
+    """Always update the state; only touch the schema if it isn't there yet."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if LEGACY_TABLES <= set(schema_editor.connection.introspection.table_names()):
+            return
+        super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('DailySoul', '0002_affirmation_created_at_affirmation_image_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        CreateUnlessPresent(state_operations=OPERATIONS, database_operations=OPERATIONS),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('DailySoul', '0004_journalstreak'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deathnoteentry',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='deathnote_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='journal_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('DailySoul', '0006_drop_redundant_user_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_name', models.CharField(max_length=50)),
+                ('game', models.CharField(choices=[('bubble_pop', 'Bubble Pop'), ('memory_match', 'Memory Match')], max_length=30)),
+                ('score', models.PositiveIntegerField()),
+                ('details', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['game', '-score', 'created_at'], name='gamescore_leaderboard_idx')],
+            },
+        ),
+    ]
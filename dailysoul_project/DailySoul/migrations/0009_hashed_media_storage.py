@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:51
+
+import DailySoul.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('DailySoul', '0008_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='affirmation',
+            name='image',
+            field=models.ImageField(blank=True, help_text='Optional: upload a thumbnail for this affirmation', null=True, storage=DailySoul.storage.HashedMediaStorage(), upload_to='affirmations/'),
+        ),
+        migrations.AlterField(
+            model_name='luckcard',
+            name='image',
+            field=models.ImageField(storage=DailySoul.storage.HashedMediaStorage(), upload_to='luck_cards/'),
+        ),
+    ]
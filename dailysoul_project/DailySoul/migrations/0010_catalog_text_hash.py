@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:53
+
+import hashlib
+import unicodedata
+
+from django.db import migrations, models
+
+
+def text_hash(text):
+    normalized = ' '.join(unicodedata.normalize('NFC', text or '').split()).casefold()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def fill_text_hashes(apps, schema_editor):
+    # Existing duplicates keep a NULL hash; only the oldest row claims it
+    for model_name, field in (('Affirmation', 'text'), ('LuckCard', 'message')):
+        model = apps.get_model('DailySoul', model_name)
+        seen = set()
+        for row in model.objects.order_by('pk').iterator():
+            digest = text_hash(getattr(row, field))
+            if digest in seen:
+                continue
+            seen.add(digest)
+            model.objects.filter(pk=row.pk).update(text_hash=digest)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('DailySoul', '0009_hashed_media_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='affirmation',
+            name='text_hash',
+            field=models.CharField(editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='luckcard',
+            name='text_hash',
+            field=models.CharField(editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(fill_text_hashes, migrations.RunPython.noop),
+    ]
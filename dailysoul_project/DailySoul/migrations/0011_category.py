@@ -0,0 +1,71 @@
+import hashlib
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def category_slug(name):
+    if slugify(name, allow_unicode=True):
+        return slugify(name, allow_unicode=True)
+    normalized = ' '.join(unicodedata.normalize('NFC', name).split()).casefold()
+    return f"category-{hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:8]}"
+
+
+def move_categories(apps, schema_editor):
+    Affirmation = apps.get_model('DailySoul', 'Affirmation')
+    Category = apps.get_model('DailySoul', 'Category')
+    names = (
+        Affirmation.objects.exclude(category_name__isnull=True).exclude(category_name='')
+        .values_list('category_name', flat=True).distinct()
+    )
+    for name in names:
+        clean = ' '.join(name.split())
+        category = Category.objects.filter(slug=category_slug(clean)).first()
+        if category is None:
+            category = Category.objects.create(name=clean, slug=category_slug(clean))
+        Affirmation.objects.filter(category_name=name).update(category=category)
+
+
+def restore_category_names(apps, schema_editor):
+    Affirmation = apps.get_model('DailySoul', 'Affirmation')
+    for category_id, name in apps.get_model('DailySoul', 'Category').objects.values_list('pk', 'name'):
+        Affirmation.objects.filter(category_id=category_id).update(category_name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('DailySoul', '0010_catalog_text_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('slug', models.SlugField(allow_unicode=True, max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'categories',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RenameField(
+            model_name='affirmation',
+            old_name='category',
+            new_name='category_name',
+        ),
+        migrations.AddField(
+            model_name='affirmation',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='affirmations', to='DailySoul.category'),
+        ),
+        migrations.RunPython(move_categories, restore_category_names),
+        migrations.RemoveField(
+            model_name='affirmation',
+            name='category_name',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('DailySoul', '0011_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='affirmation',
+            name='audio',
+            field=models.CharField(blank=True, editable=False, max_length=80),
+        ),
+    ]
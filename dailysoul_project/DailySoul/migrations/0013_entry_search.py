@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# unicode61 splits on anything outside its token categories; adding M* keeps
+# Burmese vowel signs and other combining marks inside their words
+TOKENIZE = "unicode61 remove_diacritics 2 categories 'L* N* Co M*'"
+
+INDEXES = (
+    ('DailySoul_journalentry', ('title', 'content')),
+    ('DailySoul_deathnoteentry', ('content',)),
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    # FTS5 is SQLite only; search.py scans the entry tables elsewhere
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, columns in INDEXES:
+        values = ', '.join(f"COALESCE({column}, '')" for column in columns)
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE "{table}_fts" USING fts5(owner, {", ".join(columns)}, tokenize="{TOKENIZE}")'
+        )
+        schema_editor.execute(
+            f'INSERT INTO "{table}_fts" (rowid, owner, {", ".join(columns)}) '
+            f'SELECT id, \'u\' || user_id, {values} FROM "{table}"'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, _ in INDEXES:
+        schema_editor.execute(f'DROP TABLE IF EXISTS "{table}_fts"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('DailySoul', '0012_affirmation_audio'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
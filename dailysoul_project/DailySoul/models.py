@@ -1,4 +1,9 @@
+import hashlib
+import unicodedata
+
+from django.core.exceptions import ValidationError
 from django.utils import timezone
+from django.utils.text import slugify
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -10,28 +15,91 @@ from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from .storage import hashed_media_storage
+
+
+def text_hash(text):
+    """Hash of ``text`` ignoring case, Unicode form and whitespace runs; used to dedupe the catalog."""
+    normalized = ' '.join(unicodedata.normalize('NFC', text or '').split()).casefold()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class Category(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    # Used in ?category= / ?mix= on the draw API
+    slug = models.SlugField(max_length=100, unique=True, allow_unicode=True)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = 'categories'
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = category_slug(self.name)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.name
+
+
+def category_slug(name):
+    # Scripts slugify can't keep (e.g. Burmese marks) still get a stable slug
+    return slugify(name, allow_unicode=True) or f"category-{text_hash(name)[:8]}"
 
 
 class Affirmation(models.Model):
     text = models.TextField()
-    category = models.CharField(max_length=100, blank=True, null=True)
+    category = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, blank=True, null=True, related_name='affirmations'
+    )
     image = models.ImageField(
         upload_to='affirmations/',
+        storage=hashed_media_storage,
         blank=True,
         null=True,
         help_text='Optional: upload a thumbnail for this affirmation'
     )
+    # Resized WebP copies of image, see images.py
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Unique, so catalog imports can skip texts that are already in
+    text_hash = models.CharField(max_length=64, unique=True, null=True, editable=False)
+    # Pre-rendered speech in MEDIA_ROOT/tts, see tts.py
+    audio = models.CharField(max_length=80, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def clean(self):
+        duplicates = Affirmation.objects.filter(text_hash=text_hash(self.text)).exclude(pk=self.pk)
+        if duplicates.exists():
+            raise ValidationError({'text': 'This affirmation is already in the catalog.'})
+
+    def save(self, *args, **kwargs):
+        self.text_hash = text_hash(self.text)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return (self.text[:50] + '...') if len(self.text) > 50 else self.text
 
 class JournalEntry(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Indexed through journal_user_created_idx, which leads with user
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     title = models.CharField(max_length=100)
     content = models.TextField()
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination and streak scans: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+            models.Index(fields=['user', '-created_at', '-id'], name='journal_user_created_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored timestamp so edits that move an entry to
+        # another day can be detected when updating the streak
+        instance._loaded_created_at = instance.__dict__.get('created_at')
+        return instance
+
     def __str__(self):
         return f"{self.title} - {self.user.username}"
 # models.py
@@ -39,16 +107,23 @@ from django.db import models
 from django.contrib.auth.models import User
 
 class DeathNoteEntry(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Indexed through deathnote_user_created_idx, which leads with user
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     content = models.TextField()
     mood = models.CharField(max_length=100, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='deathnote_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"DeathNote - {self.user.username}"
 
 class DailyAffirmation(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_affirmations')
+    # Indexed through the (user, date) unique constraint
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_affirmations', db_index=False)
     affirmations = models.ManyToManyField('Affirmation', related_name='daily_users')
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -68,16 +143,28 @@ from django.contrib.auth.models import User
 
 class LuckCard(models.Model):
     # Simple model - just image and message
-    image = models.ImageField(upload_to='luck_cards/')
+    image = models.ImageField(upload_to='luck_cards/', storage=hashed_media_storage)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     message = models.CharField(max_length=200)
+    text_hash = models.CharField(max_length=64, unique=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def clean(self):
+        duplicates = LuckCard.objects.filter(text_hash=text_hash(self.message)).exclude(pk=self.pk)
+        if duplicates.exists():
+            raise ValidationError({'message': 'A card with this message already exists.'})
+
+    def save(self, *args, **kwargs):
+        self.text_hash = text_hash(self.message)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Card: {self.message[:50]}"
 
 
 class DailyPileDraw(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Indexed through the (user, date) unique constraint
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     cards = models.ManyToManyField(LuckCard, through='PileCardSelection')
     date = models.DateField(default=timezone.now)
     draw_count = models.IntegerField(default=0)
@@ -98,4 +185,38 @@ class PileCardSelection(models.Model):
         unique_together = ['daily_draw', 'position']
 
     def __str__(self):
-        return f"Position {self.position}"
\ No newline at end of file
+        return f"Position {self.position}"
+
+class JournalStreak(models.Model):
+    # Maintained incrementally from JournalEntry signals; see streaks.py
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='journal_streak')
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    last_entry_date = models.DateField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.current_streak} day streak"
+
+
+class GameScore(models.Model):
+    GAME_CHOICES = [
+        ('bubble_pop', 'Bubble Pop'),
+        ('memory_match', 'Memory Match'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True)
+    player_name = models.CharField(max_length=50)
+    game = models.CharField(max_length=30, choices=GAME_CHOICES)
+    score = models.PositiveIntegerField()
+    details = models.JSONField(default=dict, blank=True)
+    # Set when the score is submitted, not when a buffered batch is written
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Top-N reads: WHERE game = ? ORDER BY score DESC, created_at
+            models.Index(fields=['game', '-score', 'created_at'], name='gamescore_leaderboard_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_game_display()} - {self.player_name}: {self.score}"
@@ -0,0 +1,53 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(obj):
+    """Opaque cursor pointing just past ``obj`` in (created_at, id) order."""
+    raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id) for a cursor, or None if it is malformed."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, page_size=PAGE_SIZE):
+    """
+    One newest-first page of ``queryset`` and the cursor for the next page.
+
+    Seeks on (created_at, id) instead of using OFFSET, so every page costs
+    the same index range scan however deep the user has scrolled.
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    position = decode_cursor(cursor)
+    if position is not None:
+        created_at, pk = position
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    rows = list(queryset[:page_size + 1])
+    items = rows[:page_size]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > page_size else None
+    return items, next_cursor
+
+
+def page_size_param(request):
+    try:
+        size = int(request.GET.get('limit', PAGE_SIZE))
+    except ValueError:
+        size = PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
@@ -0,0 +1,143 @@
+"""
+Read replicas for the read-heavy views.
+
+``DAILYSOUL_READ_REPLICAS`` lists database aliases that hold read-only
+copies of ``default``. Views decorated with ``replica_reads`` send their
+reads to one of them, picked at random. Every other view, every write, and
+every read inside a transaction stays on the primary. So do sessions,
+because stickiness is stored in them.
+
+Read-your-writes: ``ReplicaMiddleware`` notices when a request writes and
+pins its session to the primary for ``DAILYSOUL_REPLICA_STICKY_SECONDS``,
+which should cover the replicas' lag. Within a request, reads that follow
+a write go to the primary as well.
+
+With no replicas configured, the router, middleware and decorator do
+nothing.
+"""
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+STICKY_SESSION_KEY = '_dailysoul_primary_until'
+PRIMARY_ONLY_APPS = {'sessions'}
+
+_routing = ContextVar('dailysoul_db_routing', default=None)
+
+
+def replica_aliases():
+    return getattr(settings, 'DAILYSOUL_READ_REPLICAS', [])
+
+
+def is_replica(alias):
+    return alias in replica_aliases()
+
+
+class RoutingState:
+    """What the current request may read from, and whether it has written."""
+
+    def __init__(self):
+        self.replica_reads = False
+        self.wrote = False
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas:
+            return None
+        state = _routing.get()
+        if (state is None or not state.replica_reads or state.wrote
+                or model._meta.app_label in PRIMARY_ONLY_APPS
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            # Explicitly, so objects loaded from a replica don't pull their
+            # related lookups over there with them
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if not replica_aliases():
+            return None
+        state = _routing.get()
+        if state is not None and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        replicas = replica_aliases()
+        if not replicas:
+            return None
+        pool = {DEFAULT_DB_ALIAS, *replicas}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        return False if is_replica(db) else None
+
+
+def _sticky_until():
+    return time.time() + getattr(settings, 'DAILYSOUL_REPLICA_STICKY_SECONDS', 10)
+
+
+def replica_reads(view):
+    """Let ``view`` read from a replica, unless its session wrote recently."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            state = _routing.get()
+            if state is not None and replica_aliases():
+                state.replica_reads = await request.session.aget(STICKY_SESSION_KEY, 0) < time.time()
+            return await view(request, *args, **kwargs)
+    else:
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            state = _routing.get()
+            if state is not None and replica_aliases():
+                state.replica_reads = request.session.get(STICKY_SESSION_KEY, 0) < time.time()
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaMiddleware:
+    """
+    Tracks each request's writes and pins the session to the primary after
+    one. Goes after SessionMiddleware, which saves the session afterwards.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if state.wrote and replica_aliases():
+            request.session[STICKY_SESSION_KEY] = _sticky_until()
+        return response
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = _routing.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if state.wrote and replica_aliases():
+            await request.session.aset(STICKY_SESSION_KEY, _sticky_until())
+        return response
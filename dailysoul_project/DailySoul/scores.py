@@ -0,0 +1,85 @@
+import atexit
+import logging
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from .models import GameScore
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreBuffer:
+    """
+    In-process write buffer for GameScore rows.
+
+    Submissions are appended under a lock and written with one bulk_create
+    once ``size`` scores are waiting or the oldest has waited ``interval``
+    seconds, so a burst of finished games turns into a handful of INSERTs.
+    A size of 1 writes every score immediately.
+    """
+
+    def __init__(self, size=50, interval=2.0):
+        self.size = size
+        self.interval = interval
+        self._pending = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def _append(self, score):
+        """Queue ``score``; True when the buffer is full and should be flushed."""
+        with self._lock:
+            self._pending.append(score)
+            if len(self._pending) >= self.size:
+                return True
+            if self._timer is None:
+                self._timer = threading.Timer(self.interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+            return False
+
+    def add(self, score):
+        if self._append(score):
+            self.flush()
+
+    async def aadd(self, score):
+        """add() for async views: a full buffer is flushed off the event loop."""
+        if self._append(score):
+            await sync_to_async(self.flush)()
+
+    def pending(self, game=None):
+        with self._lock:
+            return [s for s in self._pending if game is None or s.game == game]
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not batch:
+            return 0
+        try:
+            GameScore.objects.bulk_create(batch)
+        except DatabaseError:
+            logger.exception("Dropping %d buffered game scores", len(batch))
+            return 0
+        return len(batch)
+
+    def _flush_from_timer(self):
+        # Runs on a new thread each time, with its own database connection;
+        # close it, or CONN_MAX_AGE would keep it open after the thread ends
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+
+score_buffer = ScoreBuffer(
+    size=getattr(settings, 'DAILYSOUL_SCORE_BUFFER_SIZE', 50),
+    interval=getattr(settings, 'DAILYSOUL_SCORE_BUFFER_INTERVAL', 2.0),
+)
+atexit.register(score_buffer.flush)
+
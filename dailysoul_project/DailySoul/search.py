@@ -0,0 +1,166 @@
+"""
+Per-user full-text search over journal and death note entries.
+
+On SQLite every entry is copied into an FTS5 table (migration 0013) by the
+signals in signals.py. Each row carries an ``owner`` token ('u<user id>')
+that every query must match, so a search only intersects the posting lists
+of one user's entries, however many entries other users have. Results are
+ranked by bm25 with titles weighted above the body, and come back with the
+matched terms wrapped in <mark>.
+
+Other databases fall back to a case-insensitive scan of the user's entries,
+newest first.
+"""
+import re
+from functools import reduce
+from operator import and_
+
+from django.db import connections, router
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.text import Truncator
+
+from .models import DeathNoteEntry, JournalEntry
+
+# kind -> (model, FTS5 table, {indexed column: bm25 weight}); the last
+# column is the body, which gets a snippet instead of a full highlight
+INDEXES = {
+    'journal': (JournalEntry, 'DailySoul_journalentry_fts', {'title': 5.0, 'content': 1.0}),
+    'deathnote': (DeathNoteEntry, 'DailySoul_deathnoteentry_fts', {'content': 1.0}),
+}
+MAX_TERMS = 10
+# Deep pages of ranked results are never read; this also keeps OFFSET in range
+MAX_PAGE = 500
+SNIPPET_TOKENS = 24
+SNIPPET_CHARS = 160
+
+# Private-use markers survive escaping; they become <mark> tags afterwards
+MARK_START, MARK_END = '\ue000', '\ue001'
+
+
+def _index_for(model):
+    return next((spec for spec in INDEXES.values() if spec[0] is model), None)
+
+
+def uses_fts(model):
+    return connections[router.db_for_write(model)].vendor == 'sqlite'
+
+
+def index_entry(entry):
+    """Add or refresh ``entry`` in its search index."""
+    model, table, columns = _index_for(type(entry))
+    if not uses_fts(model):
+        return
+    with connections[router.db_for_write(model)].cursor() as cursor:
+        cursor.execute(f'DELETE FROM "{table}" WHERE rowid = %s', [entry.pk])
+        cursor.execute(
+            f'INSERT INTO "{table}" (rowid, owner, {", ".join(columns)}) VALUES (%s, %s{", %s" * len(columns)})',
+            [entry.pk, f'u{entry.user_id}', *(getattr(entry, column) or '' for column in columns)],
+        )
+
+
+def unindex_entry(entry):
+    model, table, _ = _index_for(type(entry))
+    if not uses_fts(model):
+        return
+    with connections[router.db_for_write(model)].cursor() as cursor:
+        cursor.execute(f'DELETE FROM "{table}" WHERE rowid = %s', [entry.pk])
+
+
+def rebuild_index(kind):
+    """
+    Re-copy every ``kind`` entry into its index. For rows written without
+    signals (bulk_create, raw SQL); saves and deletes keep it in sync.
+    """
+    model, table, columns = INDEXES[kind]
+    if not uses_fts(model):
+        return
+    values = ', '.join(f"COALESCE({column}, '')" for column in columns)
+    with connections[router.db_for_write(model)].cursor() as cursor:
+        cursor.execute(f'DELETE FROM "{table}"')
+        cursor.execute(
+            f'INSERT INTO "{table}" (rowid, owner, {", ".join(columns)}) '
+            f"SELECT id, 'u' || user_id, {values} FROM \"{model._meta.db_table}\""
+        )
+
+
+def query_terms(query):
+    """The words of a user query, ignoring ones with no letters or digits."""
+    return [term for term in query.split() if any(ch.isalnum() for ch in term)][:MAX_TERMS]
+
+
+def match_expression(terms, user_id, columns):
+    """
+    FTS5 query for ``terms`` in one user's entries. Every term is quoted, so
+    user input never reaches the FTS5 query syntax, and prefix-matched, so
+    results update while a word is still being typed.
+    """
+    phrases = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+    return f'owner : "u{user_id}" AND {{{" ".join(columns)}}} : ({phrases})'
+
+
+def marked(text):
+    """Escape ``text`` for HTML and turn the FTS markers into <mark> tags."""
+    return escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def _fts_search(model, table, columns, user, terms, limit, offset):
+    names = list(columns)
+    weights = ', '.join(str(weight) for weight in columns.values())
+    fragments = [
+        f"highlight(\"{table}\", {i}, %s, %s)" for i, _ in enumerate(names[:-1], start=1)
+    ] + [f"snippet(\"{table}\", {len(names)}, %s, %s, '…', {SNIPPET_TOKENS})"]
+    sql = (
+        f'SELECT rowid, {", ".join(fragments)} FROM "{table}" '
+        f'WHERE "{table}" MATCH %s ORDER BY bm25("{table}", 0.0, {weights}), rowid DESC '
+        f'LIMIT %s OFFSET %s'
+    )
+    params = [MARK_START, MARK_END] * len(names) + [match_expression(terms, user.pk, names), limit, offset]
+    with connections[router.db_for_read(model)].cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(row[0], dict(zip(names, map(marked, row[1:])))) for row in cursor.fetchall()]
+
+
+def _highlight(text, pattern):
+    return marked(pattern.sub(lambda m: f'{MARK_START}{m.group(0)}{MARK_END}', text))
+
+
+def _scan_search(model, columns, user, terms, limit, offset):
+    names = list(columns)
+    matches = reduce(and_, (
+        reduce(lambda a, b: a | b, (Q(**{f'{name}__icontains': term}) for name in names))
+        for term in terms
+    ))
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+    rows = model.objects.filter(user=user).filter(matches).order_by('-created_at', '-id')
+    results = []
+    for entry in rows[offset:offset + limit]:
+        fields = {name: _highlight(getattr(entry, name) or '', pattern) for name in names[:-1]}
+        body = getattr(entry, names[-1])
+        found = pattern.search(body)
+        start = max(0, found.start() - SNIPPET_CHARS // 4) if found else 0
+        fields[names[-1]] = _highlight(Truncator(('…' if start else '') + body[start:]).chars(SNIPPET_CHARS), pattern)
+        results.append((entry.pk, fields))
+    return results
+
+
+def search_entries(user, kind, query, page=1, page_size=20):
+    """
+    One page of ``user``'s ``kind`` entries matching ``query``, best match
+    first. Returns ([(entry, {column: highlighted html})], has_next).
+    """
+    model, table, columns = INDEXES[kind]
+    terms = query_terms(query)
+    if not terms:
+        return [], False
+
+    offset = (page - 1) * page_size
+    if uses_fts(model):
+        hits = _fts_search(model, table, columns, user, terms, page_size + 1, offset)
+    else:
+        hits = _scan_search(model, columns, user, terms, page_size + 1, offset)
+
+    has_next = len(hits) > page_size
+    hits = hits[:page_size]
+    entries = model.objects.filter(user=user).in_bulk([pk for pk, _ in hits])
+    return [(entries[pk], fields) for pk, fields in hits if pk in entries], has_next
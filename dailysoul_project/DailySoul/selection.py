@@ -0,0 +1,109 @@
+import random
+import time
+
+from .models import Affirmation, LuckCard
+from .versions import abump_version, aget_version, bump_version, get_version
+
+
+class RandomPool:
+    """
+    Random row picker backed by a list of primary keys.
+
+    Only the ids are kept, so a draw costs one indexed ``pk__in`` lookup
+    instead of loading the whole table into Python. Each process holds its
+    own copy of the id list and only compares a small version number in the
+    cache per draw; signals bump the version whenever a row is saved or
+    deleted. ``timeout`` bounds how stale a copy can get when the cache is
+    not shared between processes.
+
+    ``filters`` narrows the pool to matching rows; every pool of a model
+    shares that model's version, so one bump refreshes them all.
+    ``related`` is passed to select_related() when the rows are fetched.
+    """
+
+    def __init__(self, model, timeout=300, filters=None, related=()):
+        self.model = model
+        self.timeout = timeout
+        self.filters = filters or {}
+        self.related = related
+        self.version_key = f"dailysoul:pool:{model._meta.label_lower}:version"
+        self._state = None  # (version, loaded_at, ids)
+
+    def _id_queryset(self):
+        return self.model.objects.filter(**self.filters).order_by().values_list('pk', flat=True)
+
+    def _row_queryset(self):
+        return self.model.objects.select_related(*self.related)
+
+    def version(self):
+        """Changes whenever a row of the model is saved or deleted."""
+        return get_version(self.version_key)
+
+    async def aversion(self):
+        return await aget_version(self.version_key)
+
+    def _is_stale(self, version):
+        state = self._state
+        return state is None or state[0] != version or time.monotonic() - state[1] > self.timeout
+
+    def ids(self):
+        version = self.version()
+        if self._is_stale(version):
+            ids = list(self._id_queryset())
+            self._state = (version, time.monotonic(), ids)
+        return self._state[2]
+
+    async def aids(self):
+        version = await self.aversion()
+        if self._is_stale(version):
+            ids = [pk async for pk in self._id_queryset()]
+            self._state = (version, time.monotonic(), ids)
+        return self._state[2]
+
+    def invalidate(self):
+        self._state = None
+        bump_version(self.version_key)
+
+    async def ainvalidate(self):
+        self._state = None
+        await abump_version(self.version_key)
+
+    def count(self):
+        return len(self.ids())
+
+    def sample(self, k):
+        """Return up to ``k`` distinct random rows, in random order."""
+        ids = self.ids()
+        picked = random.sample(ids, min(k, len(ids)))
+        if not picked:
+            return []
+
+        rows = self._row_queryset().in_bulk(picked)
+        if len(rows) < len(picked):
+            # Rows were deleted elsewhere since the id list was loaded
+            self.invalidate()
+        return [rows[pk] for pk in picked if pk in rows]
+
+    def choice(self):
+        """Return a single random row, or None when the table is empty."""
+        rows = self.sample(1)
+        return rows[0] if rows else None
+
+    async def asample(self, k):
+        ids = await self.aids()
+        picked = random.sample(ids, min(k, len(ids)))
+        if not picked:
+            return []
+
+        rows = await self._row_queryset().ain_bulk(picked)
+        if len(rows) < len(picked):
+            await self.ainvalidate()
+        return [rows[pk] for pk in picked if pk in rows]
+
+    async def achoice(self):
+        rows = await self.asample(1)
+        return rows[0] if rows else None
+
+
+affirmation_pool = RandomPool(Affirmation, related=('category',))
+luck_card_pool = RandomPool(LuckCard)
@@ -0,0 +1,105 @@
+"""
+JSON shapes for LuckCard in the pile API.
+
+Resolving a card's image (variant choice, storage URLs, srcset) is the same
+for every request, so it is done once per card and kept in the cache under
+the card id and a storage version. A response then only prefixes those
+cached paths with the request's scheme and host.
+"""
+import hashlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.templatetags.static import static
+
+from .images import VARIANT_WIDTHS, has_current_variants, pick_variant
+
+DEFAULT_CARD_IMAGE = 'images/default-card.jpg'
+
+
+@lru_cache(maxsize=None)
+def default_card_url():
+    return static(DEFAULT_CARD_IMAGE)
+
+
+def storage_version():
+    """Changes whenever cached card URLs would resolve differently."""
+    parts = (
+        settings.MEDIA_URL,
+        settings.STATIC_URL,
+        getattr(settings, 'DAILYSOUL_MEDIA_VERSION', ''),
+        ','.join(str(w) for w in VARIANT_WIDTHS),
+    )
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()[:12]
+
+
+class LuckCardSerializer:
+    """
+    Builds ``{'id', 'image_url', 'image_srcset', 'message'}`` pile entries.
+    ``image_width`` is the rendered width the image_url variant should cover.
+    """
+
+    def __init__(self, image_width, timeout=24 * 3600):
+        self.image_width = image_width
+        self.timeout = timeout
+
+    def key(self, card_id):
+        return f"dailysoul:cardurls:{storage_version()}:{self.image_width}:{card_id}"
+
+    def _resolve(self, card):
+        if not card.image:
+            return {'image': default_card_url(), 'srcset': []}
+        srcset = []
+        if has_current_variants(card):
+            storage = card.image.storage
+            srcset = [
+                (storage.url(name), int(width))
+                for width, name in sorted(card.image_variants['widths'].items(), key=lambda item: int(item[0]))
+            ]
+        return {'image': pick_variant(card, self.image_width), 'srcset': srcset}
+
+    def resolved(self, cards):
+        """Cached image paths for ``cards``, as {card id: {'image', 'srcset'}}."""
+        keys = {card.pk: self.key(card.pk) for card in cards}
+        found = cache.get_many(keys.values())
+        urls, missing = {}, {}
+        for card in cards:
+            entry = found.get(keys[card.pk])
+            if entry is None:
+                entry = missing[keys[card.pk]] = self._resolve(card)
+            urls[card.pk] = entry
+        if missing:
+            cache.set_many(missing, self.timeout)
+        return urls
+
+    def invalidate(self, card_id):
+        cache.delete(self.key(card_id))
+
+    def entries(self, request, numbered_cards):
+        """Pile entries for ``(position, card)`` pairs."""
+        numbered_cards = list(numbered_cards)
+        urls = self.resolved([card for _, card in numbered_cards])
+        try:
+            origin = request.build_absolute_uri('/')[:-1]
+        except Exception:
+            origin = ''
+
+        def absolute(path):
+            return origin + path if path.startswith('/') else path
+
+        return [
+            {
+                'id': position,
+                'image_url': absolute(urls[card.pk]['image']),
+                'image_srcset': ', '.join(f"{absolute(path)} {width}w" for path, width in urls[card.pk]['srcset']),
+                'message': card.message or '',
+            }
+            for position, card in numbered_cards
+        ]
+
+
+# Pile cards render 280px wide (350px on small screens); 2x for high-density screens
+PILE_IMAGE_WIDTH = 560
+
+pile_card_serializer = LuckCardSerializer(PILE_IMAGE_WIDTH)
@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .daily import invalidate_pile_snapshot, invalidate_streak_fragments
+from .db import configure_sqlite
+from .images import refresh_variants
+from .instrumentation import install_query_recorder
+from .models import Affirmation, Category, DailyPileDraw, DeathNoteEntry, JournalEntry, LuckCard, PileCardSelection
+from .search import index_entry, unindex_entry
+from .selection import affirmation_pool, luck_card_pool
+from .serializers import pile_card_serializer
+from .streaks import entry_day, has_entry_on, rebuild_streak, record_entry_day
+from .tts import audio_name, render_in_background
+
+
+connection_created.connect(configure_sqlite, dispatch_uid='dailysoul_configure_sqlite')
+connection_created.connect(install_query_recorder, dispatch_uid='dailysoul_query_recorder')
+
+
+@receiver([post_save, post_delete], sender=Affirmation)
+@receiver([post_save, post_delete], sender=Category)
+def reset_affirmation_pool(sender, **kwargs):
+    affirmation_pool.invalidate()
+
+
+@receiver([post_save, post_delete], sender=LuckCard)
+def reset_luck_card_pool(sender, **kwargs):
+    luck_card_pool.invalidate()
+
+
+@receiver(post_save, sender=Affirmation)
+@receiver(post_save, sender=LuckCard)
+def build_image_variants(sender, instance, raw=False, **kwargs):
+    # Fixtures load rows without their files; generate_image_variants covers them
+    if not raw:
+        refresh_variants(instance)
+
+
+@receiver(post_save, sender=Affirmation)
+def render_affirmation_audio(sender, instance, raw=False, **kwargs):
+    # prerender_tts catches anything this misses (bulk imports, a failed backend)
+    if raw or not getattr(settings, 'DAILYSOUL_TTS_ON_SAVE', True):
+        return
+    if instance.audio != audio_name(instance.text):
+        transaction.on_commit(lambda: render_in_background(instance.pk))
+
+
+# Connected after build_image_variants, so new variants are already on the row
+@receiver([post_save, post_delete], sender=LuckCard)
+def reset_luck_card_urls(sender, instance, **kwargs):
+    pile_card_serializer.invalidate(instance.pk)
+
+
+# A draw record or its cards edited after the day was finished (e.g. a draw
+# reset in the admin). The draw path itself writes with update() and
+# bulk_create(), which send no signals, and caches the snapshot explicitly
+@receiver([post_save, post_delete], sender=DailyPileDraw)
+def reset_pile_snapshot(sender, instance, **kwargs):
+    invalidate_pile_snapshot(instance.user_id, instance.date)
+
+
+@receiver([post_save, post_delete], sender=PileCardSelection)
+def reset_pile_snapshot_for_selection(sender, instance, **kwargs):
+    draw = DailyPileDraw.objects.filter(pk=instance.daily_draw_id).values('user_id', 'date').first()
+    if draw is not None:
+        invalidate_pile_snapshot(draw['user_id'], draw['date'])
+
+
+@receiver(post_save, sender=JournalEntry)
+def update_journal_streak(sender, instance, created, **kwargs):
+    invalidate_streak_fragments(instance.user_id)
+    day = entry_day(instance)
+    previous = getattr(instance, '_loaded_created_at', None)
+    # Remembered for later saves of this same instance
+    instance._loaded_created_at = instance.created_at
+    if created:
+        record_entry_day(instance.user_id, day)
+    elif previous is not None and timezone.localtime(previous).date() != day:
+        # The entry moved to another day; the old day may now be empty
+        rebuild_streak(instance.user_id)
+
+
+@receiver(post_delete, sender=JournalEntry)
+def shrink_journal_streak(sender, instance, **kwargs):
+    invalidate_streak_fragments(instance.user_id)
+    if not has_entry_on(instance.user_id, entry_day(instance)):
+        # Only touch existing records: a cascading user delete also lands here
+        rebuild_streak(instance.user_id, create=False)
+
+
+@receiver(post_save, sender=JournalEntry)
+@receiver(post_save, sender=DeathNoteEntry)
+def index_searchable_entry(sender, instance, **kwargs):
+    index_entry(instance)
+
+
+@receiver(post_delete, sender=JournalEntry)
+@receiver(post_delete, sender=DeathNoteEntry)
+def unindex_searchable_entry(sender, instance, **kwargs):
+    unindex_entry(instance)
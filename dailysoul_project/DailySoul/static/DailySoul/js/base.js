@@ -0,0 +1,209 @@
+(function(){
+
+  const scrollProgress = document.getElementById('scrollProgress');
+  const backToTop = document.getElementById('backToTop');
+
+  // Scroll progress indicator
+  function updateScrollProgress() {
+    const winHeight = window.innerHeight;
+    const docHeight = document.documentElement.scrollHeight - winHeight;
+    const scrolled = (window.scrollY / docHeight) * 100;
+    scrollProgress.style.width = scrolled + '%';
+  }
+
+
+  function updateBackToTop() {
+    if (window.scrollY > 500) {
+      backToTop.classList.add('visible');
+    } else {
+      backToTop.classList.remove('visible');
+    }
+  }
+
+
+  function scrollToTop() {
+    window.scrollTo({
+      top: 0,
+      behavior: 'smooth'
+    });
+  }
+
+
+  let scrollTimeout;
+  window.addEventListener('scroll', function() {
+    if (!scrollTimeout) {
+      scrollTimeout = setTimeout(function() {
+        updateScrollProgress();
+        updateBackToTop();
+        scrollTimeout = null;
+      }, 10);
+    }
+  });
+
+
+  backToTop.addEventListener('click', scrollToTop);
+
+
+  updateScrollProgress();
+  updateBackToTop();
+
+  /* ---------- Enhanced Scroll Animations for Desktop ---------- */
+  function checkScroll() {
+    const elements = document.querySelectorAll('.fade-in, .slide-in-left, .slide-in-right');
+    const windowHeight = window.innerHeight;
+    const triggerBottom = windowHeight * 0.85;
+
+    elements.forEach(element => {
+      const elementTop = element.getBoundingClientRect().top;
+
+      if (elementTop < triggerBottom) {
+        element.classList.add('visible');
+      }
+    });
+  }
+
+  // Initial check and scroll listener for animations
+  window.addEventListener('scroll', checkScroll);
+  window.addEventListener('load', checkScroll);
+  setTimeout(checkScroll, 100); // Initial check after load
+
+
+  document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+    anchor.addEventListener('click', function (e) {
+      const targetId = this.getAttribute('href');
+      if (targetId === '#') return;
+
+      const targetElement = document.querySelector(targetId);
+      if (targetElement) {
+        e.preventDefault();
+        const navbarHeight = 0; // No fixed navbar offset needed
+        const targetPosition = targetElement.getBoundingClientRect().top + window.pageYOffset - navbarHeight - 30;
+
+        window.scrollTo({
+          top: targetPosition,
+          behavior: 'smooth'
+        });
+      }
+    });
+  });
+
+
+  const miniNav = document.getElementById('miniGamesNav');
+  const megaItem = miniNav ? miniNav.closest('.mega-menu-item') : null;
+  const megaContent = document.getElementById('megaMenuContent');
+  const sectionId = 'miniGamesSection';
+  const dashboardPath = document.body.dataset.dashboardUrl;
+
+  function normalizePath(p){ return (p||'').replace(/\/$/, ''); }
+  function onDashboard(){ return normalizePath(window.location.pathname) === normalizePath(new URL(dashboardPath, window.location.origin).pathname); }
+  function getNavbarOffset(){ return 0; } // No offset needed
+  function scrollToSection(){ const el=document.getElementById(sectionId); if(!el) return; const y = el.getBoundingClientRect().top + window.pageYOffset - getNavbarOffset(); window.scrollTo({top: Math.round(y), behavior: 'smooth'}); }
+  function scrollToTop(){ window.scrollTo({top: 0, behavior: 'smooth'}); }
+
+  if(miniNav && megaItem && megaContent){
+    miniNav.addEventListener('click', function(e){
+      if(!onDashboard()){
+        try { sessionStorage.setItem('ds_open_mini_games', '1'); } catch(err) {}
+        return;
+      }
+      e.preventDefault();
+      if(megaItem.classList.contains('open')){
+        megaItem.classList.remove('open');
+        miniNav.setAttribute('aria-expanded','false');
+        scrollToTop();
+      } else {
+        megaItem.classList.add('open');
+        miniNav.setAttribute('aria-expanded','true');
+        setTimeout(scrollToSection, 80);
+      }
+    });
+
+    document.addEventListener('click', function(ev){
+      if(!megaItem.classList.contains('open')) return;
+      if(!megaItem.contains(ev.target) && ev.target !== miniNav){
+        megaItem.classList.remove('open');
+        miniNav.setAttribute('aria-expanded','false');
+        scrollToTop();
+      }
+    });
+
+    document.addEventListener('keydown', function(ev){
+      if((ev.key === 'Escape' || ev.key === 'Esc') && megaItem.classList.contains('open')){
+        megaItem.classList.remove('open');
+        miniNav.setAttribute('aria-expanded','false');
+        scrollToTop();
+      }
+    });
+
+    (function maybeAuto(){
+      try {
+        if(sessionStorage.getItem('ds_open_mini_games') === '1'){
+          sessionStorage.removeItem('ds_open_mini_games');
+          setTimeout(function(){ megaItem.classList.add('open'); miniNav.setAttribute('aria-expanded','true'); scrollToSection(); }, 140);
+          return;
+        }
+      } catch(e){}
+      if(onDashboard() && window.location.hash === '#' + sectionId){
+        setTimeout(function(){ megaItem.classList.add('open'); miniNav.setAttribute('aria-expanded','true'); scrollToSection(); }, 140);
+      }
+    })();
+
+    window.addEventListener('hashchange', function(){
+      if(window.location.hash === '#' + sectionId && onDashboard()){
+        megaItem.classList.add('open');
+        miniNav.setAttribute('aria-expanded','true');
+        setTimeout(scrollToSection, 120);
+      }
+    });
+  }
+
+
+  const mobileToggle = document.getElementById('mobileToggle');
+  const mobileNav = document.getElementById('mobileNav');
+  const mobileDrawer = document.getElementById('mobileDrawer');
+  const mobileClose = document.getElementById('mobileClose');
+  const mobileMiniToggle = document.getElementById('mobileMiniToggle');
+  const mobileMiniSub = document.getElementById('mobileMiniSub');
+  const mobileMiniItems = document.getElementById('mobileMiniItems');
+  const mobileMiniScroll = document.getElementById('mobileMiniScroll');
+
+  function openMobile(){ if(mobileNav){ mobileNav.classList.add('open'); mobileDrawer.classList.add('open'); mobileNav.setAttribute('aria-hidden','false'); mobileToggle.setAttribute('aria-expanded','true'); document.body.style.overflow='hidden'; } }
+  function closeMobile(){ if(mobileNav){ mobileNav.classList.remove('open'); mobileDrawer.classList.remove('open'); mobileNav.setAttribute('aria-hidden','true'); mobileToggle.setAttribute('aria-expanded','false'); document.body.style.overflow=''; } }
+
+  if(mobileToggle){
+    mobileToggle.addEventListener('click', function(){ if(mobileNav.classList.contains('open')) closeMobile(); else openMobile(); });
+  }
+  if(mobileClose){
+    mobileClose.addEventListener('click', closeMobile);
+  }
+  if(mobileNav){
+    mobileNav.addEventListener('click', function(e){ if(e.target === mobileNav) closeMobile(); });
+  }
+
+  if(mobileMiniToggle && mobileMiniSub){
+    mobileMiniToggle.addEventListener('click', function(){
+      const isOpen = mobileMiniSub.classList.contains('open');
+      if(isOpen){ mobileMiniSub.classList.remove('open'); mobileMiniToggle.setAttribute('aria-expanded','false'); }
+      else { mobileMiniSub.classList.add('open'); mobileMiniToggle.setAttribute('aria-expanded','true'); }
+    });
+  }
+
+  if(mobileMiniScroll){
+    mobileMiniScroll.addEventListener('click', function(e){
+      closeMobile();
+      setTimeout(function(){
+        if(onDashboard()){
+          setTimeout(scrollToSection, 80);
+          if(megaItem){ megaItem.classList.add('open'); if(miniNav) miniNav.setAttribute('aria-expanded','true'); }
+        } else {
+          try { sessionStorage.setItem('ds_open_mini_games','1'); } catch(e){}
+        }
+      }, 220);
+    });
+  }
+
+  document.addEventListener('keydown', function(e){
+    if((e.key === 'Escape' || e.key === 'Esc') && mobileNav && mobileNav.classList.contains('open')){ closeMobile(); }
+  });
+
+})();
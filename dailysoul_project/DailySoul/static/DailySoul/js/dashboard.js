@@ -0,0 +1,282 @@
+(function(){
+  const pileCards = document.querySelectorAll('.pile-card');
+  const drawBtn = document.getElementById('drawBtn');
+  const pickCounter = document.getElementById('pickCounter');
+  const drawNotice = document.getElementById('drawNotice');
+  const pileSection = document.querySelector('.pile-section');
+
+  let drawCount = 0;
+  const maxDraws = 3;
+
+  function showConfetti(cardId) {
+    const confettiArea = document.getElementById(cardId);
+    if (!confettiArea) return;
+    confettiArea.innerHTML = '';
+    const colors = ['#77bfa3', '#5fa88d', '#e8f5e9', '#fff3e0', '#ffffff'];
+    for (let i = 0; i < 20; i++) {
+      const confetti = document.createElement('div');
+      confetti.className = 'confetti-piece';
+      confetti.style.setProperty('--confetti-color', colors[Math.floor(Math.random() * colors.length)]);
+      confetti.style.left = Math.random() * 100 + '%';
+      confetti.style.width = Math.random() * 10 + 6 + 'px';
+      confetti.style.height = Math.random() * 10 + 18 + 'px';
+      confetti.style.transform = `rotate(${Math.random() * 360}deg)`;
+      const animationDuration = Math.random() * 1000 + 800;
+      const animationDelay = Math.random() * 500;
+      confetti.style.animation = `confetti-fall ${animationDuration}ms ease-out ${animationDelay}ms forwards`;
+      confettiArea.appendChild(confetti);
+    }
+    confettiArea.classList.add('show');
+    setTimeout(() => {
+      confettiArea.classList.remove('show');
+      confettiArea.innerHTML = '';
+    }, 1800);
+  }
+
+  const style = document.createElement('style');
+  style.textContent = `
+    @keyframes confetti-fall {
+      0% { opacity: 1; transform: translateY(-20px) rotate(0deg); }
+      100% { opacity: 0; transform: translateY(120px) rotate(360deg); }
+    }
+    .confetti-piece { background: var(--confetti-color); display:block; position:absolute; border-radius:2px; }
+  `;
+  document.head.appendChild(style);
+
+  function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+      const cookies = document.cookie.split(';');
+      for (let i = 0; i < cookies.length; i++) {
+        const cookie = cookies[i].trim();
+        if (cookie.substring(0, name.length + 1) === (name + '=')) {
+          cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+          break;
+        }
+      }
+    }
+    return cookieValue;
+  }
+
+  // Bundled card art; the image tags carry its (hashed) static URLs
+  function defaultImage(n) {
+    return document.getElementById(`image${n}`).dataset.defaultSrc;
+  }
+
+  function generateDefaultPiles() {
+    const messages = [
+      "Trust your inner voice—it knows the way",
+      "Every challenge helps you grow stronger",
+      "Find balance in all aspects of life"
+    ];
+    return [
+      { id: 1, image_url: defaultImage(1), message: messages[0] },
+      { id: 2, image_url: defaultImage(2), message: messages[1] },
+      { id: 3, image_url: defaultImage(3), message: messages[2] }
+    ];
+  }
+
+  async function getNewPilesRaw() {
+    try {
+      const res = await fetch(pileSection.dataset.pilesUrl, {
+        method: 'GET',
+        credentials: 'same-origin',
+        headers: {
+          'X-Requested-With': 'XMLHttpRequest',
+          'X-CSRFToken': getCookie('csrftoken')
+        }
+      });
+      const data = await res.json().catch(() => null);
+      if (data && data.piles && Array.isArray(data.piles) && data.piles.length) return data;
+      if (res.ok) return { piles: generateDefaultPiles(), remaining_draws: data && data.remaining_draws != null ? data.remaining_draws : maxDraws - drawCount, draw_allowed: data && typeof data.draw_allowed === 'boolean' ? data.draw_allowed : true };
+      console.warn('getNewPilesRaw: non-ok response or no usable body', res.status, data);
+      return { piles: generateDefaultPiles(), remaining_draws: data && data.remaining_draws != null ? data.remaining_draws : Math.max(0, maxDraws - drawCount), draw_allowed: data && typeof data.draw_allowed === 'boolean' ? data.draw_allowed : true, message: data && data.message ? data.message : null };
+    } catch (err) {
+      console.error('Network error fetching piles:', err);
+      return { piles: generateDefaultPiles(), remaining_draws: Math.max(0, maxDraws - drawCount), draw_allowed: true };
+    }
+  }
+
+  function updatePileCards(piles) {
+    piles.forEach((pile, idx) => {
+      const i = idx + 1;
+      const img = document.getElementById(`image${i}`);
+      const msg = document.getElementById(`message${i}`);
+      if (img) {
+        // srcset first, so the browser never fetches the fallback src as well
+        if (pile.image_srcset) { img.srcset = pile.image_srcset; img.sizes = '(max-width: 900px) 350px, 280px'; } else { img.removeAttribute('srcset'); }
+        img.src = pile.image_url; img.alt = `Fortune Card ${i}`;
+      }
+      if (msg) msg.textContent = pile.message || '';
+    });
+  }
+
+  function resetCards() {
+    pileCards.forEach(card => card.classList.remove('flipped'));
+  }
+
+  async function drawNewCards() {
+    if (drawBtn.disabled) return;
+    drawBtn.disabled = true;
+    drawBtn.innerHTML = '<span>🌀 Drawing...</span>';
+
+    const data = await getNewPilesRaw();
+    const piles = data.piles || generateDefaultPiles();
+    updatePileCards(piles);
+    resetCards();
+
+    const remaining = (typeof data.remaining_draws === 'number') ? data.remaining_draws : Math.max(0, maxDraws - (drawCount + 1));
+    const drawAllowed = (typeof data.draw_allowed === 'boolean') ? data.draw_allowed : (remaining > 0);
+
+    if (data && ('remaining_draws' in data) && typeof data.remaining_draws === 'number') {
+      drawCount = maxDraws - data.remaining_draws;
+      if (drawCount < 0) drawCount = 0;
+    } else {
+      drawCount = Math.min(maxDraws, drawCount + 1);
+    }
+
+    if (pickCounter) pickCounter.textContent = `Draws today: ${drawCount}/${maxDraws}`;
+
+    showConfetti('confetti1');
+    setTimeout(()=>showConfetti('confetti2'), 180);
+    setTimeout(()=>showConfetti('confetti3'), 360);
+
+    if (!drawAllowed || remaining <= 0) {
+      drawBtn.disabled = true;
+      drawBtn.innerHTML = `<span>✅ Done for today</span>`;
+      if (drawNotice) drawNotice.textContent = data && data.message ? data.message : "You've reached your shuffles for today. Come back tomorrow!";
+    } else {
+      drawBtn.disabled = false;
+      drawBtn.innerHTML = '<span>🔄 Shuffle </span>';
+      if (drawNotice) drawNotice.textContent = '';
+    }
+  }
+
+
+  pileCards.forEach(card => {
+    card.addEventListener('click', function() {
+      const wasFlipped = this.classList.contains('flipped');
+      this.classList.toggle('flipped');
+      if (!wasFlipped) {
+        const id = this.dataset.pile;
+        showConfetti(`confetti${id}`);
+      }
+    });
+  });
+
+  drawBtn.addEventListener('click', drawNewCards);
+
+  (async function initialize() {
+    const data = await getNewPilesRaw();
+    const piles = data.piles || generateDefaultPiles();
+    updatePileCards(piles);
+
+    if (typeof data.remaining_draws === 'number') {
+      drawCount = maxDraws - data.remaining_draws;
+      if (drawCount < 0) drawCount = 0;
+    } else {
+      drawCount = 0;
+    }
+
+    if (pickCounter) pickCounter.textContent = `Draws today: ${drawCount}/${maxDraws}`;
+
+    const drawAllowed = (typeof data.draw_allowed === 'boolean') ? data.draw_allowed : true;
+    const remaining = (typeof data.remaining_draws === 'number') ? data.remaining_draws : (maxDraws - drawCount);
+
+    if (!drawAllowed || remaining <= 0) {
+      drawBtn.disabled = true;
+      drawBtn.innerHTML = `<span>✅ Done for today</span>`;
+      if (drawNotice) drawNotice.textContent = data && data.message ? data.message : "You've reached your shuffles for today. Come back tomorrow!";
+    } else {
+      drawBtn.disabled = false;
+      drawBtn.innerHTML = '<span>🔄 Shuffle </span>';
+      if (drawNotice) drawNotice.textContent = '';
+    }
+  })();
+
+})();
+
+(function() {
+  const readBtns = document.querySelectorAll('.read-aloud-btn');
+
+  // Function to detect if text contains Burmese characters
+  function isBurmese(text) {
+    // Burmese Unicode range: U+1000 to U+109F
+    const burmeseRegex = /[\u1000-\u109F]/;
+    return burmeseRegex.test(text);
+  }
+
+  // Function to detect if text contains English characters
+  function isEnglish(text) {
+    // Basic Latin alphabet detection
+    const englishRegex = /[A-Za-z]/;
+    return englishRegex.test(text);
+  }
+
+  // Pre-rendered audio from the server, when the affirmation has some
+  let currentAudio = null;
+
+  readBtns.forEach(btn => {
+    btn.addEventListener('click', () => {
+      const targetId = btn.dataset.target;
+      const textEl = document.getElementById(targetId);
+      if (!textEl) return;
+
+      const text = textEl.textContent.trim();
+
+      // Stop any existing speech
+      window.speechSynthesis.cancel();
+      if (currentAudio) { currentAudio.pause(); currentAudio = null; }
+
+      if (btn.dataset.audio) {
+        currentAudio = new Audio(btn.dataset.audio);
+        currentAudio.play().catch(err => console.warn('Audio playback failed', err));
+        return;
+      }
+
+      // Create new utterance
+      const utterance = new SpeechSynthesisUtterance(text);
+
+      // Detect language and set appropriate voice settings
+      if (isBurmese(text)) {
+        // Burmese language settings
+        utterance.lang = 'my-MM'; // Burmese (Myanmar)
+        utterance.rate = 0.9;    // Slightly slower for Burmese
+        utterance.pitch = 1;
+        utterance.volume = 1;
+
+        // Try to find a Burmese voice if available
+        const voices = window.speechSynthesis.getVoices();
+        const burmeseVoice = voices.find(voice =>
+          voice.lang === 'my-MM' || voice.lang.startsWith('my-')
+        );
+
+        if (burmeseVoice) {
+          utterance.voice = burmeseVoice;
+        }
+      } else if (isEnglish(text)) {
+        // English language settings
+        utterance.lang = 'en-US';
+        utterance.rate = 1;
+        utterance.pitch = 1;
+        utterance.volume = 1;
+      } else {
+        // Default settings for other languages
+        utterance.lang = 'en-US';
+        utterance.rate = 1;
+        utterance.pitch = 1;
+        utterance.volume = 1;
+      }
+
+      // Speak the text
+      window.speechSynthesis.speak(utterance);
+    });
+  });
+
+  // Load voices when they become available
+  if (window.speechSynthesis.onvoiceschanged !== undefined) {
+    window.speechSynthesis.onvoiceschanged = function() {
+      // Voices are now loaded
+    };
+  }
+})();
@@ -0,0 +1,266 @@
+// Expand/Collapse functionality for long notes
+function toggleExpand(noteId) {
+  const note = document.getElementById('note-' + noteId);
+  const expandBtn = note.querySelector('.expand-btn');
+  const expandText = expandBtn.querySelector('.expand-text');
+
+  note.classList.toggle('expanded');
+
+  if (note.classList.contains('expanded')) {
+    expandText.textContent = 'Show Less';
+  } else {
+    expandText.textContent = 'Read More';
+  }
+}
+
+// Related Thoughts Functionality
+function showRelatedThoughts(noteId) {
+  console.log('Showing related thoughts for note:', noteId);
+
+  // Get the current note content
+  const currentNote = document.getElementById('note-' + noteId);
+  const currentContent = currentNote.querySelector('.note-content').textContent;
+
+  // Get all notes except the current one
+  const allNotes = Array.from(document.querySelectorAll('.note'));
+  const otherNotes = allNotes.filter(note => note.id !== 'note-' + noteId);
+
+  // Simple keyword matching for related thoughts
+  const keywords = extractKeywords(currentContent);
+  const relatedNotes = findRelatedNotes(otherNotes, keywords);
+
+  // Display in modal
+  displayRelatedThoughts(relatedNotes, currentContent);
+}
+
+function extractKeywords(content) {
+  // Simple keyword extraction
+  const words = content.toLowerCase()
+    .replace(/[^\w\s]/g, '')
+    .split(/\s+/)
+    .filter(word => word.length > 3);
+
+  // Remove common stop words
+  const stopWords = ['this', 'that', 'with', 'have', 'from', 'they', 'what', 'when', 'where', 'were', 'been', 'like', 'just', 'some', 'then', 'than', 'more', 'very', 'about', 'after', 'before'];
+  const filteredWords = words.filter(word => !stopWords.includes(word));
+
+  // Return top 5 unique keywords
+  return [...new Set(filteredWords)].slice(0, 5);
+}
+
+function findRelatedNotes(notes, keywords) {
+  return notes.filter(note => {
+    const content = note.querySelector('.note-content').textContent.toLowerCase();
+    return keywords.some(keyword => content.includes(keyword));
+  }).slice(0, 5); // Limit to 5 related notes
+}
+
+function displayRelatedThoughts(relatedNotes, originalContent) {
+  const modalBody = document.getElementById('related-thoughts-body');
+
+  if (relatedNotes.length > 0) {
+    let html = `
+      <p style="margin-bottom: 20px; color: #666; font-style: italic;">
+        "${originalContent.slice(0, 100)}..."
+      </p>
+      <h4 style="margin-bottom: 15px; color: #333;">Similar thoughts you've had:</h4>
+      <div class="related-thoughts-list">
+    `;
+
+    relatedNotes.forEach(note => {
+      const content = note.querySelector('.note-content').textContent;
+      const time = note.querySelector('.note-meta span').textContent;
+      const noteId = note.id.split('-')[1];
+
+      html += `
+        <div class="related-thought-item">
+          <div class="related-thought-content">${content}</div>
+          <div class="related-thought-meta">
+            <span>${time}</span>
+            <button class="delete-btn" style="padding: 4px 8px; font-size: 0.7rem;"
+                    onclick="deleteRelatedThought('${noteId}')">
+              Release
+            </button>
+          </div>
+        </div>
+      `;
+    });
+
+    html += `</div>`;
+    modalBody.innerHTML = html;
+  } else {
+    modalBody.innerHTML = `
+      <div class="no-related-thoughts">
+        <div class="icon">🔍</div>
+        <p>No similar thoughts found</p>
+        <p style="font-size: 0.9rem; margin-top: 8px;">This thought seems unique in your collection</p>
+      </div>
+    `;
+  }
+
+  // Show the modal
+  document.getElementById('related-thoughts-modal').classList.add('active');
+}
+
+function deleteRelatedThought(noteId) {
+  if (confirm('Release this related thought?')) {
+    window.location.href = `?delete=${noteId}`;
+  }
+}
+
+// Close related thoughts modal
+document.getElementById('close-related-modal').addEventListener('click', function() {
+  document.getElementById('related-thoughts-modal').classList.remove('active');
+});
+
+// Close modal when clicking outside
+document.getElementById('related-thoughts-modal').addEventListener('click', function(e) {
+  if (e.target === this) {
+    this.classList.remove('active');
+  }
+});
+
+// Enhanced delete confirmation
+function confirmDelete(noteId) {
+  if (confirm('Are you sure you want to release this negative thought forever?')) {
+    const noteElement = document.getElementById('note-' + noteId);
+    if (noteElement) {
+      noteElement.classList.add('fade-out');
+    }
+    return true;
+  }
+  return false;
+}
+
+// Make sure all event listeners are properly attached
+document.addEventListener('DOMContentLoaded', function() {
+  console.log('Death Note page loaded successfully');
+
+  const textarea = document.getElementById('content');
+  const charCount = document.getElementById('char-count');
+  const progressFill = document.getElementById('progress-fill');
+  const submitBtn = document.querySelector('.btn');
+
+  // Character counter
+  if (textarea) {
+    textarea.addEventListener('input', function() {
+      const length = this.value.length;
+      charCount.textContent = length;
+
+      // Update progress bar
+      const progress = (length / 1000) * 100;
+      progressFill.style.width = progress + '%';
+
+      // Change color when near limit
+      if (length > 800) {
+        charCount.classList.add('warning');
+        progressFill.style.background = 'linear-gradient(90deg, #ff6b6b, #ff0000)';
+      } else {
+        charCount.classList.remove('warning');
+        progressFill.style.background = 'linear-gradient(90deg, #ff6b6b, #ff4757)';
+      }
+    });
+  }
+
+  // Enhanced button effects
+  if (submitBtn) {
+    submitBtn.addEventListener('click', function(e) {
+      if (textarea && textarea.value.trim()) {
+        // Add loading state
+        const originalText = this.innerHTML;
+        this.innerHTML = '<span>⏳</span> Releasing...';
+        this.disabled = true;
+
+        // Revert after 2 seconds (in case form submission fails)
+        setTimeout(() => {
+          this.innerHTML = originalText;
+          this.disabled = false;
+        }, 2000);
+      }
+    });
+  }
+
+  // Auto-resize textarea
+  if (textarea) {
+    textarea.addEventListener('input', function() {
+      this.style.height = 'auto';
+      this.style.height = (this.scrollHeight) + 'px';
+    });
+  }
+
+  // Infinite scroll: older notes arrive one keyset page at a time
+  const notesList = document.querySelector('.notes-list');
+  const notesSentinel = document.getElementById('notes-sentinel');
+  let nextCursor = notesSentinel ? notesSentinel.dataset.nextCursor : '';
+  let loadingNotes = false;
+
+  function buildNote(note) {
+    const el = document.createElement('div');
+    el.className = 'note';
+    el.id = 'note-' + note.id;
+    el.innerHTML = `
+      <div class="note-content"></div>
+      <div class="note-meta">
+        <div style="display: flex; align-items: center; flex-wrap: wrap; gap: 8px;">
+          <span style="font-size: 0.8rem; color: #888;"></span>
+        </div>
+        <a href="?delete=${note.id}" class="delete-btn" onclick="return confirmDelete('${note.id}')">
+          <span>🔥</span> Release
+        </a>
+      </div>
+    `;
+    el.querySelector('.note-content').textContent = note.content;
+    el.querySelector('.note-meta span').textContent = `${note.timesince} ago`;
+    if (note.content.length > 150) {
+      const btn = document.createElement('button');
+      btn.className = 'expand-btn';
+      btn.innerHTML = '<span>📖</span> <span class="expand-text">Read More</span>';
+      btn.addEventListener('click', () => toggleExpand(note.id));
+      el.insertBefore(btn, el.querySelector('.note-meta'));
+    }
+    if (note.mood) {
+      const mood = document.createElement('span');
+      mood.style.cssText = 'background: rgba(255, 107, 107, 0.1); padding: 2px 8px; border-radius: 12px; font-size: 0.75rem; color: #ff6b6b;';
+      mood.textContent = note.mood;
+      el.querySelector('.note-meta div').appendChild(mood);
+    }
+    return el;
+  }
+
+  async function loadMoreNotes() {
+    if (!nextCursor || loadingNotes) return;
+    loadingNotes = true;
+    try {
+      const res = await fetch(`${notesSentinel.dataset.url}?cursor=${encodeURIComponent(nextCursor)}`, {
+        credentials: 'same-origin',
+        headers: { 'X-Requested-With': 'XMLHttpRequest' }
+      });
+      if (!res.ok) return;
+      const data = await res.json();
+      data.entries.forEach(note => notesList.appendChild(buildNote(note)));
+      nextCursor = data.next_cursor;
+    } catch (err) {
+      console.error('Could not load older notes:', err);
+    } finally {
+      loadingNotes = false;
+    }
+  }
+
+  if (nextCursor && 'IntersectionObserver' in window) {
+    new IntersectionObserver(entries => {
+      if (entries.some(e => e.isIntersecting)) loadMoreNotes();
+    }, { rootMargin: '400px' }).observe(notesSentinel);
+  }
+
+  // Add keyboard shortcut for related thoughts (Ctrl+R)
+  document.addEventListener('keydown', function(e) {
+    if (e.ctrlKey && e.key === 'r') {
+      e.preventDefault();
+      const firstNote = document.querySelector('.note');
+      if (firstNote) {
+        const noteId = firstNote.id.split('-')[1];
+        showRelatedThoughts(noteId);
+      }
+    }
+  });
+});
@@ -0,0 +1,320 @@
+document.addEventListener('DOMContentLoaded', function() {
+  const entryCards = document.querySelectorAll('.entry-card');
+  const entryModal = document.getElementById('entry-modal');
+  const deleteModal = document.getElementById('delete-modal');
+  const closeModal = document.getElementById('close-modal');
+  const modalBody = document.getElementById('modal-body');
+  const journalForm = document.getElementById('journal-form');
+  const deleteForm = document.getElementById('delete-form');
+  const entryTitle = document.getElementById('entry-title');
+  const entryContent = document.getElementById('entry-content');
+  const clearBtn = document.getElementById('clear-btn');
+  const entryIdField = document.getElementById('entry-id-field');
+  const submitBtn = document.getElementById('submit-btn');
+  const formTitle = document.getElementById('form-title');
+  const saveIndicator = document.getElementById('auto-save-status');
+  const saveText = document.getElementById('save-text');
+  const cancelDeleteBtn = document.getElementById('cancel-delete');
+  const deleteEntryIdField = document.getElementById('delete-entry-id');
+
+  let autoSaveTimeout;
+  let hasUnsavedChanges = false;
+  let isEditing = false;
+
+  // Handle entry card clicks for viewing
+  entryCards.forEach(bindEntryCard);
+
+  function bindEntryCard(card) {
+    const viewBtn = card.querySelector('.view-btn');
+    const editBtn = card.querySelector('.edit-btn');
+    const deleteBtn = card.querySelector('.delete-btn');
+
+    viewBtn.addEventListener('click', function(e) {
+      e.stopPropagation();
+      showEntryModal(card);
+    });
+
+    editBtn.addEventListener('click', function(e) {
+      e.stopPropagation();
+      loadEntryForEditing(card);
+    });
+
+    deleteBtn.addEventListener('click', function(e) {
+      e.stopPropagation();
+      showDeleteConfirmation(card);
+    });
+
+    // Also allow clicking the card itself to view
+    card.addEventListener('click', function() {
+      showEntryModal(card);
+    });
+  }
+
+  // Infinite scroll: older entries arrive one keyset page at a time
+  const entriesContainer = document.getElementById('entries-container');
+  const sentinel = document.getElementById('entries-sentinel');
+  let nextCursor = sentinel.dataset.nextCursor;
+  let loadingEntries = false;
+
+  function buildEntryCard(entry) {
+    const card = document.createElement('div');
+    card.className = 'entry-card';
+    card.dataset.entryId = entry.id;
+    card.dataset.entryTitle = entry.title;
+    card.dataset.entryContent = entry.content;
+    card.dataset.entryDate = entry.date;
+    card.dataset.entryTime = entry.time;
+    card.innerHTML = `
+      <div class="entry-meta">
+        <div class="entry-title"></div>
+        <div class="entry-time"></div>
+      </div>
+      <div class="entry-snippet"></div>
+      <div class="entry-actions">
+        <button class="entry-action-btn view-btn" title="View">👁️</button>
+        <button class="entry-action-btn edit-btn" title="Edit">✏️</button>
+        <button class="entry-action-btn delete-btn" title="Delete">🗑️</button>
+      </div>
+    `;
+    card.querySelector('.entry-title').textContent = entry.title;
+    card.querySelector('.entry-time').textContent = entry.time;
+    card.querySelector('.entry-snippet').textContent = entry.snippet;
+    bindEntryCard(card);
+    return card;
+  }
+
+  function appendEntry(entry) {
+    let group = sentinel.previousElementSibling;
+    if (!group || group.dataset.day !== entry.day) {
+      group = document.createElement('div');
+      group.className = 'day-group';
+      group.dataset.day = entry.day;
+      group.innerHTML = '<div class="day-header"><span></span><span></span></div><div class="day-entries"></div>';
+      group.querySelector('.day-header span').textContent = entry.day_label;
+      entriesContainer.insertBefore(group, sentinel);
+    }
+    group.querySelector('.day-entries').appendChild(buildEntryCard(entry));
+    const count = group.querySelectorAll('.entry-card').length;
+    group.querySelector('.day-header span:last-child').textContent = `${count} note${count === 1 ? '' : 's'}`;
+  }
+
+  async function loadMoreEntries() {
+    if (!nextCursor || loadingEntries) return;
+    loadingEntries = true;
+    try {
+      const res = await fetch(`${sentinel.dataset.url}?cursor=${encodeURIComponent(nextCursor)}`, {
+        credentials: 'same-origin',
+        headers: { 'X-Requested-With': 'XMLHttpRequest' }
+      });
+      if (!res.ok) return;
+      const data = await res.json();
+      data.entries.forEach(appendEntry);
+      nextCursor = data.next_cursor;
+    } catch (err) {
+      console.error('Could not load older entries:', err);
+    } finally {
+      loadingEntries = false;
+    }
+  }
+
+  if (nextCursor && 'IntersectionObserver' in window) {
+    new IntersectionObserver(entries => {
+      if (entries.some(e => e.isIntersecting)) loadMoreEntries();
+    }, { root: entriesContainer }).observe(sentinel);
+  }
+
+  // Search: ranked matches replace the timeline while there is a query
+  const searchInput = document.getElementById('entry-search');
+  const searchResults = document.getElementById('search-results');
+  const searchMore = document.getElementById('search-more');
+  let searchTimeout;
+  let searchPage = null;
+  let searchRequest = 0;
+
+  async function runSearch(page) {
+    const query = searchInput.value.trim();
+    const request = ++searchRequest;
+    if (page === 1) {
+      searchResults.querySelectorAll('.entry-card, .no-entries').forEach(el => el.remove());
+    }
+    searchResults.hidden = !query;
+    entriesContainer.hidden = !!query;
+    searchMore.hidden = true;
+    if (!query) return;
+
+    try {
+      const params = new URLSearchParams({ q: query, page: page });
+      const res = await fetch(`${searchInput.dataset.url}?${params}`, {
+        credentials: 'same-origin',
+        headers: { 'X-Requested-With': 'XMLHttpRequest' }
+      });
+      if (!res.ok || request !== searchRequest) return;
+      const data = await res.json();
+      data.entries.forEach(entry => {
+        const card = buildEntryCard(entry);
+        // Highlights are escaped server-side; only <mark> is markup
+        card.querySelector('.entry-title').innerHTML = entry.highlight.title;
+        card.querySelector('.entry-snippet').innerHTML = entry.highlight.content;
+        card.querySelector('.entry-time').textContent = entry.date;
+        searchResults.insertBefore(card, searchMore);
+      });
+      if (page === 1 && !data.entries.length) {
+        const empty = document.createElement('div');
+        empty.className = 'no-entries';
+        empty.innerHTML = '<div class="icon">🔍</div><p>No matching entries</p>';
+        searchResults.insertBefore(empty, searchMore);
+      }
+      searchPage = data.next_page;
+      searchMore.hidden = !searchPage;
+    } catch (err) {
+      console.error('Search failed:', err);
+    }
+  }
+
+  searchInput.addEventListener('input', function() {
+    clearTimeout(searchTimeout);
+    searchTimeout = setTimeout(() => runSearch(1), 250);
+  });
+
+  searchMore.addEventListener('click', function() {
+    if (searchPage) runSearch(searchPage);
+  });
+
+  function showEntryModal(card) {
+    const title = card.getAttribute('data-entry-title');
+    const content = card.getAttribute('data-entry-content');
+    const date = card.getAttribute('data-entry-date');
+    const time = card.getAttribute('data-entry-time');
+
+    modalBody.innerHTML = `
+      <h3 class="modal-entry-title">${title}</h3>
+      <div class="modal-entry-date">${date} at ${time}</div>
+      <div class="modal-entry-content">${content}</div>
+    `;
+
+    entryModal.classList.add('active');
+  }
+
+  function loadEntryForEditing(card) {
+    const title = card.getAttribute('data-entry-title');
+    const content = card.getAttribute('data-entry-content');
+    const entryId = card.getAttribute('data-entry-id');
+
+    // Set form values
+    entryIdField.value = entryId;
+    entryTitle.value = title === 'Untitled' ? '' : title;
+    entryContent.value = content;
+
+    // Update UI for editing mode
+    isEditing = true;
+    formTitle.textContent = "Edit Entry";
+    submitBtn.innerHTML = '<span>💾</span> Update Entry';
+
+    // Scroll to form
+    document.querySelector('.journal-card').scrollIntoView({ behavior: 'smooth' });
+
+    // Reset save indicator
+    updateSaveIndicator(false, true);
+  }
+
+  function showDeleteConfirmation(card) {
+    const entryId = card.getAttribute('data-entry-id');
+    // Set the delete_id value in the form
+    deleteEntryIdField.value = entryId;
+    deleteModal.classList.add('active');
+  }
+
+  // Reset form to create new entry
+  function resetToNewEntry() {
+    entryIdField.value = '';
+    entryTitle.value = '';
+    entryContent.value = '';
+    isEditing = false;
+    formTitle.textContent = "Add Today's Entry";
+    submitBtn.innerHTML = '<span>💾</span> Save Entry';
+    updateSaveIndicator(false, true);
+  }
+
+  // Auto-save indicator
+  function updateSaveIndicator(saving = false, saved = false) {
+    if (saving) {
+      saveIndicator.textContent = '●';
+      saveIndicator.style.color = '#ffa500';
+      saveText.textContent = 'Saving...';
+    } else if (saved) {
+      saveIndicator.textContent = '●';
+      saveIndicator.style.color = 'var(--accent)';
+      saveText.textContent = 'All changes saved';
+      hasUnsavedChanges = false;
+    } else {
+      saveIndicator.textContent = '●';
+      saveIndicator.style.color = '#ff4444';
+      saveText.textContent = 'Unsaved changes';
+      hasUnsavedChanges = true;
+    }
+  }
+
+  // Track form changes for auto-save indicator
+  [entryTitle, entryContent].forEach(field => {
+    field.addEventListener('input', function() {
+      updateSaveIndicator(false, false);
+
+      // Clear any existing timeout
+      if (autoSaveTimeout) {
+        clearTimeout(autoSaveTimeout);
+      }
+
+      // Set a new timeout to show "saving" state
+      autoSaveTimeout = setTimeout(() => {
+        updateSaveIndicator(true, false);
+
+        // Simulate saving completion
+        setTimeout(() => {
+          updateSaveIndicator(false, true);
+        }, 500);
+      }, 1000);
+    });
+  });
+
+  // Clear form button
+  clearBtn.addEventListener('click', function() {
+    if (confirm('Are you sure you want to clear your current entry?')) {
+      resetToNewEntry();
+    }
+  });
+
+  // Form submission
+  journalForm.addEventListener('submit', function() {
+    updateSaveIndicator(true, false);
+  });
+
+  // Close modals when X is clicked
+  closeModal.addEventListener('click', function() {
+    entryModal.classList.remove('active');
+  });
+
+  cancelDeleteBtn.addEventListener('click', function() {
+    deleteModal.classList.remove('active');
+  });
+
+  // Close modals when clicking outside content
+  entryModal.addEventListener('click', function(e) {
+    if (e.target === entryModal) {
+      entryModal.classList.remove('active');
+    }
+  });
+
+  deleteModal.addEventListener('click', function(e) {
+    if (e.target === deleteModal) {
+      deleteModal.classList.remove('active');
+    }
+  });
+
+  // Warn about unsaved changes
+  window.addEventListener('beforeunload', function(e) {
+    if (hasUnsavedChanges) {
+      e.preventDefault();
+      e.returnValue = '';
+    }
+  });
+});
@@ -0,0 +1,94 @@
+"""
+Content-addressed storage for the affirmation and luck card images, and
+for the collected static assets.
+
+Files are named after a hash of their bytes (``luck_cards/3f1c...e2.jpg``),
+so a name never points at different content. Uploading the same image twice
+reuses the first file, and the media view can tell browsers to cache these
+files forever.
+"""
+import gzip
+import hashlib
+import os
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_LENGTH = 20
+HASHED_NAME_RE = re.compile(r'(^|/)[0-9a-f]{%d}\.[A-Za-z0-9]+$' % HASH_LENGTH)
+
+
+def is_hashed_name(name):
+    return bool(HASHED_NAME_RE.search(name))
+
+
+@deconstructible
+class HashedMediaStorage(FileSystemStorage):
+    """
+    FileSystemStorage that keeps the folder of the requested name but
+    replaces the file name with the content hash.
+    """
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        folder, filename = os.path.split(name)
+        ext = os.path.splitext(filename)[1].lower()
+        return os.path.join(folder, digest.hexdigest()[:HASH_LENGTH] + ext).replace('\\', '/')
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(self.generate_filename(name), content)
+        if self.exists(name):
+            # Same bytes already stored: share the file
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+hashed_media_storage = HashedMediaStorage()
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    collectstatic storage: hashed names from the manifest, plus a gzipped
+    ``.gz`` copy of each hashed text asset for web servers that serve those
+    directly (nginx ``gzip_static``). A name missing from the manifest keeps
+    its plain URL instead of failing the page.
+    """
+    compressed_extensions = ('.css', '.js', '.svg', '.json', '.txt')
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(self.compressed_extensions):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as original:
+            data = original.read()
+        # mtime=0 keeps the .gz bytes stable between runs
+        packed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(packed) < len(data):
+            if self.exists(name + '.gz'):
+                self.delete(name + '.gz')
+            self._save(name + '.gz', ContentFile(packed))
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
@@ -0,0 +1,109 @@
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import JournalEntry, JournalStreak
+
+
+def entry_day(entry):
+    """Local calendar day an entry belongs to."""
+    return timezone.localtime(entry.created_at).date()
+
+
+def entry_days(user_id):
+    """Distinct local dates with at least one journal entry, newest first."""
+    return (
+        JournalEntry.objects.filter(user_id=user_id)
+        .annotate(day=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+        .values_list('day', flat=True)
+        .distinct()
+        .order_by('-day')
+    )
+
+
+def _compute_streak(days):
+    """Return (current, longest, last_day) for newest-first distinct dates."""
+    current = longest = run = 0
+    last_day = previous = None
+    for day in days:
+        if previous is None:
+            last_day = day
+            run = 1
+        elif previous - day == timedelta(days=1):
+            run += 1
+        else:
+            if not current:
+                current = run
+            run = 1
+        longest = max(longest, run)
+        previous = day
+    if not current:
+        current = run
+    return current, longest, last_day
+
+
+def rebuild_streak(user_id, create=True):
+    """Recompute a user's streak record from their full journal history."""
+    current, longest, last_day = _compute_streak(entry_days(user_id).iterator())
+    values = {
+        'current_streak': current,
+        'longest_streak': longest,
+        'last_entry_date': last_day,
+    }
+    if create:
+        streak, _ = JournalStreak.objects.update_or_create(user_id=user_id, defaults=values)
+        return streak
+    JournalStreak.objects.filter(user_id=user_id).update(**values)
+    return None
+
+
+def record_entry_day(user_id, day):
+    """Fold a newly written day into the user's streak without a rescan."""
+    with transaction.atomic():
+        streak, created = JournalStreak.objects.select_for_update().get_or_create(user_id=user_id)
+        if created:
+            # No record yet: seed it from history, which already includes this entry
+            return rebuild_streak(user_id)
+
+        last_day = streak.last_entry_date
+        if last_day == day:
+            return streak
+        if last_day is not None and day < last_day:
+            # Back-dated entry may join two runs; recompute instead of guessing
+            return rebuild_streak(user_id)
+
+        if last_day is not None and day - last_day == timedelta(days=1):
+            streak.current_streak += 1
+        else:
+            streak.current_streak = 1
+        streak.longest_streak = max(streak.longest_streak, streak.current_streak)
+        streak.last_entry_date = day
+        streak.save(update_fields=['current_streak', 'longest_streak', 'last_entry_date'])
+        return streak
+
+
+def has_entry_on(user_id, day):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    return JournalEntry.objects.filter(
+        user_id=user_id,
+        created_at__gte=start,
+        created_at__lt=start + timedelta(days=1),
+    ).exists()
+
+
+def get_journal_streak(user):
+    """
+    Days in a row, ending today, with at least one journal entry.
+
+    Reads the maintained JournalStreak row; users without one (e.g. from
+    before the table existed) get it rebuilt once.
+    """
+    streak = JournalStreak.objects.filter(user=user).first()
+    if streak is None:
+        streak = rebuild_streak(user.pk)
+    if streak.last_entry_date != timezone.localdate():
+        return 0
+    return streak.current_streak
@@ -0,0 +1,17 @@
+from django import template
+
+from DailySoul.images import pick_variant, variant_srcset
+
+register = template.Library()
+
+
+@register.filter
+def variant_url(instance, width):
+    """{{ card|variant_url:192 }}: smallest image variant covering ``width`` px."""
+    return pick_variant(instance, int(width))
+
+
+@register.filter(name='variant_srcset')
+def variant_srcset_filter(instance):
+    """{{ card|variant_srcset }}: every variant as a ``srcset`` value."""
+    return variant_srcset(instance)
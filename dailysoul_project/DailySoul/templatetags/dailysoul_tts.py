@@ -0,0 +1,11 @@
+from django import template
+
+from DailySoul.tts import audio_url
+
+register = template.Library()
+
+
+@register.filter(name='audio_url')
+def audio_url_filter(affirmation):
+    """{{ a|audio_url }}: pre-rendered speech for an affirmation, or ''."""
+    return audio_url(affirmation)
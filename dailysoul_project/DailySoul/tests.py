@@ -1,3 +1,1162 @@
-from django.test import TestCase
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime, time, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from PIL import Image
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, connections, router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from django.utils import timezone
+
+from .benchmarks import routes, run_benchmarks
+from .categories import adraw, category_pool, draw
+from .daily import DAILY_AFFIRMATION_COUNT, get_daily_affirmations, pregenerate_daily_rows
+from .db import retry_on_locked
+from .instrumentation import PerformanceMiddleware, performance_window
+from .leaderboard import Leaderboard
+from .models import (
+    Affirmation, Category, DailyPileDraw, DeathNoteEntry, GameScore, JournalEntry, JournalStreak, LuckCard,
+    PileCardSelection,
+)
+from .pagination import encode_cursor
+from .routers import STICKY_SESSION_KEY, ReplicaMiddleware, replica_reads
+from .search import MAX_PAGE as MAX_SEARCH_PAGE
+from .selection import RandomPool, affirmation_pool
+from .serializers import LuckCardSerializer, pile_card_serializer
+from .storage import hashed_media_storage
+from .streaks import get_journal_streak, rebuild_streak
+from . import async_views, catalog, images, scores, tts, urls as dailysoul_urls, views, warmup
+from .scores import ScoreBuffer, score_buffer
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite specific")
+class QueryPlanTests(TestCase):
+    """
+    Every query a per-user view issues against these tables must be an index
+    search, never a full table scan. Guards the composite indexes from being
+    bypassed by later query changes.
+    """
+
+    TABLES = {
+        'DailySoul_journalentry': 'journal_user_created_idx',
+        'DailySoul_deathnoteentry': 'deathnote_user_created_idx',
+        'DailySoul_dailyaffirmation': 'DailySoul_dailyaffirmation_user_id_date_b6663d74_uniq',
+        'DailySoul_dailypiledraw': 'DailySoul_dailypiledraw_user_id_date_e3b6ce74_uniq',
+        'DailySoul_affirmation': 'DailySoul_affirmation_category_id_0313c212',
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('planner', 'planner@example.com', 'pw')
+        other = User.objects.create_user('other', 'other@example.com', 'pw')
+        now = timezone.now()
+        for owner in (cls.user, other):
+            JournalEntry.objects.bulk_create([
+                JournalEntry(user=owner, title=f"Day {i}", content="text", created_at=now - timedelta(hours=6 * i))
+                for i in range(40)
+            ])
+            DeathNoteEntry.objects.bulk_create([DeathNoteEntry(user=owner, content="gone") for _ in range(30)])
+        calm = Category.objects.create(name='calm')
+        Affirmation.objects.bulk_create([Affirmation(text=f"Affirmation {i}", category=calm) for i in range(8)])
+        LuckCard.objects.bulk_create([LuckCard(image='luck_cards/card.jpg', message=f"Card {i}") for i in range(4)])
+
+    def setUp(self):
+        # Cached template fragments would hide the queries under test
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def plan_for(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return "\n".join(row[-1] for row in cursor.fetchall())
+
+    def assertIndexedQueries(self, captured, table):
+        plans = [
+            self.plan_for(query['sql'])
+            for query in captured
+            if query['sql'].lstrip().upper().startswith('SELECT') and f'"{table}"' in query['sql']
+        ]
+        self.assertTrue(plans, f"no queries against {table} were captured")
+        for plan in plans:
+            self.assertIsNone(
+                re.search(rf"\bSCAN {table}\b(?! USING)", plan),
+                f"full scan of {table}:\n{plan}",
+            )
+        self.assertTrue(
+            any(self.TABLES[table] in plan for plan in plans),
+            f"{self.TABLES[table]} not used:\n" + "\n---\n".join(plans),
+        )
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return ctx.captured_queries
+
+    def test_journal_page(self):
+        self.assertIndexedQueries(self.get(reverse('journal')), 'DailySoul_journalentry')
+
+    def test_journal_entries_api(self):
+        entry = JournalEntry.objects.filter(user=self.user).order_by('-created_at', '-id')[10]
+        captured = self.get(reverse('api_journal_entries'), cursor=encode_cursor(entry))
+        self.assertIndexedQueries(captured, 'DailySoul_journalentry')
+
+    def test_journal_streak_rebuild(self):
+        with CaptureQueriesContext(connection) as ctx:
+            rebuild_streak(self.user.pk)
+        self.assertIndexedQueries(ctx.captured_queries, 'DailySoul_journalentry')
+
+    def test_death_note_page(self):
+        self.assertIndexedQueries(self.get(reverse('death_note')), 'DailySoul_deathnoteentry')
+
+    def test_death_note_entries_api(self):
+        note = DeathNoteEntry.objects.filter(user=self.user).order_by('-created_at', '-id')[5]
+        captured = self.get(reverse('api_deathnote_entries'), cursor=encode_cursor(note))
+        self.assertIndexedQueries(captured, 'DailySoul_deathnoteentry')
+
+    def test_dashboard(self):
+        self.get(reverse('dashboard'))
+        # The second visit reads back the stored set once the fragment expires
+        cache.clear()
+        self.assertIndexedQueries(self.get(reverse('dashboard')), 'DailySoul_dailyaffirmation')
+
+    def test_piles_api(self):
+        self.assertIndexedQueries(self.get(reverse('api_get_piles')), 'DailySoul_dailypiledraw')
+
+    def test_category_draw(self):
+        # A fresh pool, so the id list is loaded inside the captured request
+        category_pool.cache_clear()
+        self.assertIndexedQueries(self.get(reverse('draw_affirmation'), category='calm'), 'DailySoul_affirmation')
+
+
+class CategoryDrawTests(TestCase):
+    """Requested categories are matched by slug, and only real ones get a pool."""
+
+    def setUp(self):
+        cache.clear()
+        category_pool.cache_clear()
+        self.addCleanup(category_pool.cache_clear)
+        self.calm = Category.objects.create(name='Calm')
+        self.affirmation = Affirmation.objects.create(text="I am calm", category=self.calm)
+
+    def test_names_are_slugified(self):
+        for name in ('calm', 'Calm', ' CALM '):
+            self.assertEqual(draw(category=name), self.affirmation)
+        self.assertEqual(draw(mix='Calm:2'), self.affirmation)
+        self.assertEqual(async_to_sync(adraw)(category='Calm'), self.affirmation)
+        response = self.client.get(reverse('draw_affirmation'), {'category': 'Calm'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['category_slug'], 'calm')
+
+    def test_unknown_categories_get_no_pool(self):
+        for name in ('calm', 'made up', 'another one', 'x' * 200):
+            draw(category=name)
+        self.assertIsNone(draw(mix='made up,another one'))
+        self.assertEqual(category_pool.cache_info().currsize, 1)
+        response = self.client.get(reverse('draw_affirmation'), {'category': 'made up'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_new_categories_are_found(self):
+        self.assertIsNone(draw(category='Gratitude'))
+        gratitude = Category.objects.create(name='Gratitude')
+        thanks = Affirmation.objects.create(text="I am thankful", category=gratitude)
+        self.assertEqual(draw(category='Gratitude'), thanks)
+
+
+class RandomPoolTests(TestCase):
+    """Each process keeps its own id list and reloads it when the version moves."""
+
+    def setUp(self):
+        cache.clear()
+        self.first = Affirmation.objects.create(text="First")
+        # Two copies of the same pool, as two worker processes would hold
+        self.pool = RandomPool(Affirmation)
+        self.other = RandomPool(Affirmation)
+
+    def test_ids_are_kept_until_the_version_changes(self):
+        self.assertEqual(self.pool.ids(), [self.first.pk])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.pool.ids(), [self.first.pk])
+        self.other.ids()
+
+        version = self.pool.version()
+        second = Affirmation.objects.create(text="Second")
+        self.assertNotEqual(self.pool.version(), version)
+        self.assertEqual(sorted(self.pool.ids()), [self.first.pk, second.pk])
+        self.assertEqual(sorted(self.other.ids()), [self.first.pk, second.pk])
+
+        second.delete()
+        self.assertEqual(self.other.ids(), [self.first.pk])
+        self.assertEqual(self.pool.sample(5), [self.first])
+
+    def test_ids_expire_without_a_version_change(self):
+        self.pool.ids()
+        # Rows written without signals, e.g. by another process with a separate cache
+        Affirmation.objects.bulk_create([Affirmation(text="Unsignalled")])
+        self.assertEqual(self.pool.count(), 1)
+        # As if the timeout had passed since the ids were loaded
+        with mock.patch.object(self.pool, 'timeout', -1):
+            self.assertEqual(self.pool.count(), 2)
+
+    def test_deleted_rows_invalidate_even_without_a_version(self):
+        stale_ids = [self.first.pk]
+        # Deleted without signals, and the version evicted from the cache
+        # after the id list was read
+        self.first.delete()
+        cache.delete(self.pool.version_key)
+        with mock.patch.object(self.pool, 'ids', return_value=stale_ids), \
+                mock.patch.object(self.pool, 'aids', mock.AsyncMock(return_value=stale_ids)):
+            for sample in (self.pool.sample, async_to_sync(self.pool.asample)):
+                self.pool._state = (0, 0, stale_ids)
+                self.assertEqual(sample(1), [])
+                self.assertIsNone(self.pool._state)
+
+    def test_async_reads_share_the_version(self):
+        self.assertEqual(async_to_sync(self.pool.aids)(), [self.first.pk])
+        Affirmation.objects.create(text="Second")
+        self.assertEqual(len(async_to_sync(self.pool.aids)()), 2)
+
+
+class DailyAffirmationTests(TestCase):
+    """Each user's daily set is sampled once and then read back."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('daily', 'daily@example.com', 'pw')
+        self.today = timezone.localdate()
+
+    def test_empty_set_is_refilled(self):
+        # Pregenerated before there was anything to pick from
+        pregenerate_daily_rows([self.user.pk], self.today)
+        self.assertEqual(get_daily_affirmations(self.user, self.today), [])
+
+        Affirmation.objects.bulk_create([Affirmation(text=f"Affirmation {i}") for i in range(8)])
+        affirmation_pool.invalidate()
+        picked = get_daily_affirmations(self.user, self.today)
+        self.assertEqual(len(picked), DAILY_AFFIRMATION_COUNT)
+        self.assertEqual(get_daily_affirmations(self.user, self.today), picked)
+
+    def test_pregenerated_set_is_what_the_dashboard_shows(self):
+        Affirmation.objects.bulk_create([Affirmation(text=f"Pick number {i}.") for i in range(12)])
+        other = User.objects.create_user('other', 'other@example.com', 'pw')
+        call_command('pregenerate_daily', date=self.today.isoformat(), chunk_size=1, stdout=io.StringIO())
+        call_command('pregenerate_daily', date=self.today.isoformat(), stdout=io.StringIO())
+
+        stored = list(
+            Affirmation.objects.filter(daily_users__user=self.user, daily_users__date=self.today).order_by('pk')
+        )
+        self.assertEqual(len(stored), DAILY_AFFIRMATION_COUNT)
+        self.assertTrue(DailyPileDraw.objects.filter(user=other, date=self.today, draw_count=0).exists())
+
+        self.client.force_login(self.user)
+        content = self.client.get(reverse('dashboard')).content.decode()
+        shown = {a.pk for a in Affirmation.objects.all() if a.text in content}
+        self.assertEqual(shown, {a.pk for a in stored})
+        self.assertEqual(get_daily_affirmations(self.user, self.today), stored)
+
+
+class PileDrawTests(TestCase):
+    """Draws are claimed with a conditional increment, never past the daily limit."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('drawer', 'drawer@example.com', 'pw')
+        LuckCard.objects.bulk_create([LuckCard(image='luck_cards/card.jpg', message=f"Card {i}") for i in range(5)])
+        self.daily_draw = DailyPileDraw.objects.create(user=self.user, date=timezone.localdate())
+
+    def test_claims_stop_at_the_limit(self):
+        for used in range(1, views.MAX_DRAWS_PER_DAY + 1):
+            selections = views._claim_draw(self.daily_draw)
+            self.assertEqual([s.position for s in selections], [1, 2, 3])
+            self.assertEqual(self.daily_draw.draw_count, used)
+        self.assertIsNone(views._claim_draw(self.daily_draw))
+        self.assertEqual(PileCardSelection.objects.filter(daily_draw=self.daily_draw).count(), 3)
+
+    def test_stale_copy_cannot_claim_past_the_limit(self):
+        # A concurrent request loaded the row before the others used up the day
+        stale = DailyPileDraw.objects.get(pk=self.daily_draw.pk)
+        DailyPileDraw.objects.filter(pk=self.daily_draw.pk).update(draw_count=views.MAX_DRAWS_PER_DAY)
+        self.assertEqual(stale.draw_count, 0)
+        self.assertIsNone(views._claim_draw(stale))
+        self.daily_draw.refresh_from_db()
+        self.assertEqual(self.daily_draw.draw_count, views.MAX_DRAWS_PER_DAY)
+
+    def test_finished_day_is_served_from_the_snapshot(self):
+        self.client.force_login(self.user)
+        url = reverse('api_get_piles')
+        for remaining in range(views.MAX_DRAWS_PER_DAY - 1, -1, -1):
+            self.assertEqual(self.client.get(url).json()['remaining_draws'], remaining)
+        last = self.client.get(url).json()
+        self.assertFalse(last['draw_allowed'])
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url).json(), last)
+        self.assertFalse([q for q in ctx.captured_queries if 'DailySoul_' in q['sql']])
+
+    def test_reset_draw_drops_the_snapshot(self):
+        self.client.force_login(self.user)
+        url = reverse('api_get_piles')
+        for _ in range(views.MAX_DRAWS_PER_DAY):
+            self.client.get(url)
+        self.daily_draw.refresh_from_db()
+        self.daily_draw.draw_count = 0
+        self.daily_draw.save()
+        response = self.client.get(url).json()
+        self.assertTrue(response['draw_allowed'])
+        self.assertEqual(response['remaining_draws'], views.MAX_DRAWS_PER_DAY - 1)
+
+
+class JournalStreakTests(TestCase):
+    """The stored streak follows new, back-dated, moved and deleted entries."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('streaker', 'streaker@example.com', 'pw')
+
+    def at(self, days_ago):
+        day = timezone.localdate() - timedelta(days=days_ago)
+        return timezone.make_aware(datetime.combine(day, time(12)))
+
+    def write(self, days_ago):
+        return JournalEntry.objects.create(user=self.user, title="Day", content="text", created_at=self.at(days_ago))
+
+    def streak(self):
+        streak = JournalStreak.objects.get(user=self.user)
+        return streak.current_streak, streak.longest_streak, streak.last_entry_date
+
+    def test_consecutive_days(self):
+        for days_ago in (2, 1, 0, 0):
+            self.write(days_ago)
+        self.assertEqual(self.streak(), (3, 3, timezone.localdate()))
+
+    def test_back_dated_entry_joins_two_runs(self):
+        for days_ago in (4, 3, 1, 0):
+            self.write(days_ago)
+        self.assertEqual(self.streak()[:2], (2, 2))
+        self.write(2)
+        self.assertEqual(self.streak()[:2], (5, 5))
+
+    def test_moved_entry(self):
+        self.write(1)
+        today = self.write(0)
+        self.assertEqual(self.streak()[0], 2)
+        today.created_at = self.at(5)
+        today.save()
+        self.assertEqual(self.streak(), (1, 1, timezone.localdate() - timedelta(days=1)))
+
+    def test_deleted_entry(self):
+        self.write(1)
+        first, second = self.write(0), self.write(0)
+        first.delete()
+        self.assertEqual(self.streak()[0], 2)
+        second.delete()
+        self.assertEqual(self.streak(), (1, 1, timezone.localdate() - timedelta(days=1)))
+        self.assertEqual(get_journal_streak(self.user), 0)
+
+    def test_rebuild_streaks_command(self):
+        for days_ago in (1, 0):
+            self.write(days_ago)
+        JournalStreak.objects.filter(user=self.user).update(current_streak=9, longest_streak=9)
+        out = io.StringIO()
+        call_command('rebuild_streaks', user_ids=[self.user.pk], stdout=out)
+        self.assertIn('1 users', out.getvalue())
+        self.assertEqual(self.streak()[:2], (2, 2))
+
+
+class BenchmarkSmokeTests(TestCase):
+    def test_every_route_is_measured(self):
+        report = run_benchmarks(scales=[5], repeat=1)
+        results = report['results']['5']
+        self.assertEqual(sorted(results), sorted(routes()))
+        for name, entry in results.items():
+            self.assertLess(entry['status'], 500, name)
+            self.assertGreaterEqual(entry['queries'], 0)
+            self.assertIn('median', entry['wall_ms'])
+
+
+def use_temp_media(test, **overrides):
+    """
+    Store files in a throwaway MEDIA_ROOT, with any other setting
+    ``overrides``, for the rest of ``test``. Returns the directory.
+    """
+    media_root = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, media_root)
+    settings_override = override_settings(MEDIA_ROOT=media_root, **overrides)
+    settings_override.enable()
+    test.addCleanup(settings_override.disable)
+    return media_root
+
+
+def use_stub_tts(test):
+    """Render silence into a throwaway MEDIA_ROOT for the rest of ``test``."""
+    use_temp_media(test, DAILYSOUL_TTS_BACKEND='DailySoul.tts.StubSynthesizer')
+    for cached in (tts.get_synthesizer, tts.get_storage):
+        cached.cache_clear()
+        test.addCleanup(cached.cache_clear)
+
+
+class TTSAudioTests(TestCase):
+    """Pre-rendered audio is stored once and served with byte ranges."""
+
+    def setUp(self):
+        use_stub_tts(self)
+
+    def test_render_once_and_serve_ranges(self):
+        affirmation = Affirmation.objects.create(text="ငါ စိတ်ငြိမ်တယ်")
+        self.assertTrue(tts.render_affirmation(affirmation))
+        self.assertFalse(tts.render_affirmation(affirmation))
+
+        url = tts.audio_url(affirmation)
+        full = b''.join(self.client.get(url).streaming_content)
+        response = self.client.get(url, HTTP_RANGE='bytes=4-11')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 4-11/{len(full)}')
+        self.assertEqual(response.content, full[4:12])
+        self.assertEqual(self.client.get(url, HTTP_RANGE=f'bytes={len(full)}-').status_code, 416)
+
+        etag = self.client.head(url)['ETag']
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['Cache-Control'], 'public, max-age=31536000, immutable')
+
+
+class TTSPrerenderTests(TransactionTestCase):
+    """prerender_tts renders on worker threads, which need committed rows."""
+
+    def setUp(self):
+        use_stub_tts(self)
+
+    def test_prerender_bumps_audio_version_once(self):
+        Affirmation.objects.bulk_create([Affirmation(text=f"Spoken affirmation {i}") for i in range(3)])
+        pool_version, audio_version = affirmation_pool.version(), tts.audio_version()
+        with mock.patch.object(cache, 'incr', wraps=cache.incr) as incr:
+            call_command('prerender_tts', workers=1, stdout=io.StringIO())
+        self.assertEqual([c.args for c in incr.call_args_list], [(tts.AUDIO_VERSION_KEY,)])
+        self.assertNotEqual(tts.audio_version(), audio_version)
+        self.assertEqual(affirmation_pool.version(), pool_version)
+
+    def test_missing_backend_package_fails_up_front(self):
+        Affirmation.objects.create(text="Unspoken affirmation")
+        with override_settings(DAILYSOUL_TTS_BACKEND='DailySoul.tts.GTTSSynthesizer'), \
+                mock.patch.dict('sys.modules', {'gtts': None}):
+            tts.get_synthesizer.cache_clear()
+            with self.assertRaisesMessage(CommandError, 'pip install gTTS'):
+                call_command('prerender_tts', stdout=io.StringIO())
+        tts.get_synthesizer.cache_clear()
+
+
+ASYNC_ROUTES = ('draw_affirmation', 'api_get_piles', 'save_bubble_score', 'get_bubble_high_scores')
+
+
+class AsyncAPIURLConf:
+    """DailySoul's URLs as routed with DAILYSOUL_ASYNC_API on."""
+    urlpatterns = [
+        path(str(p.pattern), getattr(async_views, p.name), name=p.name) if p.name in ASYNC_ROUTES else p
+        for p in dailysoul_urls.urlpatterns
+    ]
+
+
+class AsyncAPITests(TestCase):
+    """Each async endpoint answers exactly like its sync counterpart."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('async', 'async@example.com', 'pw')
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+        self.addCleanup(score_buffer.flush)
+
+    def both(self, method, name, **kwargs):
+        """(sync response, async response) for the same request."""
+        sync_response = getattr(self.client, method)(reverse(name), **kwargs)
+        with override_settings(ROOT_URLCONF=AsyncAPIURLConf):
+            async_response = async_to_sync(getattr(self.async_client, method))(reverse(name), **kwargs)
+            # resolver_match is lazy: resolve it while the async URLs are active
+            self.assertIs(async_response.resolver_match.func, getattr(async_views, name))
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        return sync_response.json(), async_response.json()
+
+    def test_draw_affirmation(self):
+        Affirmation.objects.create(text="The only affirmation")
+        sync_payload, async_payload = self.both('get', 'draw_affirmation')
+        self.assertEqual(async_payload, sync_payload)
+        self.assertEqual(*self.both('get', 'draw_affirmation', data={'category': 'missing'}))
+
+    def test_get_piles(self):
+        LuckCard.objects.bulk_create([LuckCard(image='luck_cards/card.jpg', message=f"Card {i}") for i in range(4)])
+        first, second = self.both('get', 'api_get_piles')
+        self.assertEqual((first['remaining_draws'], second['remaining_draws']), (2, 1))
+        self.assertEqual(set(first), set(second))
+        self.assertEqual(len(second['piles']), 3)
+
+        self.client.get(reverse('api_get_piles'))
+        # Exhausted: once from the day's snapshot, once from the saved selections
+        sync_payload, async_payload = self.both('get', 'api_get_piles')
+        self.assertEqual(async_payload, sync_payload)
+        cache.clear()
+        sync_payload, async_payload = self.both('get', 'api_get_piles')
+        self.assertEqual(async_payload, sync_payload)
+        self.assertFalse(async_payload['draw_allowed'])
+
+    def test_save_bubble_score(self):
+        data = {'data': json.dumps({'score': 120, 'bubbles_popped': 12}), 'content_type': 'application/json'}
+        self.assertEqual(*self.both('post', 'save_bubble_score', **data))
+
+    def test_get_bubble_high_scores(self):
+        GameScore.objects.create(player_name='top', game='bubble_pop', score=50)
+        self.assertEqual(*self.both('get', 'get_bubble_high_scores', data={'period': 'all_time'}))
+        self.assertEqual(*self.both('get', 'get_bubble_high_scores', data={'period': 'yearly'}))
+
+
+def png_bytes(size=(8, 8), color='teal'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class CatalogTests(TestCase):
+    """Streaming catalog import / export, counting only rows that really landed."""
+
+    def setUp(self):
+        # Source files sit next to the imported images
+        self.workdir = use_temp_media(self)
+
+    def write(self, name, content):
+        path = os.path.join(self.workdir, name)
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write(content)
+        return path
+
+    def test_csv_import_and_reimport(self):
+        path = self.write('affirmations.csv', (
+            "text,category,image\n"
+            "I am calm,Calm,\n"
+            "I  am   calm,Calm,\n"
+            ",Calm,\n"
+            "I am grateful,Gratitude,\n"
+        ))
+        stats = catalog.import_catalog('affirmation', path, 'csv')
+        self.assertEqual(stats, {'read': 4, 'created': 2, 'duplicates': 1, 'invalid': 1})
+        self.assertEqual(Affirmation.objects.get(text="I am calm").category.slug, 'calm')
+
+        stats = catalog.import_catalog('affirmation', path, 'csv')
+        self.assertEqual((stats['created'], stats['duplicates']), (0, 3))
+        self.assertEqual(Affirmation.objects.count(), 2)
+
+    def test_rows_added_since_the_check_are_not_counted(self):
+        path = self.write('affirmations.jsonl', '{"text": "Raced"}\n{"text": "Fresh"}\n')
+        category_for_name = catalog.category_for_name
+
+        def concurrent_import(name, cache):
+            # Runs after the duplicate check, while the batch is being built
+            if not Affirmation.objects.filter(text="Raced").exists():
+                Affirmation.objects.create(text="Raced")
+            return category_for_name(name, cache)
+
+        with mock.patch.object(catalog, 'category_for_name', side_effect=concurrent_import):
+            stats = catalog.import_catalog('affirmation', path, 'jsonl')
+        self.assertEqual((stats['created'], stats['duplicates']), (1, 1))
+
+    def test_zip_round_trip_skips_bad_images(self):
+        source = os.path.join(self.workdir, 'cards.zip')
+        with zipfile.ZipFile(source, 'w') as archive:
+            archive.writestr('catalog.jsonl', (
+                '{"message": "Good card", "image": "good.png"}\n'
+                '{"message": "Huge card", "image": "huge.png"}\n'
+                '{"message": "Broken card", "image": "broken.png"}\n'
+            ))
+            archive.writestr('good.png', png_bytes())
+            archive.writestr('huge.png', png_bytes((64, 64)))
+            archive.writestr('broken.png', b'not an image')
+
+        # Anything over twice this many pixels is refused as a decompression bomb
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000):
+            stats = catalog.import_catalog('luck_card', source, 'zip')
+        self.assertEqual((stats['created'], stats['invalid']), (1, 2))
+        card = LuckCard.objects.get()
+        self.assertTrue(card.image_variants['widths'])
+
+        exported = os.path.join(self.workdir, 'export.zip')
+        self.assertEqual(catalog.export_catalog_zip('luck_card', exported), 1)
+        with zipfile.ZipFile(exported) as archive:
+            self.assertIn(card.image.name, archive.namelist())
+            row = json.loads(archive.read('catalog.jsonl'))
+        self.assertEqual(row, {'message': 'Good card', 'image': card.image.name})
+
+
+class ImageVariantTests(TestCase):
+    """Saving an image builds its WebP variants and drops the ones they replace."""
+
+    def setUp(self):
+        use_temp_media(self)
+
+    def card(self, color, message="Good luck"):
+        return LuckCard.objects.create(message=message, image=ContentFile(png_bytes((400, 200), color), 'card.png'))
+
+    def variant_names(self, card):
+        return set(card.image_variants['widths'].values())
+
+    def test_variants_cover_every_width_up_to_the_original(self):
+        card = self.card('teal')
+        self.assertEqual(card.image_variants['source'], card.image.name)
+        widths = card.image_variants['widths']
+        self.assertEqual(sorted(widths, key=int), [str(min(w, 400)) for w in images.VARIANT_WIDTHS])
+        with hashed_media_storage.open(widths['160']) as fh:
+            self.assertEqual(Image.open(fh).size, (160, 80))
+        self.assertEqual(LuckCard.objects.get(pk=card.pk).image_variants, card.image_variants)
+
+    def test_replaced_variants_are_deleted(self):
+        card = self.card('teal')
+        old = self.variant_names(card)
+        card.image = ContentFile(png_bytes((400, 200), 'orange'), 'card.png')
+        card.save()
+        self.assertFalse(old & self.variant_names(card))
+        self.assertFalse(any(hashed_media_storage.exists(name) for name in old))
+        self.assertTrue(all(hashed_media_storage.exists(name) for name in self.variant_names(card)))
+
+    def test_variants_shared_with_another_card_are_kept(self):
+        card, twin = self.card('teal'), self.card('teal', "Better luck")
+        shared = self.variant_names(twin)
+        self.assertEqual(self.variant_names(card), shared)
+        card.image = ContentFile(png_bytes((400, 200), 'orange'), 'card.png')
+        card.save()
+        self.assertTrue(all(hashed_media_storage.exists(name) for name in shared))
+
+
+class CardURLCacheTests(TestCase):
+    """Pile card URLs are cached per card and follow image and storage changes."""
+
+    def setUp(self):
+        use_temp_media(self)
+        cache.clear()
+        self.card = LuckCard.objects.create(message="Lucky", image=ContentFile(png_bytes((600, 300)), 'card.png'))
+
+    def image_url(self):
+        # A fresh row, like the next request would load
+        card = LuckCard.objects.get(pk=self.card.pk)
+        return pile_card_serializer.resolved([card])[card.pk]['image']
+
+    def test_cached_until_the_image_changes(self):
+        first = self.image_url()
+        self.assertIn(self.card.image_variants['widths']['600'], first)
+        with mock.patch.object(LuckCardSerializer, '_resolve', side_effect=AssertionError("not cached")):
+            self.assertEqual(self.image_url(), first)
+
+        self.card.image = ContentFile(png_bytes((600, 300), 'orange'), 'card.png')
+        self.card.save()
+        second = self.image_url()
+        self.assertNotEqual(second, first)
+        self.assertIn(self.card.image_variants['widths']['600'], second)
+
+    def test_storage_changes_use_new_keys(self):
+        first = self.image_url()
+        key = pile_card_serializer.key(self.card.pk)
+        with override_settings(DAILYSOUL_MEDIA_VERSION='2'):
+            self.assertNotEqual(pile_card_serializer.key(self.card.pk), key)
+        with override_settings(MEDIA_URL='https://cdn.example.com/media/'):
+            self.assertEqual(self.image_url(), 'https://cdn.example.com' + first)
+
+
+class MediaServingTests(TestCase):
+    """Hashed media is cached for good and revalidated by name; the rest is not."""
+
+    def setUp(self):
+        use_temp_media(self)
+        self.factory = RequestFactory()
+        self.hashed = hashed_media_storage.save('luck_cards/card.png', ContentFile(png_bytes()))
+        self.plain = FileSystemStorage().save('luck_cards/legacy.png', ContentFile(png_bytes()))
+
+    def serve(self, method, name, **headers):
+        return views.serve_media(getattr(self.factory, method)('/media/' + name, headers=headers), name)
+
+    def test_hashed_names_are_immutable(self):
+        for method in ('get', 'head'):
+            response = self.serve(method, self.hashed)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+            etag = response['ETag']
+            self.assertIn(etag.strip('"'), self.hashed)
+
+        response = self.serve('get', self.hashed, if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_plain_names_are_revalidated(self):
+        response = self.serve('head', self.plain)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertNotIn('ETag', response)
+
+    def test_other_methods_are_refused(self):
+        self.assertEqual(self.serve('post', self.hashed).status_code, 405)
+
+
+class DeathNoteViewTests(TestCase):
+    """Saving and releasing thoughts, without leaking errors to the page."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('writer', 'writer@example.com', 'pw')
+        self.client.force_login(self.user)
+
+    def messages(self, response):
+        return [str(m) for m in response.context['messages']]
+
+    def test_save_and_release(self):
+        response = self.client.post(reverse('death_note'), {'content': 'Let it go'}, follow=True)
+        self.assertEqual(self.messages(response), ['Negative thought captured in Death Note!'])
+        note = DeathNoteEntry.objects.get(user=self.user)
+
+        for bad_id in ('not-a-number', note.pk + 1):
+            response = self.client.get(reverse('death_note'), {'delete': bad_id})
+            self.assertEqual(self.messages(response), ['Thought not found.'])
+        response = self.client.get(reverse('death_note'), {'delete': note.pk}, follow=True)
+        self.assertEqual(self.messages(response), ['Thought released successfully!'])
+        self.assertFalse(DeathNoteEntry.objects.exists())
+
+    def test_errors_are_logged_not_shown(self):
+        failure = OperationalError("disk I/O error at /srv/secret/db.sqlite3")
+        with mock.patch.object(views.DeathNoteEntry.objects, 'create', side_effect=failure), \
+                self.assertLogs('DailySoul.views', 'ERROR'):
+            response = self.client.post(reverse('death_note'), {'content': 'Let it go'}, follow=True)
+        self.assertEqual(self.messages(response), ['Could not save your thought, please try again.'])
+        self.assertNotContains(response, 'secret')
+
+
+class KeysetPaginationTests(TestCase):
+    """Walking the cursors visits every entry once, newest first."""
+
+    ROUTES = {'api_journal_entries': JournalEntry, 'api_deathnote_entries': DeathNoteEntry}
+
+    def setUp(self):
+        self.user = User.objects.create_user('scroller', 'scroller@example.com', 'pw')
+        self.client.force_login(self.user)
+        now = timezone.now()
+        # Three entries share a timestamp, so pages must split ties by id
+        self.times = [now - timedelta(hours=h) for h in (0, 1, 1, 1, 2, 3, 4)]
+
+    def create(self, model):
+        other = User.objects.create_user(f'other-{model.__name__}', f'{model.__name__}@example.com', 'pw')
+        for owner in (self.user, other):
+            for i, created_at in enumerate(self.times):
+                # update(), since DeathNoteEntry.created_at is auto_now_add
+                entry = model.objects.create(user=owner, content=f"entry {i}")
+                model.objects.filter(pk=entry.pk).update(created_at=created_at)
+        self.assertEqual(model.objects.filter(user=self.user, created_at=self.times[1]).count(), 3)
+        return list(model.objects.filter(user=self.user).order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def walk(self, name, limit):
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {'limit': limit, **({'cursor': cursor} if cursor else {})}
+            data = self.client.get(reverse(name), params).json()
+            seen += [entry['id'] for entry in data['entries']]
+            pages += 1
+            cursor = data['next_cursor']
+            if cursor is None:
+                return seen, pages
+
+    def test_every_entry_once(self):
+        for name, model in self.ROUTES.items():
+            expected = self.create(model)
+            for limit in (1, 2, 3, 7, 100):
+                with self.subTest(name=name, limit=limit):
+                    seen, pages = self.walk(name, limit)
+                    self.assertEqual(seen, expected)
+                    self.assertEqual(pages, max(1, -(-len(expected) // limit)))
+
+    def test_malformed_cursor_starts_over(self):
+        expected = self.create(JournalEntry)
+        huge = encode_cursor(JournalEntry(created_at=timezone.now(), pk=10 ** 30))
+        for cursor in ('not a cursor', '!!!', 'eHx5', huge):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse('api_journal_entries'), {'cursor': cursor, 'limit': 3})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([e['id'] for e in response.json()['entries']], expected[:3])
+
+
+class EntrySearchTests(TestCase):
+    """Search is per user, ranked, highlighted and follows saves and deletes."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('searcher', 'searcher@example.com', 'pw')
+        self.client.force_login(self.user)
+
+    def search(self, name='api_journal_search', **params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_ranked_highlighted_results(self):
+        JournalEntry.objects.create(user=self.user, title="Groceries", content="Bought tea and <b>bread</b>")
+        best = JournalEntry.objects.create(user=self.user, title="Tea ceremony", content="Slow tea with friends")
+        other = User.objects.create_user('neighbour', 'neighbour@example.com', 'pw')
+        JournalEntry.objects.create(user=other, title="Tea", content="tea tea tea")
+
+        data = self.search(q='tea')
+        self.assertEqual(len(data['entries']), 2)
+        self.assertEqual(data['entries'][0]['id'], best.id)
+        self.assertEqual(data['entries'][0]['highlight']['title'], '<mark>Tea</mark> ceremony')
+        self.assertIn('&lt;b&gt;bread', data['entries'][1]['highlight']['content'])
+
+        # Prefixes match, and query syntax is treated as plain words
+        self.assertEqual(len(self.search(q='cerem')['entries']), 1)
+        self.assertEqual(self.search(q='tea OR "NEAR(')['entries'], [])
+
+    def test_index_follows_edits_and_deletes(self):
+        entry = JournalEntry.objects.create(user=self.user, title="", content="ငါ စိတ်ငြိမ်တယ်")
+        self.assertEqual(len(self.search(q='စိတ်ငြိမ်တယ်')['entries']), 1)
+
+        entry.content = "A quiet evening"
+        entry.save()
+        self.assertEqual(self.search(q='စိတ်ငြိမ်တယ်')['entries'], [])
+        self.assertEqual(len(self.search(q='quiet')['entries']), 1)
+
+        entry.delete()
+        self.assertEqual(self.search(q='quiet')['entries'], [])
+
+    def test_pagination(self):
+        for i in range(5):
+            DeathNoteEntry.objects.create(user=self.user, content=f"worry number {i}")
+        first = self.search('api_deathnote_search', q='worry', limit=3)
+        second = self.search('api_deathnote_search', q='worry', limit=3, page=first['next_page'])
+        self.assertEqual(len(first['entries']), 3)
+        self.assertEqual(len(second['entries']), 2)
+        self.assertIsNone(second['next_page'])
+        ids = {e['id'] for e in first['entries']} | {e['id'] for e in second['entries']}
+        self.assertEqual(len(ids), 5)
+
+    def test_page_out_of_range(self):
+        DeathNoteEntry.objects.create(user=self.user, content="worry")
+        self.assertEqual(self.search('api_deathnote_search', q='worry', page=MAX_SEARCH_PAGE)['entries'], [])
+        for page in (MAX_SEARCH_PAGE + 1, 10 ** 20):
+            response = self.client.get(reverse('api_deathnote_search'), {'q': 'worry', 'page': page})
+            self.assertEqual(response.status_code, 400)
+
+
+class InstrumentationTests(TestCase):
+    """Requests are timed, their queries counted and repeats flagged."""
+
+    def setUp(self):
+        performance_window.clear()
+        self.addCleanup(performance_window.clear)
+
+    @override_settings(DAILYSOUL_SERVER_TIMING=True)
+    def test_server_timing_and_staff_percentiles(self):
+        user = User.objects.create_user('staffer', 'staffer@example.com', 'pw')
+        self.client.force_login(user)
+        response = self.client.get(reverse('api_journal_entries'))
+        self.assertRegex(response['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"$')
+        self.assertEqual(self.client.get(reverse('api_performance')).status_code, 403)
+
+        user.is_staff = True
+        user.save()
+        summary = self.client.get(reverse('api_performance')).json()['views']
+        self.assertEqual(summary['api_journal_entries']['samples'], 1)
+        self.assertEqual(set(summary['api_journal_entries']['wall_ms']), {'p50', 'p95', 'p99', 'max'})
+        self.assertGreater(summary['api_journal_entries']['queries']['max'], 0)
+
+    def test_repeated_queries_are_flagged(self):
+        def view(request):
+            for _ in range(6):
+                list(JournalEntry.objects.filter(user_id=1))
+            return HttpResponse()
+
+        request = RequestFactory().get('/n-plus-one/')
+        with self.assertLogs('DailySoul.instrumentation', 'WARNING') as logs:
+            PerformanceMiddleware(view)(request)
+        self.assertIn('the same query ran 6 times', logs.output[0])
+        self.assertEqual(performance_window.summary()['unresolved']['queries']['max'], 6)
+
+
+class ScoreBufferTests(TransactionTestCase):
+    """Scores reach the table in batches; the timer flushes on its own thread."""
+
+    def test_flush_when_full(self):
+        buffer = ScoreBuffer(size=2, interval=60)
+        self.addCleanup(buffer.flush)
+        buffer.add(GameScore(player_name='one', game='bubble_pop', score=1))
+        self.assertEqual(GameScore.objects.count(), 0)
+        self.assertEqual(len(buffer.pending('bubble_pop')), 1)
+
+        buffer.add(GameScore(player_name='two', game='bubble_pop', score=2))
+        self.assertEqual(sorted(GameScore.objects.values_list('player_name', flat=True)), ['one', 'two'])
+        self.assertEqual(buffer.pending(), [])
+        self.assertIsNone(buffer._timer)
+
+    def test_flush_from_timer(self):
+        buffer = ScoreBuffer(size=50, interval=0.01)
+        with mock.patch.object(scores, 'connection', wraps=scores.connection) as timer_connection:
+            buffer.add(GameScore(player_name='lonely', game='bubble_pop', score=3))
+            buffer._timer.join(5)
+        self.assertEqual(GameScore.objects.get().player_name, 'lonely')
+        self.assertEqual(buffer.pending(), [])
+        timer_connection.close.assert_called_once_with()
+
+    def test_posted_score_is_saved(self):
+        user = User.objects.create_user('popper', 'popper@example.com', 'pw')
+        self.client.force_login(user)
+        response = self.client.post(
+            reverse('save_bubble_score'), json.dumps({'score': 42, 'bubbles_popped': 7}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.json()['status'], 'success')
+        score_buffer.flush()
+        saved = GameScore.objects.get()
+        self.assertEqual((saved.user, saved.player_name, saved.score), (user, 'popper', 42))
+        self.assertEqual(saved.details, {'bubbles_popped': 7})
+
+
+class LeaderboardTests(TestCase):
+    """Boards are versioned in the cache and never overwritten blindly."""
+
+    def setUp(self):
+        cache.clear()
+        self.board = Leaderboard('bubble_pop')
+        GameScore.objects.create(player_name='first', game='bubble_pop', score=10)
+
+    def players(self):
+        return [e['player'] for e in self.board.board('all_time')['entries']]
+
+    def test_record_updates_the_board(self):
+        etag = self.board.board('all_time')['etag']
+        self.board.record(GameScore(player_name='second', game='bubble_pop', score=20, created_at=timezone.now()))
+        self.assertEqual(self.players(), ['second', 'first'])
+        self.assertNotEqual(self.board.board('all_time')['etag'], etag)
+
+    def test_concurrent_record_reloads_instead_of_overwriting(self):
+        self.board.board('all_time')
+        window = 'all'
+        version = self.board._version('all_time', window, None)
+        # Another worker already stored the next version of the board
+        cache.add(self.board._board_key('all_time', window, version + 1), {'entries': []})
+        GameScore.objects.create(player_name='other', game='bubble_pop', score=30)
+
+        self.board.record(GameScore(player_name='mine', game='bubble_pop', score=20, created_at=timezone.now()))
+        self.assertNotIn(self.board._version('all_time', window, None), (version, version + 1))
+        self.assertEqual(self.players(), ['other', 'first'])
+
+    def test_buffered_score_is_listed_once(self):
+        score = GameScore(player_name='buffered', game='bubble_pop', score=20)
+        buffer = ScoreBuffer(size=50, interval=60)
+        self.addCleanup(buffer.flush)
+        with mock.patch('DailySoul.leaderboard.score_buffer', buffer):
+            buffer.add(score)
+            # A concurrent load picks the score up from the buffer first
+            self.assertEqual(self.players(), ['buffered', 'first'])
+            self.board.record(score)
+            self.assertEqual(self.players(), ['buffered', 'first'])
+            buffer.flush()
+            self.board.timeout = 0
+            self.assertEqual(self.players(), ['buffered', 'first'])
+
+    def test_boards_expire(self):
+        self.board.timeout = 0
+        self.players()
+        GameScore.objects.create(player_name='late', game='bubble_pop', score=5)
+        self.assertEqual(self.players(), ['first', 'late'])
+
+    def test_unchanged_board_is_not_modified(self):
+        url = reverse('get_bubble_high_scores')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['high_scores'], [{'player': 'first', 'score': 10}])
+        self.assertIn('Last-Modified', response)
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b'')
+        self.assertEqual(cached['ETag'], response['ETag'])
+        # Each limit is its own representation
+        self.assertEqual(self.client.get(url, {'limit': 1}, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_new_score_changes_the_etag(self):
+        url = reverse('get_bubble_high_scores')
+        etag = self.client.get(url)['ETag']
+        self.addCleanup(score_buffer.flush)
+        self.client.post(reverse('save_bubble_score'), json.dumps({'score': 50, 'player_name': 'newcomer'}),
+                         content_type='application/json')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([e['player'] for e in response.json()['high_scores']], ['newcomer', 'first'])
+
+
+class FragmentCacheTests(TestCase):
+    """Per-user, per-day fragments skip their queries until something changes."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('cached', 'cached@example.com', 'pw')
+        self.client.force_login(self.user)
+        Affirmation.objects.bulk_create([Affirmation(text=f"Cached affirmation {i}") for i in range(6)])
+
+    def tables_queried(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, ' '.join(q['sql'] for q in ctx.captured_queries)
+
+    def test_dashboard_fragments(self):
+        first, _ = self.tables_queried(reverse('dashboard'))
+        second, sql = self.tables_queried(reverse('dashboard'))
+        self.assertNotIn('DailySoul_dailyaffirmation', sql)
+        self.assertNotIn('DailySoul_journalstreak', sql)
+        self.assertEqual(first.content.count(b'aff-card'), second.content.count(b'aff-card'))
+
+        JournalEntry.objects.create(user=self.user, title="Today", content="Wrote something")
+        response, sql = self.tables_queried(reverse('dashboard'))
+        self.assertIn('DailySoul_journalstreak', sql)
+        self.assertContains(response, 'Journal streak: <strong>1</strong>')
+
+
+class WarmUpTests(TestCase):
+    def test_templates_compile_and_caches_prime(self):
+        self.assertGreater(warmup.compile_templates(), 10)
+
+        Affirmation.objects.create(text="Warm affirmation")
+        affirmation_pool.invalidate()
+        with CaptureQueriesContext(connection) as ctx:
+            warmup.prime_caches()
+        self.assertTrue(ctx.captured_queries)
+        with CaptureQueriesContext(connection) as ctx:
+            affirmation_pool.ids()
+        self.assertEqual(ctx.captured_queries, [])
+
+
+@skipUnless(connection.vendor == 'sqlite', "SQLite tuning")
+class SQLiteTuningTests(TestCase):
+    def test_pragmas_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+    def journal_mode(self):
+        # A fresh connection to a file, so configure_sqlite runs on it
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir)
+        wrapper = type(connections['default'])({**connection.settings_dict, 'NAME': os.path.join(workdir, 'db.sqlite3')})
+        try:
+            with wrapper.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                return cursor.fetchone()[0]
+        finally:
+            wrapper.close()
+
+    def test_wal_is_opt_in(self):
+        # journal_mode persists in the file, so it only changes when asked to
+        self.assertEqual(self.journal_mode(), 'wal' if settings.DAILYSOUL_SQLITE_WAL else 'delete')
+        with override_settings(DAILYSOUL_SQLITE_PRAGMAS={'journal_mode': 'WAL', **settings.DAILYSOUL_SQLITE_PRAGMAS}):
+            self.assertEqual(self.journal_mode(), 'wal')
+
+
+@override_settings(DAILYSOUL_DB_RETRY_ATTEMPTS=3)
+class RetryOnLockedTests(TransactionTestCase):
+    """Retries need to own the transaction, so no TestCase wrapper here."""
+
+    def setUp(self):
+        self.calls = []
+
+        @retry_on_locked(base_delay=0)
+        def write():
+            self.calls.append(1)
+            if len(self.calls) < 3:
+                raise OperationalError('database is locked')
+            return 'done'
+        self.write = write
+
+    def test_retries_until_the_lock_is_free(self):
+        with self.assertLogs('DailySoul.db', 'INFO'):
+            self.assertEqual(self.write(), 'done')
+        self.assertEqual(len(self.calls), 3)
+
+    def test_no_retry_inside_an_outer_transaction(self):
+        with transaction.atomic():
+            with self.assertRaises(OperationalError):
+                self.write()
+        self.assertEqual(len(self.calls), 1)
+
+
+@override_settings(DAILYSOUL_READ_REPLICAS=['replica1'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Decorated views read from a replica until their session writes. Not a
+    TestCase: reads inside its transaction would all stay on the primary.
+    """
+
+    def route(self, view, session):
+        request = RequestFactory().get('/')
+        request.session = session
+        ReplicaMiddleware(view)(request)
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        seen = []
+
+        @replica_reads
+        def view(request):
+            seen.append(router.db_for_read(JournalEntry))
+            seen.append(router.db_for_read(Session))
+            seen.append(router.db_for_write(JournalEntry))
+            seen.append(router.db_for_read(JournalEntry))
+            return HttpResponse()
+
+        session = SessionStore()
+        self.route(view, session)
+        self.assertEqual(seen, ['replica1', 'default', 'default', 'default'])
+        self.assertIn(STICKY_SESSION_KEY, session)
+
+        seen.clear()
+        self.route(view, session)
+        self.assertEqual(seen[0], 'default')
+
+    def test_reads_in_a_transaction_use_the_primary(self):
+        seen = []
+
+        @replica_reads
+        def view(request):
+            with transaction.atomic():
+                seen.append(router.db_for_read(JournalEntry))
+            seen.append(router.db_for_read(JournalEntry))
+            return HttpResponse()
+
+        self.route(view, SessionStore())
+        self.assertEqual(seen, ['default', 'replica1'])
+
+    def test_undecorated_views_use_the_primary(self):
+        seen = []
+
+        def view(request):
+            seen.append(router.db_for_read(JournalEntry))
+            return HttpResponse()
+
+        session = SessionStore()
+        self.route(view, session)
+        self.assertEqual(seen, ['default'])
+        self.assertNotIn(STICKY_SESSION_KEY, session)
+
+    # There is no second database under test; the primary stands in for its replica
+    @override_settings(DAILYSOUL_READ_REPLICAS=['default'])
+    def test_journal_post_pins_the_session(self):
+        self.client.force_login(User.objects.create_user('writer', 'writer@example.com', 'pw'))
+        self.client.get(reverse('draw_affirmation'))
+        self.assertNotIn(STICKY_SESSION_KEY, self.client.session)
+        self.client.post(reverse('journal'), {'title': 'Sticky', 'content': 'Read me back'})
+        self.assertIn(STICKY_SESSION_KEY, self.client.session)
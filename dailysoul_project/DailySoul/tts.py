@@ -0,0 +1,180 @@
+"""
+Pre-rendered text-to-speech audio for affirmations.
+
+Audio is synthesized ahead of time (prerender_tts, or a background thread
+after an affirmation is saved) and stored under ``MEDIA_ROOT/tts`` by a hash
+of backend, language and text, so each text is rendered once and a file never
+changes. Requests only ever read finished files; an affirmation without audio
+falls back to the browser's speechSynthesis.
+
+The synthesizer is chosen by ``DAILYSOUL_TTS_BACKEND`` (a dotted path); gTTS
+(``pip install gTTS``) is the default and ``StubSynthesizer`` renders silence
+for tests.
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+import unicodedata
+import wave
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from .models import Affirmation
+from .versions import bump_version, get_version
+
+logger = logging.getLogger(__name__)
+
+BURMESE_RE = re.compile(r'[\u1000-\u109F]')
+AUDIO_NAME_RE = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{64}\.(mp3|wav)$')
+CONTENT_TYPES = {'mp3': 'audio/mpeg', 'wav': 'audio/wav'}
+# Changes whenever some affirmation gets new audio; part of the dashboard's fragment key
+AUDIO_VERSION_KEY = 'dailysoul:tts:version'
+
+
+def detect_language(text):
+    return 'my' if BURMESE_RE.search(text) else 'en'
+
+
+class Synthesizer:
+    """Turns text into audio bytes. Subclasses set ``name`` and ``extension``."""
+    name = None
+    extension = None
+
+    def check(self):
+        """Raise ImproperlyConfigured when the backend can't run here."""
+
+    def synthesize(self, text, language):
+        raise NotImplementedError
+
+
+class GTTSSynthesizer(Synthesizer):
+    """Google Translate TTS through the gTTS package (needs network access)."""
+    name = 'gtts'
+    extension = 'mp3'
+
+    def check(self):
+        try:
+            import gtts  # noqa: F401
+        except ImportError:
+            raise ImproperlyConfigured("GTTSSynthesizer needs the gTTS package (pip install gTTS)")
+
+    def synthesize(self, text, language):
+        self.check()
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=language).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class StubSynthesizer(Synthesizer):
+    """Local backend for tests and development: silence, 50ms per character."""
+    name = 'stub'
+    extension = 'wav'
+    rate = 8000
+
+    def synthesize(self, text, language):
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as out:
+            out.setnchannels(1)
+            out.setsampwidth(1)
+            out.setframerate(self.rate)
+            out.writeframes(b'\x80' * (self.rate // 20) * max(1, len(text)))
+        return buffer.getvalue()
+
+
+@lru_cache(maxsize=None)
+def get_synthesizer():
+    return import_string(getattr(settings, 'DAILYSOUL_TTS_BACKEND', 'DailySoul.tts.GTTSSynthesizer'))()
+
+
+@lru_cache(maxsize=None)
+def get_storage():
+    return FileSystemStorage(location=os.path.join(settings.MEDIA_ROOT, 'tts'))
+
+
+def audio_name(text, synthesizer=None):
+    """Content address of ``text`` rendered by ``synthesizer``: 'ab/abcd….mp3'."""
+    synthesizer = synthesizer or get_synthesizer()
+    text = unicodedata.normalize('NFC', ' '.join(text.split()))
+    key = f"{synthesizer.name}|{detect_language(text)}|{text}"
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+    return f"{digest[:2]}/{digest}.{synthesizer.extension}"
+
+
+def audio_url(affirmation):
+    """URL of the affirmation's rendered audio, or '' when it isn't rendered (yet)."""
+    if not affirmation.audio or affirmation.audio != audio_name(affirmation.text):
+        return ''
+    return reverse('tts_audio', args=[affirmation.audio])
+
+
+def render(text):
+    """Synthesize ``text`` unless its audio is already stored. Returns the name."""
+    synthesizer = get_synthesizer()
+    name = audio_name(text, synthesizer)
+    storage = get_storage()
+    if not storage.exists(name):
+        data = synthesizer.synthesize(' '.join(text.split()), detect_language(text))
+        # A concurrent render of the same text may have won; same bytes either way
+        if not storage.exists(name):
+            storage.save(name, ContentFile(data))
+    return name
+
+
+def audio_version():
+    return get_version(AUDIO_VERSION_KEY)
+
+
+def bump_audio_version():
+    """Expire pages that embed audio URLs. Pool membership doesn't change."""
+    bump_version(AUDIO_VERSION_KEY)
+
+
+def render_affirmation(affirmation, bump=True):
+    """
+    Render one affirmation and record it. Returns True when its audio changed.
+    Batch callers pass ``bump=False`` and call bump_audio_version() once at
+    the end.
+    """
+    name = render(affirmation.text)
+    if affirmation.audio == name:
+        return False
+    # Matching on text skips rows edited while this one was being rendered
+    Affirmation.objects.filter(pk=affirmation.pk, text=affirmation.text).update(audio=name)
+    affirmation.audio = name
+    if bump:
+        bump_audio_version()
+    return True
+
+
+def render_in_background(affirmation_id):
+    """Render a just-saved affirmation on a daemon thread, off the request."""
+    def run():
+        try:
+            affirmation = Affirmation.objects.filter(pk=affirmation_id).only('pk', 'text', 'audio').first()
+            if affirmation is not None:
+                render_affirmation(affirmation)
+        except Exception:
+            logger.exception("Could not render TTS audio for affirmation %s", affirmation_id)
+        finally:
+            # The thread ends here, so its connection must not outlive it
+            connection.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def content_type(name):
+    return CONTENT_TYPES.get(name.rsplit('.', 1)[-1], 'application/octet-stream')
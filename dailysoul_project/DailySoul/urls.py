@@ -1,6 +1,12 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# JSON API endpoints that also have a native async implementation
+api = views
+if settings.DAILYSOUL_ASYNC_API:
+    from . import async_views as api
+
 urlpatterns = [
     path('', views.home, name='home'),
     path('register/', views.register_view, name='register'),
@@ -8,13 +14,21 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('dashboard/', views.dashboard, name='dashboard'),
     path('affirmations/', views.affirmations_page, name='affirmations'),
-    path('draw_affirmation/', views.draw_affirmation, name='draw_affirmation'),
-    path('api/get-piles/', views.api_get_piles, name='api_get_piles'),
+    path('draw_affirmation/', api.draw_affirmation, name='draw_affirmation'),
+    path('api/get-piles/', api.api_get_piles, name='api_get_piles'),
     path('journal/', views.journal, name='journal'),
+    path('api/journal/entries/', views.api_journal_entries, name='api_journal_entries'),
+    path('api/journal/search/', views.api_journal_search, name='api_journal_search'),
     path('deathnote/', views.deathnote, name='death_note'),
+    path('api/deathnote/entries/', views.api_deathnote_entries, name='api_deathnote_entries'),
+    path('api/deathnote/search/', views.api_deathnote_search, name='api_deathnote_search'),
     path('games/bubble-pop/', views.bubble_pop_game, name='bubble_pop'),
-    path('games/bubble-pop/save-score/', views.save_bubble_score, name='save_bubble_score'),
-    path('games/bubble-pop/high-scores/', views.get_bubble_high_scores, name='get_bubble_high_scores'),
+    path('games/bubble-pop/save-score/', api.save_bubble_score, name='save_bubble_score'),
+    path('games/bubble-pop/high-scores/', api.get_bubble_high_scores, name='get_bubble_high_scores'),
     path('color_therapy/', views.color_therapy, name='color_therapy'),
     path('memory_match/', views.memory_match_game, name='memory_match'),
+    path('games/memory-match/save-score/', views.save_memory_match_score, name='save_memory_match_score'),
+    path('games/memory-match/high-scores/', views.get_memory_match_high_scores, name='get_memory_match_high_scores'),
+    path('api/performance/', views.api_performance, name='api_performance'),
+    path('tts/<path:name>', views.tts_audio, name='tts_audio'),
 ]
@@ -0,0 +1,49 @@
+"""
+Version counters kept in the cache.
+
+Cached data that can't be invalidated key by key (pool id lists, leaderboard
+boards, dashboard fragments) is stored under, or checked against, a counter
+that writers bump. A counter starts at a random value, so one that is
+evicted and recreated doesn't come back at a number that old entries were
+stored under.
+"""
+import random
+
+from django.core.cache import cache
+
+
+def get_version(key, timeout=None):
+    """The counter at ``key``, started at a random value if missing."""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, random.getrandbits(48), timeout)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(key, timeout=None):
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, random.getrandbits(48), timeout)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # No version stored yet; the next read starts a fresh one
+        pass
+
+
+async def abump_version(key):
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        pass
+
+
+def reset_version(key, timeout=None):
+    """Jump to a fresh random value, whatever the counter was."""
+    cache.set(key, random.getrandbits(48), timeout)
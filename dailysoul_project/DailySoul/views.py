@@ -1,3 +1,6 @@
+import logging
+import re
+
 from .models import Affirmation, LuckCard, DailyAffirmation,DeathNoteEntry,JournalEntry
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
@@ -7,14 +10,38 @@ from .forms import RegisterForm
 from django.contrib.auth import login
 from django.contrib.auth.forms import AuthenticationForm
 from django.db import transaction
-from django.http import JsonResponse
-from django.templatetags.static import static
-from .models import LuckCard, DailyPileDraw, PileCardSelection
-import random
+from django.db.models import F
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.static import serve as static_serve
+from django.views.decorators.http import require_safe
+from django.conf import settings
+from .models import LuckCard, DailyPileDraw, PileCardSelection, GameScore
+from .selection import affirmation_pool, luck_card_pool
+from .categories import draw
+from .images import pick_variant, variant_srcset
+from .serializers import pile_card_serializer
+from .storage import is_hashed_name
+from .tts import AUDIO_NAME_RE, audio_url, audio_version, content_type as tts_content_type, get_storage as get_tts_storage
+from .daily import cache_pile_snapshot, fragment_context, get_daily_affirmations, get_pile_snapshot
+from .streaks import entry_day, get_journal_streak
+from .pagination import keyset_page, page_size_param
+from .search import MAX_PAGE as MAX_SEARCH_PAGE, search_entries
+from .db import retry_on_locked
+from .routers import replica_reads
+from .instrumentation import performance_window
+from .leaderboard import PERIODS, leaderboards, record_score
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
+from django.utils.dateformat import format as date_format
+from django.utils.text import Truncator
+from django.utils.timesince import timesince
 from django.contrib.auth.decorators import login_required
 from collections import OrderedDict
+from itertools import groupby
+
+logger = logging.getLogger(__name__)
 
 
 
@@ -104,47 +131,166 @@ def affirmations_page(request):
     return render(request, 'affirmations.html')
 
 
-# 💫 API: Draw a single random affirmation
-def draw_affirmation(request):
-    affirmations = list(Affirmation.objects.all())
-    if not affirmations:
-        return JsonResponse({'affirmation': "No affirmations yet.", 'image': '', 'category': ''})
+# The affirmation card image renders 310px wide; 2x for high-density screens
+AFFIRMATION_IMAGE_WIDTH = 620
 
-    card = random.choice(affirmations)
-    return JsonResponse({
+
+def _affirmation_payload(card):
+    if card is None:
+        return {
+            'affirmation': "No affirmations yet.", 'image': '', 'image_srcset': '', 'category': '', 'category_slug': '',
+            'audio': '',
+        }
+
+    return {
         'affirmation': card.text,
-        'image': card.image.url if card.image else '',
-        'category': card.category
-    })
+        'image': pick_variant(card, AFFIRMATION_IMAGE_WIDTH),
+        'image_srcset': variant_srcset(card),
+        'category': card.category.name if card.category else '',
+        'category_slug': card.category.slug if card.category else '',
+        'audio': audio_url(card),
+    }
+
+
+def _draw_response(request, card):
+    if card is None and (request.GET.get('category') or request.GET.get('mix')):
+        return JsonResponse(
+            dict(_affirmation_payload(None), error='No affirmations in the requested categories'), status=404
+        )
+    return JsonResponse(_affirmation_payload(card))
+
+
+# 💫 API: Draw a single random affirmation, optionally ?category=calm or ?mix=calm:3,gratitude:1
+@replica_reads
+def draw_affirmation(request):
+    try:
+        card = draw(request.GET.get('category'), request.GET.get('mix'))
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    return _draw_response(request, card)
 
 
 # 🌟 Dashboard: Random Luck Card + 5 Daily Affirmations
+@replica_reads
 def dashboard(request):
     # Check user is logged in
     if not request.user.is_authenticated:
         return redirect('login')
 
-    # Pick 1 random luck card
-    luck_card = random.choice(list(LuckCard.objects.all())) if LuckCard.objects.exists() else None
-
-    # Pick 5 random affirmations
-    all_affirmations = list(Affirmation.objects.all())
-    affirmations = random.sample(all_affirmations, min(5, len(all_affirmations))) if all_affirmations else []
-
-    # Optionally record today’s daily affirmations for the user
-    today = timezone.now().date()
-    daily_record, created = DailyAffirmation.objects.get_or_create(user=request.user, date=today)
-    if created:
-        daily_record.affirmations.set(affirmations)
-
+    # Today's 5 affirmations: sampled on the first visit, then served from the saved set.
+    # Passed as callables, so they only run when their cached fragment has expired
+    today = timezone.localdate()
     return render(request, 'dashboard.html', {
-        'luck_card': luck_card,
-        'affirmations': affirmations
+        'affirmations': lambda: get_daily_affirmations(request.user, today),
+        'affirmations_version': affirmation_pool.version(),
+        'audio_version': audio_version(),
+        'streak': lambda: get_journal_streak(request.user),
+        **fragment_context(today),
     })
 
 
 MAX_DRAWS_PER_DAY = 3
 
+
+def _exhausted_piles_payload(request, daily_draw, selections, fallback_cards):
+    """Payload for a user who has used all of today's draws."""
+    if selections:
+        payload = {
+            'piles': pile_card_serializer.entries(request, ((sel.position, sel.card) for sel in selections)),
+            'remaining_draws': 0,
+            'draw_allowed': False,
+            'message': 'Maximum draws reached for today'
+        }
+        cache_pile_snapshot(daily_draw.user_id, daily_draw.date, payload)
+        return payload
+
+    # Edge case: draw_count says used but no saved selections
+    # Return a random (non-saved) sample to allow frontend to display images
+    return {
+        'piles': pile_card_serializer.entries(request, enumerate(fallback_cards, start=1)),
+        'remaining_draws': 0,
+        'draw_allowed': False,
+        'message': 'Maximum draws reached for today (no saved selections found)'
+    }
+
+
+def _exhausted_piles_response(request, daily_draw):
+    selections = list(
+        PileCardSelection.objects.filter(daily_draw=daily_draw).select_related('card').order_by('position')
+    )
+    fallback_cards = [] if selections else luck_card_pool.sample(3)
+    return JsonResponse(_exhausted_piles_payload(request, daily_draw, selections, fallback_cards), status=200)
+
+
+def _not_enough_cards_payload(daily_draw):
+    return {
+        'piles': [],
+        'remaining_draws': max(0, MAX_DRAWS_PER_DAY - daily_draw.draw_count),
+        'draw_allowed': daily_draw.draw_count < MAX_DRAWS_PER_DAY,
+        'message': 'Not enough cards available'
+    }
+
+
+@retry_on_locked()
+def _get_daily_draw(user, date):
+    daily_draw, _ = DailyPileDraw.objects.get_or_create(user=user, date=date, defaults={'draw_count': 0})
+    return daily_draw
+
+
+@retry_on_locked()
+def _claim_draw(daily_draw):
+    """
+    Use one of today's draws and save three new cards for it. Returns the new
+    selections, or None when a concurrent request used up the last draw.
+    """
+    with transaction.atomic():
+        # Claim a draw with a conditional increment, so two concurrent
+        # requests can't both slip under MAX_DRAWS_PER_DAY
+        claimed = DailyPileDraw.objects.filter(
+            pk=daily_draw.pk,
+            draw_count__lt=MAX_DRAWS_PER_DAY
+        ).update(draw_count=F('draw_count') + 1)
+        if not claimed:
+            return None
+
+        selected_cards = luck_card_pool.sample(3)
+
+        # Overwrite the three positions in a single upsert
+        created_selections = PileCardSelection.objects.bulk_create(
+            [
+                PileCardSelection(daily_draw=daily_draw, card=card, position=i)
+                for i, card in enumerate(selected_cards, start=1)
+            ],
+            update_conflicts=True,
+            unique_fields=['daily_draw', 'position'],
+            update_fields=['card'],
+        )
+        daily_draw.refresh_from_db(fields=['draw_count'])
+    return created_selections
+
+
+def _drawn_piles_payload(request, daily_draw, created_selections):
+    piles_data = pile_card_serializer.entries(
+        request, ((i, sel.card) for i, sel in enumerate(created_selections, start=1))
+    )
+
+    remaining = max(0, MAX_DRAWS_PER_DAY - daily_draw.draw_count)
+    if remaining == 0:
+        # Last draw of the day: later polls get this set from the cache
+        cache_pile_snapshot(daily_draw.user_id, daily_draw.date, {
+            'piles': piles_data,
+            'remaining_draws': 0,
+            'draw_allowed': False,
+            'message': 'Maximum draws reached for today'
+        })
+
+    return {
+        'piles': piles_data,
+        'remaining_draws': remaining,
+        'draw_allowed': remaining > 0
+    }
+
+
 def api_get_piles(request):
     # Only GET allowed
     if request.method != 'GET':
@@ -153,147 +299,69 @@ def api_get_piles(request):
     if not request.user.is_authenticated:
         return JsonResponse({'error': 'Authentication required'}, status=401)
 
-    today = timezone.now().date()
+    today = timezone.localdate()
+
+    # Finished days are served from the cache without touching the database
+    snapshot = get_pile_snapshot(request.user.pk, today)
+    if snapshot is not None:
+        return JsonResponse(snapshot, status=200)
 
     try:
         # Get or create today's draw record
-        daily_draw, created = DailyPileDraw.objects.get_or_create(
-            user=request.user,
-            date=today,
-            defaults={'draw_count': 0}
-        )
-
-        available_cards = list(LuckCard.objects.all())
+        daily_draw = _get_daily_draw(request.user, today)
 
-        if len(available_cards) < 3:
+        if luck_card_pool.count() < 3:
             # Not enough cards to pick from — let the frontend know
-            return JsonResponse({
-                'piles': [],
-                'remaining_draws': max(0, MAX_DRAWS_PER_DAY - daily_draw.draw_count),
-                'draw_allowed': daily_draw.draw_count < MAX_DRAWS_PER_DAY,
-                'message': 'Not enough cards available'
-            }, status=200)
+            return JsonResponse(_not_enough_cards_payload(daily_draw), status=200)
 
         # If user already reached maximum draws, return the existing saved selections if present
         if daily_draw.draw_count >= MAX_DRAWS_PER_DAY:
-            selections = PileCardSelection.objects.filter(daily_draw=daily_draw).order_by('position')
-            if selections.exists():
-                piles_data = []
-                for sel in selections:
-                    card = sel.card
-                    # safe image URL: absolute if possible, fallback to static
-                    try:
-                        image_url = request.build_absolute_uri(card.image.url) if card.image else request.build_absolute_uri(static('images/default-card.jpg'))
-                    except Exception:
-                        image_url = card.image.url if card.image else static('images/default-card.jpg')
-
-                    piles_data.append({
-                        'id': sel.position,
-                        'image_url': image_url,
-                        'message': card.message or ''
-                    })
-
-                return JsonResponse({
-                    'piles': piles_data,
-                    'remaining_draws': 0,
-                    'draw_allowed': False,
-                    'message': 'Maximum draws reached for today'
-                }, status=200)
-            else:
-                # Edge case: draw_count says used but no saved selections
-                # Return a random (non-saved) sample to allow frontend to display images
-                sample = random.sample(available_cards, 3)
-                piles_data = []
-                for idx, card in enumerate(sample, start=1):
-                    try:
-                        image_url = request.build_absolute_uri(card.image.url) if card.image else request.build_absolute_uri(static('images/default-card.jpg'))
-                    except Exception:
-                        image_url = card.image.url if card.image else static('images/default-card.jpg')
-
-                    piles_data.append({
-                        'id': idx,
-                        'image_url': image_url,
-                        'message': card.message or ''
-                    })
-
-                return JsonResponse({
-                    'piles': piles_data,
-                    'remaining_draws': 0,
-                    'draw_allowed': False,
-                    'message': 'Maximum draws reached for today (no saved selections found)'
-                }, status=200)
+            return _exhausted_piles_response(request, daily_draw)
 
         # At this point user is allowed to draw (draw_count < MAX)
-        with transaction.atomic():
-            selected_cards = random.sample(available_cards, 3)
-
-            # Clear previous saved selections for this daily_draw and create new ones
-            PileCardSelection.objects.filter(daily_draw=daily_draw).delete()
-            created_selections = []
-            for i, card in enumerate(selected_cards, start=1):
-                sel = PileCardSelection.objects.create(
-                    daily_draw=daily_draw,
-                    card=card,
-                    position=i
-                )
-                created_selections.append(sel)
-
-            # Increment draw count and save
-            daily_draw.draw_count += 1
-            daily_draw.save()
-
-        # Build response payload
-        piles_data = []
-        for i, sel in enumerate(created_selections, start=1):
-            card = sel.card
-            try:
-                image_url = request.build_absolute_uri(card.image.url) if card.image else request.build_absolute_uri(static('images/default-card.jpg'))
-            except Exception:
-                image_url = card.image.url if card.image else static('images/default-card.jpg')
+        created_selections = _claim_draw(daily_draw)
+        if created_selections is None:
+            # A concurrent request used up the last draw
+            return _exhausted_piles_response(request, daily_draw)
 
-            piles_data.append({
-                'id': i,
-                'image_url': image_url,
-                'message': card.message or ''
-            })
+        return JsonResponse(_drawn_piles_payload(request, daily_draw, created_selections), status=200)
 
-        remaining = max(0, MAX_DRAWS_PER_DAY - daily_draw.draw_count)
-        return JsonResponse({
-            'piles': piles_data,
-            'remaining_draws': remaining,
-            'draw_allowed': remaining > 0
-        }, status=200)
+    except Exception:
+        # Logged for us; the client gets a generic message, not the exception text
+        logger.exception("Could not draw piles for user %s", request.user.pk)
+        return JsonResponse({'error': 'Could not draw cards, please try again'}, status=500)
 
-    except Exception as exc:
-        # Safe error response for debugging (in production you might want to log and return a generic message)
-        return JsonResponse({'error': str(exc)}, status=500)
 
+# Entry writes run as one transaction with their streak and search index
+# updates, so a locked database can retry the whole thing
 
-@login_required
-def journal(request):
-    # Get all entries grouped by date
-    all_entries = JournalEntry.objects.filter(user=request.user).order_by('-created_at')
+@retry_on_locked()
+def _save_journal_entry(user, entry_id, title, content):
+    with transaction.atomic():
+        if entry_id:
+            # Editing an existing entry
+            entry = get_object_or_404(JournalEntry, id=entry_id, user=user)
+            entry.title = title
+            entry.content = content
+            entry.save()
+        else:
+            # Creating a new entry
+            JournalEntry.objects.create(user=user, title=title, content=content)
 
-    # Group entries by date
-    entries_by_date = OrderedDict()
-    for entry in all_entries:
-        date_key = entry.created_at.date()
-        if date_key not in entries_by_date:
-            entries_by_date[date_key] = []
-        entries_by_date[date_key].append(entry)
 
-    # Sort dates in descending order
-    entries_by_date = OrderedDict(sorted(entries_by_date.items(), key=lambda x: x[0], reverse=True))
+@retry_on_locked()
+def _delete_journal_entry(user, entry_id):
+    with transaction.atomic():
+        get_object_or_404(JournalEntry, id=entry_id, user=user).delete()
 
-    # Simple streak calculation
-    streak = calculate_streak_simple(request.user)
 
+@replica_reads
+@login_required
+def journal(request):
     if request.method == 'POST':
         # Check if it's a delete request
         if 'delete_id' in request.POST:
-            entry_id = request.POST.get('delete_id')
-            entry = get_object_or_404(JournalEntry, id=entry_id, user=request.user)
-            entry.delete()
+            _delete_journal_entry(request.user, request.POST.get('delete_id'))
             messages.success(request, 'Journal entry deleted successfully!')
             return redirect('journal')
 
@@ -302,145 +370,183 @@ def journal(request):
         title = request.POST.get('title', '').strip()
         content = request.POST.get('content', '').strip()
 
-        if entry_id:
-            # Editing an existing entry
-            entry = get_object_or_404(JournalEntry, id=entry_id, user=request.user)
-            entry.title = title
-            entry.content = content
-            entry.save()
-            messages.success(request, 'Entry updated successfully!')
-        else:
-            # Creating a new entry
-            JournalEntry.objects.create(
-                user=request.user,
-                title=title,
-                content=content
-            )
-            messages.success(request, 'Entry saved successfully!')
+        _save_journal_entry(request.user, entry_id, title, content)
+        messages.success(request, 'Entry updated successfully!' if entry_id else 'Entry saved successfully!')
 
         return redirect('journal')
 
+    # First page only; older entries are fetched by api_journal_entries on scroll.
+    # Entries come back newest first, so one pass groups them by local date
+    page, next_cursor = keyset_page(JournalEntry.objects.filter(user=request.user))
+    entries_by_date = OrderedDict(
+        (date_key, list(entries))
+        for date_key, entries in groupby(page, key=entry_day)
+    )
+
     context = {
         'entries_by_date': entries_by_date,
-        'streak': streak,
+        'streak': lambda: get_journal_streak(request.user),
         'current_date': timezone.now(),
+        'next_cursor': next_cursor,
+        **fragment_context(timezone.localdate()),
     }
 
     return render(request, 'journal.html', context)
 
 
-def calculate_streak_simple(user):
-    """Simple streak calculation using UTC"""
-    entries = JournalEntry.objects.filter(user=user).order_by('-created_at')
-    if not entries:
-        return 0
+def _journal_entry_data(entry):
+    created = timezone.localtime(entry.created_at)
+    return {
+        'id': entry.id,
+        'title': entry.title or 'Untitled',
+        'content': entry.content,
+        'snippet': Truncator(entry.content).chars(100),
+        'day': created.date().isoformat(),
+        'day_label': date_format(created, 'F j, Y'),
+        'date': date_format(created, 'M d, Y'),
+        'time': date_format(created, 'g:i A'),
+    }
+
+
+@replica_reads
+def api_journal_entries(request):
+    """Older journal entries for infinite scroll, one keyset page per call"""
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    entries, next_cursor = keyset_page(
+        JournalEntry.objects.filter(user=request.user),
+        request.GET.get('cursor'),
+        page_size_param(request),
+    )
+    return JsonResponse({
+        'entries': [_journal_entry_data(entry) for entry in entries],
+        'next_cursor': next_cursor,
+    })
 
-    streak = 0
-    current_date = timezone.now().date()
 
-    # Check consecutive days with entries
-    for i in range(len(entries)):
-        entry_date = entries[i].created_at.date()
-        days_diff = (current_date - entry_date).days
+@retry_on_locked()
+def _create_death_note(user, content):
+    with transaction.atomic():
+        DeathNoteEntry.objects.create(user=user, content=content)
 
-        if days_diff == i:
-            streak += 1
-        else:
-            break
 
-    return streak
+@retry_on_locked()
+def _delete_death_note(user, note_id):
+    with transaction.atomic():
+        DeathNoteEntry.objects.get(id=note_id, user=user).delete()
 
 
 @login_required
-def death_note(request):
+def deathnote(request):
     # Handle POST request first (form submission)
     if request.method == 'POST':
         content = request.POST.get('content', '').strip()
-        mood = request.POST.get('mood', '').strip()
-
-        print(f"DEBUG: Form submitted - User: {request.user}, Content: {content}")  # Debug
 
         if content:
             try:
-                DeathNoteEntry.objects.create(
-                    user=request.user,
-                    content=content,
-                    mood=mood if mood else None
-                )
+                _create_death_note(request.user, content)
                 messages.success(request, 'Negative thought captured in Death Note!')
-                print(f"DEBUG: Successfully created entry for user {request.user}")  # Debug
-            except Exception as e:
-                messages.error(request, f'Error saving thought: {str(e)}')
-                print(f"DEBUG: Error creating entry: {e}")  # Debug
+            except Exception:
+                logger.exception("Could not save death note entry for user %s", request.user.pk)
+                messages.error(request, 'Could not save your thought, please try again.')
         else:
             messages.error(request, 'Please write something before submitting.')
 
         return redirect('death_note')
 
+    # Handle GET request (viewing page or deleting)
     delete_id = request.GET.get('delete')
     if delete_id:
         try:
-            entry = DeathNoteEntry.objects.get(id=delete_id, user=request.user)
-            entry.delete()
+            _delete_death_note(request.user, delete_id)
             messages.success(request, 'Thought released successfully!')
-            print(f"DEBUG: Successfully deleted entry {delete_id}")  # Debug
             return redirect('death_note')
-        except DeathNoteEntry.DoesNotExist:
+        except (DeathNoteEntry.DoesNotExist, ValueError):
             messages.error(request, 'Thought not found.')
-        except Exception as e:
-            messages.error(request, f'Error deleting thought: {str(e)}')
 
-    # Get all notes for the current user
-    notes = DeathNoteEntry.objects.filter(user=request.user).order_by('-created_at')
-    print(f"DEBUG: Found {notes.count()} notes for user {request.user}")  # Debug
+    # First page of notes; the rest load through api_deathnote_entries on scroll
+    user_notes = DeathNoteEntry.objects.filter(user=request.user)
+    notes, next_cursor = keyset_page(user_notes)
 
     context = {
-        'notes': notes
+        'notes': notes,
+        'note_count': user_notes.count(),
+        'next_cursor': next_cursor,
     }
-    return render(request, 'death_note.html', context)# views.py
+    return render(request, 'death_note.html', context)
 
 
-@login_required
-def deathnote(request):
-    # Handle POST request first (form submission)
-    if request.method == 'POST':
-        content = request.POST.get('content', '').strip()
+def api_deathnote_entries(request):
+    """Older death note entries for infinite scroll, one keyset page per call"""
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
 
+    notes, next_cursor = keyset_page(
+        DeathNoteEntry.objects.filter(user=request.user),
+        request.GET.get('cursor'),
+        page_size_param(request),
+    )
+    return JsonResponse({
+        'entries': [_deathnote_entry_data(note) for note in notes],
+        'next_cursor': next_cursor,
+    })
 
-        if content:
-            try:
-                DeathNoteEntry.objects.create(
-                    user=request.user,
-                    content=content,
 
-                )
-                messages.success(request, 'Negative thought captured in Death Note!')
+def _deathnote_entry_data(note):
+    return {
+        'id': note.id,
+        'content': note.content,
+        'mood': note.mood or '',
+        'timesince': timesince(note.created_at),
+    }
 
-            except Exception as e:
-                messages.error(request, f'Error saving thought: {str(e)}')
-        else:
-            messages.error(request, 'Please write something before submitting.')
 
-        return redirect('death_note')
+def _search_response(request, kind, entry_data):
+    """
+    One page of ranked search results. Each entry carries ``highlight``:
+    HTML-escaped fields with the matched terms in <mark>.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
 
-    # Handle GET request (viewing page or deleting)
-    delete_id = request.GET.get('delete')
-    if delete_id:
-        try:
-            entry = DeathNoteEntry.objects.get(id=delete_id, user=request.user)
-            entry.delete()
-            messages.success(request, 'Thought released successfully!')
-            return redirect('death_note')
-        except DeathNoteEntry.DoesNotExist:
-            messages.error(request, 'Thought not found.')
+    query = request.GET.get('q', '').strip()
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+    if page > MAX_SEARCH_PAGE:
+        return JsonResponse({'error': f'page must be at most {MAX_SEARCH_PAGE}'}, status=400)
 
-    # Get all notes for the current user
-    notes = DeathNoteEntry.objects.filter(user=request.user).order_by('-created_at')
+    results, has_next = search_entries(request.user, kind, query, page, page_size_param(request))
+    return JsonResponse({
+        'query': query,
+        'entries': [dict(entry_data(entry), highlight=fields) for entry, fields in results],
+        'next_page': page + 1 if has_next else None,
+    })
 
-    context = {
-        'notes': notes
-    }
-    return render(request, 'death_note.html', context)
+
+def api_journal_search(request):
+    """Full-text search over the user's journal, best match first"""
+    return _search_response(request, 'journal', _journal_entry_data)
+
+
+def api_deathnote_search(request):
+    """Full-text search over the user's death note"""
+    return _search_response(request, 'deathnote', _deathnote_entry_data)
+
+
+def api_performance(request):
+    """Rolling per-view latency and query percentiles from this process, for staff"""
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff only'}, status=403)
+
+    return JsonResponse({
+        'window': performance_window.size,
+        'views': performance_window.summary(),
+    })
 
 from django.shortcuts import render
 
@@ -457,23 +563,42 @@ def bubble_pop_game(request):
     return render(request, 'bubble_pop.html')
 
 
+def _bubble_score(data, user):
+    """Validate a bubble pop submission and build its (unsaved) GameScore"""
+    score = int(data.get('score', 0))
+    bubbles_popped = int(data.get('bubbles_popped', 0))
+    if score < 0 or bubbles_popped < 0:
+        raise ValueError('Scores cannot be negative')
+
+    if user.is_authenticated:
+        player_name = user.username
+    else:
+        player_name = str(data.get('player_name') or 'Guest').strip()[:50] or 'Guest'
+
+    return GameScore(
+        user=user if user.is_authenticated else None,
+        player_name=player_name,
+        game='bubble_pop',
+        score=score,
+        details={'bubbles_popped': bubbles_popped},
+    )
+
+
 @csrf_exempt
 def save_bubble_score(request):
     """Save bubble pop game score"""
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            score = data.get('score', 0)
-            bubbles_popped = data.get('bubbles_popped', 0)
+            game_score = _bubble_score(data, request.user)
 
-            # Here you can save to database if you want
-            # For example, if you have a GameScore model:
-            # GameScore.objects.create(user=request.user, game='bubble_pop', score=score)
+            # Buffered: written to the database in batches by scores.score_buffer
+            record_score(game_score)
 
             return JsonResponse({
                 'status': 'success',
-                'score': score,
-                'bubbles_popped': bubbles_popped,
+                'score': game_score.score,
+                'bubbles_popped': game_score.details['bubbles_popped'],
                 'message': 'Score recorded!'
             })
         except Exception as e:
@@ -482,16 +607,44 @@ def save_bubble_score(request):
     return JsonResponse({'status': 'error', 'message': 'Invalid request'})
 
 
+@replica_reads
 def get_bubble_high_scores(request):
+    return _high_scores_response(request, 'bubble_pop')
+
+
+def _high_scores_query(request, game):
+    """(period, limit, None) from the query string, or (None, None, error response)"""
+    period = request.GET.get('period', 'all_time')
+    if period not in PERIODS:
+        return None, None, JsonResponse({'error': f"period must be one of {', '.join(PERIODS)}"}, status=400)
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 5)), leaderboards[game].size))
+    except ValueError:
+        limit = 5
+    return period, limit, None
+
+
+def _board_response(request, board, period, limit):
+    """
+    Leaderboard JSON with ETag / Last-Modified validators. A client that
+    already has the current board gets a 304 before anything is serialized.
+    """
+    etag = f'"{board["etag"]}-{limit}"'
+    response = get_conditional_response(request, etag=etag, last_modified=board['updated_at'])
+    if response is None:
+        response = JsonResponse({'high_scores': board['entries'][:limit], 'period': period})
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(board['updated_at'])
+    # Let browsers keep the body but revalidate every time
+    response['Cache-Control'] = 'no-cache'
+    return response
+
 
-    high_scores = [
-        {'player': 'Player1', 'score': 1500},
-        {'player': 'Player2', 'score': 1200},
-        {'player': 'Player3', 'score': 900},
-        {'player': 'Player4', 'score': 800},
-        {'player': 'Player5', 'score': 750},
-    ]
-    return JsonResponse({'high_scores': high_scores})
+def _high_scores_response(request, game):
+    period, limit, error = _high_scores_query(request, game)
+    if error is not None:
+        return error
+    return _board_response(request, leaderboards[game].board(period), period, limit)
 
 
 # games/views.py
@@ -509,4 +662,130 @@ from django.shortcuts import render
 
 def memory_match_game(request):
 
-    return render(request, 'memory_match.html')
\ No newline at end of file
+    return render(request, 'memory_match.html')
+
+
+def memory_match_score(moves, seconds):
+    """Fewer moves and a faster finish score higher"""
+    return max(0, 1000 - 10 * moves - 2 * seconds)
+
+
+@csrf_exempt
+def save_memory_match_score(request):
+    """Save a finished memory match game"""
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'Invalid request'})
+    try:
+        data = json.loads(request.body)
+        moves = int(data.get('moves', 0))
+        seconds = int(data.get('seconds', 0))
+        if moves < 0 or seconds < 0:
+            raise ValueError('Moves and time cannot be negative')
+    except (ValueError, TypeError) as e:
+        return JsonResponse({'status': 'error', 'message': str(e)})
+
+    score = memory_match_score(moves, seconds)
+    record_score(GameScore(
+        user=request.user if request.user.is_authenticated else None,
+        player_name=request.user.username if request.user.is_authenticated else 'Guest',
+        game='memory_match',
+        score=score,
+        details={'moves': moves, 'seconds': seconds},
+    ))
+    return JsonResponse({'status': 'success', 'score': score, 'message': 'Score recorded!'})
+
+
+@replica_reads
+def get_memory_match_high_scores(request):
+    return _high_scores_response(request, 'memory_match')
+
+
+def _immutable_response(request, name, respond):
+    """
+    Response for the content-addressed file ``name``, cacheable for good.
+    The hash in the name is its ETag, so a client that has the file gets a
+    304; otherwise ``respond(etag)`` builds the response.
+    """
+    # Content-addressed, so the name is the version
+    etag = '"%s"' % name.rsplit('/', 1)[-1].split('.')[0]
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = respond(etag)
+    if response.status_code < 400:
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+# 🖼️ Media files: content-hashed names never change, so cache them for good
+@require_safe
+def serve_media(request, path):
+    if is_hashed_name(path):
+        return _immutable_response(
+            request, path, lambda etag: static_serve(request, path, document_root=settings.MEDIA_ROOT)
+        )
+    response = static_serve(request, path, document_root=settings.MEDIA_ROOT)
+    # Older uploads keep their names and may be replaced; revalidate them
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _byte_range(header, size):
+    """
+    (start, end) of a single ``Range: bytes=`` request, inclusive; None to send
+    the whole file (no or unsupported header). Raises ValueError when the
+    range can't be satisfied.
+    """
+    match = re.fullmatch(r'bytes=(\d*)-(\d*)', header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+# 🔊 Pre-rendered affirmation audio, with byte ranges so players can seek
+@require_safe
+def tts_audio(request, name):
+    if not AUDIO_NAME_RE.match(name):
+        raise Http404("Unknown audio")
+    storage = get_tts_storage()
+    try:
+        size = storage.size(name)
+    except OSError:
+        raise Http404("Audio not rendered")
+
+    return _immutable_response(request, name, lambda etag: _audio_file_response(request, storage, name, size, etag))
+
+
+def _audio_file_response(request, storage, name, size, etag):
+    """The whole audio file, or the byte range the request asks for."""
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if request.headers.get('Range') and (not if_range or if_range == etag):
+        try:
+            byte_range = _byte_range(request.headers['Range'], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None:
+        response = FileResponse(storage.open(name, 'rb'), content_type=tts_content_type(name))
+    else:
+        start, end = byte_range
+        with storage.open(name, 'rb') as fh:
+            fh.seek(start)
+            response = HttpResponse(fh.read(end - start + 1), status=206, content_type=tts_content_type(name))
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
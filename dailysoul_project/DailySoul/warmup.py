@@ -0,0 +1,113 @@
+"""
+Start-up warm-up, so the first requests a fresh worker serves are not the
+slow ones.
+
+``DailySoulConfig.ready`` calls ``start()`` when ``DAILYSOUL_WARM_UP`` is
+on (the production default). Every template is compiled right away, into the
+cached loader. The random pools and the pile card URLs are primed on a
+background thread once the app registry is ready; Django warns about
+queries run from ready() itself. Management commands other than runserver
+skip the warm-up.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from itertools import islice
+
+from django.apps import apps
+from django.db import close_old_connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+SERVER_COMMANDS = {'runserver'}
+CARD_BATCH_SIZE = 500
+
+
+def running_command():
+    """The manage.py / django-admin subcommand being run, or None under a server."""
+    program = os.path.basename(sys.argv[0]) if sys.argv else ''
+    if program in ('manage.py', 'django-admin', '__main__.py') and len(sys.argv) > 1:
+        return sys.argv[1]
+    return None
+
+
+def template_dirs(backend):
+    """Directories the backend's loaders read, including app directories."""
+    engine = getattr(backend, 'engine', None)
+    if engine is None:
+        return list(backend.template_dirs)
+    return list(dict.fromkeys(
+        str(directory)
+        for loader in engine.template_loaders if hasattr(loader, 'get_dirs')
+        for directory in loader.get_dirs()
+    ))
+
+
+def template_names(backend):
+    for directory in template_dirs(backend):
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(('.html', '.txt', '.xml')):
+                    yield os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/')
+
+
+def compile_templates():
+    """Load every template once, so the cached loader keeps it. Returns the count."""
+    compiled = 0
+    for backend in engines.all():
+        for name in set(template_names(backend)):
+            try:
+                backend.get_template(name)
+                compiled += 1
+            except (TemplateDoesNotExist, TemplateSyntaxError) as exc:
+                logger.warning("Could not precompile template %s: %s", name, exc)
+    return compiled
+
+
+def prime_caches():
+    """Load the random pools' id lists and resolve every pile card image."""
+    from .categories import category_pool, category_slugs
+    from .models import LuckCard
+    from .selection import affirmation_pool, luck_card_pool
+    from .serializers import default_card_url, pile_card_serializer
+
+    affirmation_pool.ids()
+    luck_card_pool.ids()
+    for slug in category_slugs.get():
+        category_pool(slug).ids()
+
+    default_card_url()
+    cards = LuckCard.objects.only('pk', 'image', 'image_variants').order_by('pk').iterator(chunk_size=CARD_BATCH_SIZE)
+    while batch := list(islice(cards, CARD_BATCH_SIZE)):
+        pile_card_serializer.resolved(batch)
+
+
+def _prime_when_ready():
+    apps.ready_event.wait()
+    started = time.perf_counter()
+    try:
+        prime_caches()
+    except Exception:
+        # A database without tables yet (first deploy, before migrate) is fine
+        logger.warning("Cache warm-up failed", exc_info=True)
+    else:
+        logger.info("Primed caches in %.0f ms", (time.perf_counter() - started) * 1000)
+    finally:
+        close_old_connections()
+
+
+def start():
+    command = running_command()
+    if command is not None and command not in SERVER_COMMANDS:
+        return None
+
+    started = time.perf_counter()
+    count = compile_templates()
+    logger.info("Precompiled %d templates in %.0f ms", count, (time.perf_counter() - started) * 1000)
+
+    thread = threading.Thread(target=_prime_when_ready, name='dailysoul-warm-up', daemon=True)
+    thread.start()
+    return thread
@@ -10,22 +10,33 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
-# Quick-start development settings - unsuitable for production
+# DAILYSOUL_ENV=production switches to the production profile: DEBUG off,
+# secret key and hosts from the environment, cached templates, persistent
+# database connections and a warm-up when each worker starts.
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
+PRODUCTION = os.environ.get('DAILYSOUL_ENV', 'development') == 'production'
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-h5+8nun7s(kk+-n96rd=g5bdxg+2fu5wj9wb!k&#7yd8=kl7xp'
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    if PRODUCTION:
+        raise ImproperlyConfigured("DJANGO_SECRET_KEY must be set when DAILYSOUL_ENV=production")
+    SECRET_KEY = 'django-insecure-h5+8nun7s(kk+-n96rd=g5bdxg+2fu5wj9wb!k&#7yd8=kl7xp'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get('DJANGO_DEBUG', '0' if PRODUCTION else '1') == '1'
 
-ALLOWED_HOSTS = []
+# Comma-separated, e.g. "dailysoul.example.com,www.dailysoul.example.com"
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host.strip()]
 
 
 # Application definition
@@ -44,11 +55,15 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    # First, so its timings include every other middleware
+    'DailySoul.instrumentation.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Inside SessionMiddleware: pins a session to the primary after it writes
+    'DailySoul.routers.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -71,6 +86,17 @@ TEMPLATES = [
     },
 ]
 
+if PRODUCTION:
+    # Compile each template once per worker and keep it (warmup.py fills the
+    # cache at start-up); explicit loaders replace APP_DIRS
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'dailysoul_project.wsgi.application'
 
 
@@ -81,6 +107,58 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Seconds a connection is reused across requests; 0 closes it after each one
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', '60' if PRODUCTION else '0')),
+        'CONN_HEALTH_CHECKS': PRODUCTION,
+    }
+}
+
+# SQLite tuning for several workers sharing db.sqlite3 (see DailySoul/db.py):
+# pragmas applied to every connection, write transactions that take the lock
+# up front (BEGIN IMMEDIATE), and retries when it stays busy
+DAILYSOUL_SQLITE_TUNING = os.environ.get('DAILYSOUL_SQLITE_TUNING', '1') == '1'
+# WAL is stored in the database file itself (and adds -wal/-shm files next to
+# it), so it is only switched on for the production profile by default
+DAILYSOUL_SQLITE_WAL = os.environ.get('DAILYSOUL_SQLITE_WAL', '1' if PRODUCTION else '0') == '1'
+DAILYSOUL_SQLITE_PRAGMAS = {
+    **({'journal_mode': 'WAL'} if DAILYSOUL_SQLITE_WAL else {}),
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,  # KiB
+} if DAILYSOUL_SQLITE_TUNING else {}
+if DAILYSOUL_SQLITE_TUNING:
+    DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE'}
+DAILYSOUL_DB_RETRY_ATTEMPTS = int(os.environ.get('DAILYSOUL_DB_RETRY_ATTEMPTS', '5' if DAILYSOUL_SQLITE_TUNING else '1'))
+
+# Read replicas (see DailySoul/routers.py): DAILYSOUL_READ_REPLICAS is a
+# comma-separated list of SQLite files kept in sync with the primary from
+# outside Django (e.g. Litestream, or the sync_replicas command locally).
+# They become the aliases replica1, replica2, ...; the dashboard, affirmation
+# draws, journal listing and leaderboards read from them
+DAILYSOUL_READ_REPLICAS = []
+for _number, _name in enumerate(
+        [name.strip() for name in os.environ.get('DAILYSOUL_READ_REPLICAS', '').split(',') if name.strip()], start=1):
+    DATABASES[f'replica{_number}'] = {
+        **DATABASES['default'],
+        'NAME': _name,
+        'OPTIONS': {},
+        # Tests read the test database through the replica aliases
+        'TEST': {'MIRROR': 'default'},
+    }
+    DAILYSOUL_READ_REPLICAS.append(f'replica{_number}')
+DATABASE_ROUTERS = ['DailySoul.routers.ReplicaRouter']
+# How long a session reads from the primary after it writes; should cover replica lag
+DAILYSOUL_REPLICA_STICKY_SECONDS = float(os.environ.get('DAILYSOUL_REPLICA_STICKY_SECONDS', '10'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'dailysoul',
     }
 }
 
@@ -130,9 +208,61 @@ STATICFILES_DIRS = [BASE_DIR / "static"]  # if you keep assets in <project>/stat
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-import os
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
\ No newline at end of file
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# collectstatic writes content-hashed, pre-gzipped assets that can be cached
+# forever; development serves the source files as they are
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'DailySoul.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
+
+# Serve the JSON API endpoints (draws, game scores) from their async views.
+# Only worth turning on when running under an ASGI server.
+DAILYSOUL_ASYNC_API = os.environ.get('DAILYSOUL_ASYNC_API') == '1'
+
+# Let Django serve MEDIA_URL outside DEBUG too (e.g. no separate web server for uploads)
+DAILYSOUL_SERVE_MEDIA = os.environ.get('DAILYSOUL_SERVE_MEDIA') == '1'
+
+# Speech synthesizer for pre-rendered affirmation audio (see DailySoul/tts.py),
+# and whether saving an affirmation renders it in the background. The default
+# gTTS backend needs the gTTS package and network access, so rendering on save
+# is only on by default when a backend is chosen explicitly
+DAILYSOUL_TTS_BACKEND = os.environ.get('DAILYSOUL_TTS_BACKEND', 'DailySoul.tts.GTTSSynthesizer')
+DAILYSOUL_TTS_ON_SAVE = os.environ.get(
+    'DAILYSOUL_TTS_ON_SAVE', '1' if 'DAILYSOUL_TTS_BACKEND' in os.environ else '0'
+) == '1'
+
+# Request instrumentation (see DailySoul/instrumentation.py): queries slower
+# than this are logged, as is any SQL repeated this many times in one request
+DAILYSOUL_SLOW_QUERY_MS = float(os.environ.get('DAILYSOUL_SLOW_QUERY_MS', '100'))
+DAILYSOUL_SLOW_REQUEST_MS = float(os.environ.get('DAILYSOUL_SLOW_REQUEST_MS', '500'))
+DAILYSOUL_DUPLICATE_QUERY_THRESHOLD = int(os.environ.get('DAILYSOUL_DUPLICATE_QUERY_THRESHOLD', '5'))
+DAILYSOUL_SERVER_TIMING = DEBUG
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'DailySoul': {
+            'handlers': ['console'],
+            'level': os.environ.get('DAILYSOUL_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
+# Precompile templates and prime the draw caches when a worker starts
+# (see DailySoul/warmup.py)
+DAILYSOUL_WARM_UP = os.environ.get('DAILYSOUL_WARM_UP', '1' if PRODUCTION else '0') == '1'